@@ -17,3 +17,10 @@ class DicomLoader(FileLoader):
         except dcm.errors.InvalidDicomError as e:
             print(f"{target_path} is unreadable: {e}")
             pass
+
+    def load_header(self, target_path: str):
+        """Return DICOM file read up to PixelData, None if unreadable."""
+        try:
+            return dcm.dcmread(target_path, stop_before_pixels=True)
+        except dcm.errors.InvalidDicomError as e:
+            print(f"{target_path} is unreadable: {e}")
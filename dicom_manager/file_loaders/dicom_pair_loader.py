@@ -11,8 +11,12 @@ class DicomPairLoader(FileLoader):
     """Load DICOM files."""
 
     def get_path_from_meta(self, target_path: pathlib.Path):
+        """Return origin path stored by DicomLoader.add_path_to_meta, read as UN bytes from implicit VR files."""
         preprocessed_meta_data = dcm.dcmread(target_path, stop_before_pixels=True)
-        return preprocessed_meta_data[0x000B, 0x1001].value
+        origin_path = preprocessed_meta_data[0x000B, 0x1001].value
+        if isinstance(origin_path, bytes):
+            return origin_path.decode().rstrip("\x00 ")
+        return origin_path
 
     def load_file(self, target_path: str):
         try:
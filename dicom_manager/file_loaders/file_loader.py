@@ -4,7 +4,7 @@ from abc import ABC, abstractmethod
 from glob import glob
 from natsort import natsorted
 
-from ballir_dicom_manager.exception_handling import ArgErrorType
+from dicom_manager.exception_handling import ArgErrorType
 
 
 class FileLoader(ABC):
@@ -0,0 +1,309 @@
+"""Compact (Y, X, Z) label volumes carrying their own spacing: dense (uint8 or bit-packed) and sparse (ROI-bounded)."""
+
+from typing import List, Tuple
+
+import numpy as np
+from scipy import ndimage
+
+
+class LabelVolume:
+    """
+    Binary masks are packed 8 voxels per byte along X, so any transverse, coronal or sagittal
+    plane can be unpacked on its own. Multi-label masks are stored as uint8.
+    """
+
+    popcount = np.array([bin(byte).count("1") for byte in range(256)], dtype=np.uint8)
+
+    def __init__(self, label_array: np.array, spacing: List[float], packed: bool = None):
+        """Store (Y, X, Z) label_array with spacing as (Y, X, step-size), packed defaults to True for binary masks."""
+        self.spacing = list(spacing)
+        self.set_data(label_array, packed)
+
+    @staticmethod
+    def build_compact(label_array: np.array, spacing: List[float]) -> "LabelVolume":
+        """
+        Return SparseLabelVolume if the bounding box of all labels is under 1/8 of the volume
+        (the cost of bit-packing the full grid), otherwise LabelVolume. Float labels are rounded, not truncated.
+        """
+        if label_array.dtype.kind == "f":
+            label_array = np.rint(label_array)
+        roi = SparseLabelVolume.get_array_roi(label_array)
+        roi_size = np.prod([dim.stop - dim.start for dim in roi]) if roi else 0
+        if roi_size * 8 < label_array.size:
+            return SparseLabelVolume(label_array, spacing)
+        return LabelVolume(label_array, spacing)
+
+    @property
+    def arr(self) -> np.array:
+        """Return full (Y, X, Z) uint8 label array, unpacked for binary masks."""
+        if self.packed:
+            return np.unpackbits(self.data, axis=1, count=self.shape[1])
+        return self.data
+
+    @arr.setter
+    def arr(self, label_array: np.array) -> None:
+        self.set_data(label_array)
+
+    def set_data(self, label_array: np.array, packed: bool = None) -> None:
+        assert label_array.ndim == 3, "label volume must be (Y, X, Z)"
+        max_value = np.amax(label_array)
+        assert np.amin(label_array) >= 0, "negative values present in mask"
+        assert max_value <= 255, "label values exceed uint8 range"
+        if packed is None:
+            packed = max_value <= 1
+        assert not packed or max_value <= 1, "only binary masks can be packed"
+        self.shape = label_array.shape
+        self.packed = bool(packed)
+        self.data = (
+            np.packbits(label_array.astype(bool, copy=False), axis=1)
+            if self.packed
+            else label_array.astype(np.uint8, copy=False)
+        )
+
+    @property
+    def dtype(self):
+        return np.dtype(np.uint8)
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes
+
+    def get_roi(self) -> Tuple[slice]:
+        """Return slices of region that may hold labels, whole volume for dense label volumes."""
+        return tuple(slice(0, dim) for dim in self.shape)
+
+    def get_block(self, roi: Tuple[slice]) -> np.array:
+        """Return uint8 labels within roi slices."""
+        if self.packed:
+            return np.unpackbits(
+                self.data[roi[0], :, roi[2]], axis=1, count=self.shape[1]
+            )[:, roi[1], :]
+        return self.data[roi]
+
+    def get_values(self) -> List[int]:
+        """Return non-zero label values present."""
+        if self.packed:
+            return [1] if self.data.any() else []
+        return [int(value) for value in np.unique(self.data) if value > 0]
+
+    def get_mask(self, label_value: int = 1) -> np.array:
+        """Return full size boolean mask of label value."""
+        if self.packed:
+            return self.arr.view(bool) if label_value == 1 else np.zeros(self.shape, bool)
+        return self.data == label_value
+
+    def get_packed_mask(self, label_value: int = 1) -> np.array:
+        """Return mask of label value packed along X, without unpacking binary masks."""
+        if self.packed:
+            return self.data if label_value == 1 else np.zeros_like(self.data)
+        return np.packbits(self.data == label_value, axis=1)
+
+    def get_slice_counts(self, label_value: int = 1) -> np.array:
+        """Return voxel count of label value per Z slice."""
+        return np.sum(
+            self.popcount[self.get_packed_mask(label_value)], axis=(0, 1), dtype=np.int64
+        )
+
+    def count(self, label_value: int = 1) -> int:
+        return int(np.sum(self.get_slice_counts(label_value)))
+
+    def count_overlap(self, label_volume: "LabelVolume", label_value: int = 1) -> int:
+        """Return number of voxels with label value in both volumes."""
+        assert self.shape == label_volume.shape, f"label shape mismatch: {self.shape}:{label_volume.shape}"
+        if isinstance(label_volume, SparseLabelVolume):
+            return label_volume.count_overlap(self, label_value)
+        return int(
+            np.sum(
+                self.popcount[
+                    self.get_packed_mask(label_value)
+                    & label_volume.get_packed_mask(label_value)
+                ],
+                dtype=np.int64,
+            )
+        )
+
+    def get_transverse(self, slice_num: int) -> np.array:
+        """Return (Y, X) uint8 plane at Z index."""
+        if self.packed:
+            return np.unpackbits(self.data[..., slice_num], axis=1, count=self.shape[1])
+        return self.data[..., slice_num]
+
+    def get_coronal(self, row_num: int) -> np.array:
+        """Return (X, Z) uint8 plane at Y index."""
+        if self.packed:
+            return np.unpackbits(self.data[row_num], axis=0, count=self.shape[1])
+        return self.data[row_num]
+
+    def get_sagittal(self, column_num: int) -> np.array:
+        """Return (Y, Z) uint8 plane at X index."""
+        if self.packed:
+            return (self.data[:, column_num // 8, :] >> (7 - column_num % 8)) & 1
+        return self.data[:, column_num, :]
+
+    def get_center_of_mass(self) -> Tuple[float]:
+        """Return center idx of all non-zero voxels, volume center for empty masks."""
+        y_counts = np.zeros(self.shape[0], dtype=np.int64)
+        x_counts = np.zeros(self.shape[1], dtype=np.int64)
+        z_counts = np.zeros(self.shape[2], dtype=np.int64)
+        for slice_num in range(self.shape[2]):
+            transverse = self.get_transverse(slice_num) > 0
+            y_counts += np.count_nonzero(transverse, axis=1)
+            x_counts += np.count_nonzero(transverse, axis=0)
+            z_counts[slice_num] = np.count_nonzero(transverse)
+        total = np.sum(z_counts)
+        if not total:
+            return [int(dim / 2) for dim in self.shape]
+        return tuple(
+            float(np.dot(np.arange(counts.size), counts) / total)
+            for counts in (y_counts, x_counts, z_counts)
+        )
+
+
+class SparseLabelVolume(LabelVolume):
+    """
+    Label volume stored as the uint8 block within the bounding box of all labels, for lesion-sized masks.
+    Counts, overlap, masks and center of mass only touch the block, the full uint8 grid is built only for arr.
+    """
+
+    @staticmethod
+    def get_array_roi(label_array: np.array) -> Tuple[slice]:
+        """Return bounding box slices of all non-zero voxels, None if label array is empty."""
+        roi = []
+        for axis in range(label_array.ndim):
+            indices = np.flatnonzero(
+                np.any(
+                    label_array,
+                    axis=tuple(dim for dim in range(label_array.ndim) if dim != axis),
+                )
+            )
+            if not indices.size:
+                return None
+            roi.append(slice(int(indices[0]), int(indices[-1]) + 1))
+        return tuple(roi)
+
+    @staticmethod
+    def intersect_rois(roi_1: Tuple[slice], roi_2: Tuple[slice]) -> Tuple[slice]:
+        """Return intersection of roi slices, None if they do not overlap."""
+        if roi_1 is None or roi_2 is None:
+            return None
+        roi = tuple(
+            slice(max(dim_1.start, dim_2.start), min(dim_1.stop, dim_2.stop))
+            for dim_1, dim_2 in zip(roi_1, roi_2)
+        )
+        return roi if all(dim.start < dim.stop for dim in roi) else None
+
+    @property
+    def arr(self) -> np.array:
+        """Return full (Y, X, Z) uint8 label array."""
+        arr = np.zeros(self.shape, dtype=np.uint8)
+        if self.roi:
+            arr[self.roi] = self.block
+        return arr
+
+    @arr.setter
+    def arr(self, label_array: np.array) -> None:
+        self.set_data(label_array)
+
+    def set_data(self, label_array: np.array, packed: bool = None) -> None:
+        assert label_array.ndim == 3, "label volume must be (Y, X, Z)"
+        assert np.amin(label_array) >= 0, "negative values present in mask"
+        assert np.amax(label_array) <= 255, "label values exceed uint8 range"
+        self.shape = label_array.shape
+        self.packed = False
+        self.roi = self.get_array_roi(label_array)
+        self.block = (
+            np.array(label_array[self.roi], dtype=np.uint8)
+            if self.roi
+            else np.zeros((0, 0, 0), dtype=np.uint8)
+        )
+
+    @property
+    def nbytes(self) -> int:
+        return self.block.nbytes
+
+    def get_roi(self) -> Tuple[slice]:
+        return self.roi
+
+    def get_block(self, roi: Tuple[slice]) -> np.array:
+        block = np.zeros([dim.stop - dim.start for dim in roi], dtype=np.uint8)
+        overlap = self.intersect_rois(self.roi, roi)
+        if overlap:
+            block[
+                tuple(slice(o.start - r.start, o.stop - r.start) for o, r in zip(overlap, roi))
+            ] = self.block[
+                tuple(
+                    slice(o.start - b.start, o.stop - b.start)
+                    for o, b in zip(overlap, self.roi)
+                )
+            ]
+        return block
+
+    def get_values(self) -> List[int]:
+        return [int(value) for value in np.unique(self.block) if value > 0]
+
+    def get_mask(self, label_value: int = 1) -> np.array:
+        """Return full size boolean mask of label value, only the ROI is compared."""
+        mask = np.zeros(self.shape, dtype=bool)
+        if self.roi:
+            mask[self.roi] = self.block == label_value
+        return mask
+
+    def get_packed_mask(self, label_value: int = 1) -> np.array:
+        """Return full size mask of label value packed along X, only the ROI widened to whole bytes is packed."""
+        packed_mask = np.zeros(
+            (self.shape[0], -(-self.shape[1] // 8), self.shape[2]), dtype=np.uint8
+        )
+        if self.roi:
+            byte_start = self.roi[1].start // 8
+            columns = slice(byte_start * 8, min(self.shape[1], -(-self.roi[1].stop // 8) * 8))
+            packed_mask[self.roi[0], byte_start : -(-columns.stop // 8), self.roi[2]] = np.packbits(
+                self.get_block((self.roi[0], columns, self.roi[2])) == label_value, axis=1
+            )
+        return packed_mask
+
+    def get_slice_counts(self, label_value: int = 1) -> np.array:
+        slice_counts = np.zeros(self.shape[2], dtype=np.int64)
+        if self.roi:
+            slice_counts[self.roi[2]] = np.count_nonzero(
+                self.block == label_value, axis=(0, 1)
+            )
+        return slice_counts
+
+    def count(self, label_value: int = 1) -> int:
+        return int(np.count_nonzero(self.block == label_value))
+
+    def count_overlap(self, label_volume: LabelVolume, label_value: int = 1) -> int:
+        """Return number of voxels with label value in both volumes, comparing only the shared bounding box."""
+        assert self.shape == label_volume.shape, f"label shape mismatch: {self.shape}:{label_volume.shape}"
+        roi = self.intersect_rois(self.roi, label_volume.get_roi())
+        if roi is None:
+            return 0
+        return int(
+            np.count_nonzero(
+                (self.get_block(roi) == label_value)
+                & (label_volume.get_block(roi) == label_value)
+            )
+        )
+
+    def get_transverse(self, slice_num: int) -> np.array:
+        return self.get_block(
+            (slice(0, self.shape[0]), slice(0, self.shape[1]), slice(slice_num, slice_num + 1))
+        )[..., 0]
+
+    def get_coronal(self, row_num: int) -> np.array:
+        return self.get_block(
+            (slice(row_num, row_num + 1), slice(0, self.shape[1]), slice(0, self.shape[2]))
+        )[0]
+
+    def get_sagittal(self, column_num: int) -> np.array:
+        return self.get_block(
+            (slice(0, self.shape[0]), slice(column_num, column_num + 1), slice(0, self.shape[2]))
+        )[:, 0, :]
+
+    def get_center_of_mass(self) -> Tuple[float]:
+        if not self.roi:
+            return [int(dim / 2) for dim in self.shape]
+        return tuple(
+            float(center + dim.start)
+            for center, dim in zip(ndimage.center_of_mass(self.block > 0), self.roi)
+        )
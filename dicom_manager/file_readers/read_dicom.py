@@ -5,7 +5,8 @@ import numpy as np
 import pydicom as dcm
 import dicom2nifti
 
-from ballir_dicom_manager.file_viewers.array_viewer import ArrayViewer
+from dicom_manager.file_viewers.array_viewer import ArrayViewer
+from dicom_manager.file_viewers.windowing import Windowing
 from dicom_manager.file_readers.read_image_volume import ReadImageVolume
 from dicom_manager.file_loaders.dicom_loader import DicomLoader
 from dicom_manager.file_loaders.dicom_pair_loader import DicomPairLoader
@@ -45,6 +46,31 @@ class ReadDicom(ReadImageVolume):
 
         self.set_arr()
 
+    @classmethod
+    def clone_headers(
+        cls, read_dicom: "ReadDicom", arr: np.array = None, dtype=np.uint8
+    ) -> "ReadDicom":
+        """
+        Return ReadDicom with copied headers of read_dicom and a new pixel buffer.
+        Pixel buffer is arr if passed, otherwise zeros of dtype. PixelData of read_dicom is never copied.
+        """
+        clone = cls.__new__(cls)
+        clone.files = [cls.writer.copy_header(file) for file in read_dicom.files]
+        clone.validator = read_dicom.validator
+        clone.nifti_fixer = read_dicom.nifti_fixer
+        clone.parser = read_dicom.parser
+        clone.value_clip = False
+        clone.spacing = read_dicom.spacing
+        clone.arr = (
+            arr if arr is not None else np.zeros(read_dicom.arr.shape, dtype=dtype)
+        )
+        assert (
+            clone.arr.shape[-1] == len(clone.files)
+        ), f"{clone.arr.shape[-1]} slices in pixel array for {len(clone.files)} DICOM files"
+        clone.viewer = ArrayViewer(clone.arr, clone.spacing, Windowing.get_rescale(clone))
+        clone.writer.write_array_volume_to_dicom(clone.arr, clone.files)
+        return clone
+
     def convert_clip_range_to_hounsfield(
         self, value_clip: list, dicom_file: dcm.dataset.Dataset
     ) -> List[float]:
@@ -83,7 +109,7 @@ class ReadDicom(ReadImageVolume):
         self.files, self.arr = self.validator.validate_arr(self.files)
         if self.value_clip:
             self.arr = self.clip_pixel_array(self.files, self.value_clip, self.arr)
-        self.viewer = ArrayViewer(self.arr, self.spacing)
+        self.viewer = ArrayViewer(self.arr, self.spacing, Windowing.get_rescale(self))
         self.writer.write_array_volume_to_dicom(self.arr, self.files)
 
     def prep_for_nifti(
@@ -0,0 +1,158 @@
+import os
+import pathlib
+from typing import List, Tuple
+
+import numpy as np
+import pydicom as dcm
+
+from dicom_manager.file_loaders.dicom_loader import DicomLoader
+from dicom_manager.file_viewers.plane_viewer import PlaneViewer
+from dicom_manager.file_viewers.windowing import Windowing
+from dicom_manager.preprocess.dicom_tag_parser import DicomSorter, DicomTagParser
+
+
+class ReadDicomPreview:
+    """
+    Orthoview preview of an uncompressed single-frame DICOM series without reading the full volume.
+    Headers are read with stop_before_pixels, then only the center transverse slice, one row and one
+    column of every file are read at their PixelData offsets. The column is strided, so it costs one page
+    per image row; the row and transverse slice are single preads.
+    If any file is compressed or not plain little endian single-sample pixel data, supported is False
+    and the series should be read with ReadDicom.
+    """
+
+    loader = DicomLoader()
+    sorter = DicomSorter()
+    transfer_syntaxes = {
+        "1.2.840.10008.1.2": False,  # implicit VR little endian
+        "1.2.840.10008.1.2.1": True,  # explicit VR little endian
+    }
+    pixel_data_tag = b"\xe0\x7f\x10\x00"
+
+    def __init__(self, target_path: pathlib.Path, allow: list = []):
+        self.parser = DicomTagParser(allow)
+        headers = [
+            self.read_header(file_path)
+            for file_path in self.loader.get_file_paths(target_path)
+        ]
+        self.supported = bool(headers) and all(header is not None for header in headers)
+        if not self.supported:
+            return
+        offsets = {id(header): (file_path, offset) for header, file_path, offset in headers}
+        self.files = self.sorter.sort_dicom_files([header for header, _, _ in headers])
+        self.pixel_offsets = [offsets[id(file)] for file in self.files]
+        self.supported = self.check_consistent(self.files)
+        if not self.supported:
+            return
+        self.dtype = self.get_dtype(self.files[0])
+        self.shape = (int(self.files[0].Rows), int(self.files[0].Columns), len(self.files))
+        self.spacing = self.parser.get_dicom_spacing(self.files)
+        self.viewer = PlaneViewer(
+            *self.read_planes(), self.shape, self.spacing, Windowing.get_rescale(self)
+        )
+
+    def read_header(self, file_path: pathlib.Path) -> Tuple:
+        """Return (header, file_path, pixel value offset), None if pixel data can not be read in place."""
+        try:
+            with open(file_path, "rb") as f:
+                header = dcm.dcmread(f, stop_before_pixels=True)
+                element_offset = f.tell()
+                element_header = f.read(12)
+        except (dcm.errors.InvalidDicomError, OSError) as e:
+            print(f"{file_path} is unreadable: {e}")
+            return None
+        transfer_syntax = str(getattr(getattr(header, "file_meta", None), "TransferSyntaxUID", ""))
+        if not transfer_syntax in self.transfer_syntaxes:
+            return None
+        if not element_header.startswith(self.pixel_data_tag):
+            return None
+        if self.transfer_syntaxes[transfer_syntax]:
+            value_offset = 12
+            length = int.from_bytes(element_header[8:12], "little")
+        else:
+            value_offset = 8
+            length = int.from_bytes(element_header[4:8], "little")
+        if (
+            int(getattr(header, "SamplesPerPixel", 1)) != 1
+            or int(getattr(header, "NumberOfFrames", 1) or 1) != 1
+            or not int(getattr(header, "BitsAllocated", 0)) in (8, 16, 32)
+            or length
+            < int(header.Rows) * int(header.Columns) * int(header.BitsAllocated) // 8
+        ):
+            return None
+        return header, file_path, element_offset + value_offset
+
+    def check_consistent(self, dicom_files: List[dcm.dataset.Dataset]) -> bool:
+        """Return True if all slices share shape and pixel format, otherwise the full reader must conform them."""
+        return (
+            len(
+                {
+                    (
+                        int(file.Rows),
+                        int(file.Columns),
+                        int(file.BitsAllocated),
+                        int(file.PixelRepresentation),
+                    )
+                    for file in dicom_files
+                }
+            )
+            == 1
+        )
+
+    def get_dtype(self, dicom_file: dcm.dataset.Dataset) -> np.dtype:
+        return np.dtype(
+            f"<{'i' if int(dicom_file.PixelRepresentation) else 'u'}{int(dicom_file.BitsAllocated) // 8}"
+        )
+
+    def sign_extend(self, arr: np.array) -> np.array:
+        """Sign extend signed values stored in fewer bits than allocated, as pixel_array does."""
+        bits_stored = int(getattr(self.files[0], "BitsStored", self.files[0].BitsAllocated))
+        shift = int(self.files[0].BitsAllocated) - bits_stored
+        if not int(self.files[0].PixelRepresentation) or shift <= 0:
+            return arr
+        return (arr << shift) >> shift
+
+    def pread(self, file_path: pathlib.Path, offset: int, count: int) -> np.array:
+        """Return count pixel values read at byte offset."""
+        fd = os.open(file_path, os.O_RDONLY)
+        try:
+            buffer = os.pread(fd, count * self.dtype.itemsize, offset)
+        finally:
+            os.close(fd)
+        return np.frombuffer(buffer, dtype=self.dtype, count=count)
+
+    def read_slice(self, slice_num: int) -> np.array:
+        file_path, offset = self.pixel_offsets[slice_num]
+        return self.pread(file_path, offset, self.shape[0] * self.shape[1]).reshape(
+            self.shape[:2]
+        )
+
+    def read_row(self, slice_num: int, row_num: int) -> np.array:
+        file_path, offset = self.pixel_offsets[slice_num]
+        return self.pread(
+            file_path, offset + row_num * self.shape[1] * self.dtype.itemsize, self.shape[1]
+        )
+
+    def read_column(self, slice_num: int, column_num: int) -> np.array:
+        file_path, offset = self.pixel_offsets[slice_num]
+        return np.array(
+            np.memmap(file_path, dtype=self.dtype, mode="r", offset=offset, shape=self.shape[:2])[
+                :, column_num
+            ]
+        )
+
+    def read_planes(self) -> Tuple[np.array]:
+        """Return transverse (Y, X), sagittal (Y, Z) and coronal (X, Z) planes at ArrayViewer's center indices."""
+        # ArrayViewer takes the sagittal column at shape[0] / 2 and the coronal row at shape[1] / 2
+        column_num = min(int(self.shape[0] / 2), self.shape[1] - 1)
+        row_num = min(int(self.shape[1] / 2), self.shape[0] - 1)
+        transverse = self.read_slice(int(self.shape[2] / 2))
+        sagittal = np.stack(
+            [self.read_column(slice_num, column_num) for slice_num in range(self.shape[2])],
+            axis=-1,
+        )
+        coronal = np.stack(
+            [self.read_row(slice_num, row_num) for slice_num in range(self.shape[2])],
+            axis=-1,
+        )
+        return tuple(self.sign_extend(plane) for plane in (transverse, sagittal, coronal))
@@ -0,0 +1,81 @@
+"""Read multi-frame DICOM SEG label objects as (Y, X, Z) label volumes."""
+
+import pathlib
+from typing import List
+
+import numpy as np
+import pydicom as dcm
+
+from dicom_manager.file_readers.read_image_volume import ReadImageVolume
+from dicom_manager.file_loaders.dicom_loader import DicomLoader
+from dicom_manager.file_viewers.array_viewer import ArrayViewer
+
+
+class ReadDicomSeg(ReadImageVolume):
+
+    loader = DicomLoader()
+
+    def __init__(self, target_path: pathlib.Path):
+        super().__init__(target_path)
+        assert (
+            len(self.files) == 1 and self.files[0].Modality == "SEG"
+        ), f"{target_path} must contain a single DICOM SEG file"
+        self.seg = self.files[0]
+        self.spacing = self.get_seg_spacing(self.seg)
+        self.set_arr()
+
+    @staticmethod
+    def is_seg(target_path: pathlib.Path) -> bool:
+        """Return True if target file is a DICOM SEG object."""
+        dicom_file = dcm.dcmread(target_path, stop_before_pixels=True)
+        return getattr(dicom_file, "Modality", None) == "SEG"
+
+    def get_seg_spacing(self, seg: dcm.dataset.Dataset) -> List[float]:
+        """Return voxel size as (Y-spacing, X-spacing, step-size) from shared functional groups."""
+        pixel_measures = seg.SharedFunctionalGroupsSequence[0].PixelMeasuresSequence[0]
+        step_size = getattr(
+            pixel_measures, "SpacingBetweenSlices", pixel_measures.SliceThickness
+        )
+        return list(pixel_measures.PixelSpacing[:2]) + [step_size]
+
+    def get_slice_nums(self, seg: dcm.dataset.Dataset) -> List[int]:
+        """Return source slice index of each frame, by position of its source image in the referenced series."""
+        referenced_instances = [
+            instance.ReferencedSOPInstanceUID
+            for instance in seg.ReferencedSeriesSequence[0].ReferencedInstanceSequence
+        ]
+        return [
+            referenced_instances.index(
+                frame.DerivationImageSequence[0]
+                .SourceImageSequence[0]
+                .ReferencedSOPInstanceUID
+            )
+            for frame in seg.PerFrameFunctionalGroupsSequence
+        ]
+
+    def get_segment_numbers(self, seg: dcm.dataset.Dataset) -> List[int]:
+        return [
+            frame.SegmentIdentificationSequence[0].ReferencedSegmentNumber
+            for frame in seg.PerFrameFunctionalGroupsSequence
+        ]
+
+    def build_arr(self) -> np.array:
+        """Return (Y, X, Z) label array with voxels set to their segment number."""
+        num_slices = len(
+            self.seg.ReferencedSeriesSequence[0].ReferencedInstanceSequence
+        )
+        num_segments = len(self.seg.SegmentSequence)
+        arr = np.zeros(
+            (self.seg.Rows, self.seg.Columns, num_slices),
+            dtype=np.uint8 if num_segments < 256 else np.uint16,
+        )
+        frames = self.seg.pixel_array.reshape(-1, self.seg.Rows, self.seg.Columns)
+        for frame, segment_number, slice_num in zip(
+            frames, self.get_segment_numbers(self.seg), self.get_slice_nums(self.seg)
+        ):
+            arr[..., slice_num][frame > 0] = segment_number
+        return arr
+
+    def set_arr(self) -> None:
+        self.arr = self.build_arr()
+        self.viewer = ArrayViewer(self.arr, self.spacing)
@@ -5,14 +5,18 @@ import numpy as np
 import pydicom as dcm
 
 from dicom_manager.file_readers.read_dicom import ReadDicom
+from dicom_manager.file_readers.read_dicom_seg import ReadDicomSeg
+from dicom_manager.file_readers.label_volume import LabelVolume
 from dicom_manager.file_viewers.rgb_viewer import RGBViewer
+from dicom_manager.file_viewers.rgb_overlay import RGBOverlay
+from dicom_manager.file_viewers.windowing import Windowing
 
 
 class ReadImageLabelPair(ReadDicom):
     def __init__(
         self,
         read_dicom_image: ReadDicom,
-        read_dicom_label: ReadDicom,
+        read_dicom_label: ReadDicom,  # or LabelVolume
         transparency: float = 0.3,
         **kwargs,
     ):
@@ -29,9 +33,15 @@ class ReadImageLabelPair(ReadDicom):
         self.spacing = read_dicom_image.spacing
         self.arr = self.build_rgb_overlay(**kwargs)
         self.viewer = RGBViewer(
-            self.arr, self.read_dicom_label.arr, read_dicom_image.spacing
+            self.arr, self.get_viewer_label(self.read_dicom_label), read_dicom_image.spacing
         )
 
+    def get_viewer_label(self, read_dicom_label: ReadDicom):
+        """Return label for RGBViewer, LabelVolume is passed as is so it is never unpacked in full."""
+        if isinstance(read_dicom_label, LabelVolume):
+            return read_dicom_label
+        return read_dicom_label.arr
+
     def get_color_tuples_from_hex(self, **kwargs) -> List[tuple]:
         """Return hex color inputs as (r,g,b) tuples. User can enter colors in hex format inside of a list, mask elements 1,2,3... will be colored with same colors[idx] color."""
         if "colors" in kwargs:
@@ -52,21 +62,33 @@ class ReadImageLabelPair(ReadDicom):
             ]
 
     def get_label_values(self, dicom_label: np.array) -> List[int]:
+        if isinstance(dicom_label, LabelVolume):
+            return np.array(dicom_label.get_values())
         assert np.amin(dicom_label) >= 0, "negative values present in mask"
         return np.unique(dicom_label[dicom_label > 0])
 
     def normalize_image(self, grayscale_array: np.array) -> np.array:
-        normalized_array = (grayscale_array - np.amin(grayscale_array)) / (
-            np.amax(grayscale_array) - np.amin(grayscale_array)
+        """Return grayscale_array min:max stretched to uint8."""
+        return Windowing.from_array(grayscale_array).apply(grayscale_array)
+
+    def get_windowing(self, read_dicom_image: ReadDicom, **kwargs) -> Windowing:
+        """Return windowing of read_dicom_image for the window kwarg (preset or (center, width)), min:max if absent."""
+        return Windowing.from_array(
+            read_dicom_image.arr,
+            kwargs["window"] if "window" in kwargs else None,
+            *Windowing.get_rescale(read_dicom_image),
         )
-        normalized_array *= 255
-        normalized_array = normalized_array.astype("uint8")
-        return normalized_array
 
-    def convert_grayscale_to_rgb(self, grayscale_array: np.array) -> np.array:
-        return np.array(
-            [np.copy(self.normalize_image(grayscale_array)) for i in range(3)]
+    def convert_grayscale_to_rgb(
+        self, grayscale_array: np.array, windowing: Windowing = None
+    ) -> np.array:
+        """Return (3, Y, X, Z) uint8 gray of grayscale_array, windowed if windowing is passed else min:max stretched."""
+        gray_array = (
+            self.normalize_image(grayscale_array)
+            if windowing is None
+            else windowing.apply(grayscale_array)
         )
+        return np.repeat(gray_array[np.newaxis], 3, axis=0)
 
     def dampen_mask_regions(
         self, rgb_array: np.array, dicom_label: np.array
@@ -89,11 +111,27 @@ class ReadImageLabelPair(ReadDicom):
         return rgb_array
 
     def build_rgb_overlay(self, **kwargs) -> np.array:
-        rgb_array = self.convert_grayscale_to_rgb(self.read_dicom_image.arr)
-        rgb_array = self.dampen_mask_regions(rgb_array, self.read_dicom_label.arr)
-        rgb_array = self.color_in_labels(rgb_array, self.read_dicom_label.arr)
+        """
+        Return (Z, Y, X, 3) overlay, lazy RGBOverlay colored only where indexed by default.
+        Pass lazy=False to build the full RGB volume up front.
+        """
+        if not ("lazy" in kwargs and not kwargs["lazy"]):
+            return RGBOverlay(
+                self.read_dicom_image.arr,
+                self.get_viewer_label(self.read_dicom_label),
+                self.colors,
+                self.transparency,
+                side_by_side="side_by_side" in kwargs and kwargs["side_by_side"],
+                window=kwargs["window"] if "window" in kwargs else None,
+                rescale=Windowing.get_rescale(self.read_dicom_image),
+            )
+        windowing = self.get_windowing(self.read_dicom_image, **kwargs)
+        rgb_array = self.convert_grayscale_to_rgb(self.read_dicom_image.arr, windowing)
+        label_array = self.read_dicom_label.arr
+        rgb_array = self.dampen_mask_regions(rgb_array, label_array)
+        rgb_array = self.color_in_labels(rgb_array, label_array)
         if "side_by_side" in kwargs and kwargs["side_by_side"]:
-            gray_array = self.convert_grayscale_to_rgb(self.read_dicom_image.arr)
+            gray_array = self.convert_grayscale_to_rgb(self.read_dicom_image.arr, windowing)
             rgb_array = np.concatenate((gray_array, rgb_array), axis=1)
         rgb_array = np.swapaxes(rgb_array, 0, -1)
         return rgb_array
@@ -102,16 +140,28 @@ class ReadImageLabelPair(ReadDicom):
         self, read_dicom: ReadDicom, dicom_file: dcm.dataset.Dataset
     ) -> float:
         if hasattr(dicom_file, "SpacingBetweenSlices"):
-            return np.product(dicom_file.PixelSpacing[:2]) * abs(
+            return np.prod(dicom_file.PixelSpacing[:2]) * abs(
                 dicom_file.SpacingBetweenSlices
             )
         else:
-            return np.product(dicom_file.PixelSpacing[:2]) * abs(
+            return np.prod(dicom_file.PixelSpacing[:2]) * abs(
                 read_dicom.parser.get_step_size(read_dicom.files)
             )
 
     def get_volume(self, read_dicom_label: ReadDicom, label_value: int = 1) -> float:
         """ "Return volume measurement in cm^3 for label int value passed."""
+        if isinstance(read_dicom_label, LabelVolume):
+            return (
+                abs(np.prod(read_dicom_label.spacing))
+                * read_dicom_label.count(label_value)
+                / 1000
+            )
+        if isinstance(read_dicom_label, ReadDicomSeg):
+            return (
+                abs(np.prod(read_dicom_label.spacing))
+                * np.sum(read_dicom_label.arr == label_value)
+                / 1000
+            )
         return (np.sum(
             [
                 self.get_voxel_size(read_dicom_label, file)
@@ -123,12 +173,22 @@ class ReadImageLabelPair(ReadDicom):
     def get_pixel_size(
         self, dicom_file: dcm.dataset.Dataset
     ) -> float:
-        return np.product(
+        return np.prod(
             dicom_file.PixelSpacing[:2]
             )
         
     def get_area(self, read_dicom_label: ReadDicom, label_value: int = 1):
         """ "Return area measurement in cm^2 for label int value passed."""
+        if isinstance(read_dicom_label, (ReadDicomSeg, LabelVolume)):
+            slice_counts = (
+                read_dicom_label.get_slice_counts(label_value)
+                if isinstance(read_dicom_label, LabelVolume)
+                else np.sum(read_dicom_label.arr == label_value, axis=(0, 1))
+            )
+            area_list = list(
+                abs(np.prod(read_dicom_label.spacing[:2])) * slice_counts / 100
+            )
+            return area_list[0] if len(area_list) == 1 else area_list
         if len(read_dicom_label.files) == 1:
             for file in read_dicom_label.files:
                 return ((
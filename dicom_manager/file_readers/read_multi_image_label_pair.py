@@ -1,11 +1,20 @@
-from typing import List, Tuple
+import pathlib
+from typing import Dict, List, Tuple
 
-import cv2 as cv
-import scipy
 import numpy as np
 
+from dicom_manager.file_loaders.dicom_loader import DicomLoader
 from dicom_manager.file_viewers.rgb_viewer import RGBViewer
+from dicom_manager.file_viewers.contour_renderer import ContourRenderer
+from dicom_manager.file_viewers.rgb_overlay import RGBOverlay
+from dicom_manager.file_viewers.windowing import Windowing
+from dicom_manager.file_readers.read_dicom import ReadDicom
 from dicom_manager.file_readers.read_image_label_pair import ReadImageLabelPair
+from dicom_manager.file_readers.label_volume import LabelVolume
+from dicom_manager.preprocess.resample_volume import VolumeResampler
+from dicom_manager.preprocess.dicom_tag_parser import DicomSorter
+from dicom_manager.preprocess.patient_space import PatientSpace
+from dicom_manager.postprocess.surface_distance import SurfaceDistance
 
 
 class ReadMultiImageLabelPair(ReadImageLabelPair):
@@ -24,9 +33,13 @@ class ReadMultiImageLabelPair(ReadImageLabelPair):
         align_by_roi: bool = False,
         contours: bool = False,
         contour_thickness: int = 2,
+        workers: int = 1,
+        label_wise: bool = False,
         **kwargs
     ):
         self.allow = allow
+        self.resampler = VolumeResampler(workers=workers)
+        self.label_wise = label_wise
         self.validate(read_pair_1, read_pair_2)
 
         if align:
@@ -39,6 +52,7 @@ class ReadMultiImageLabelPair(ReadImageLabelPair):
         self.transparency = transparency
         self.contours = contours
         self.contour_thickness = contour_thickness
+        self.contour_renderer = ContourRenderer(contour_thickness, workers)
         self.colors = self.get_color_tuples_from_hex(**kwargs)
         self.dsc = self.get_dsc()
         self.arr = self.build_rgb_overlay(**kwargs)
@@ -46,6 +60,46 @@ class ReadMultiImageLabelPair(ReadImageLabelPair):
             self.arr, self.foreground, read_pair_1.read_dicom_image.spacing
         )
 
+    @classmethod
+    def from_dirs(
+        cls,
+        image_dir_1: pathlib.Path,
+        label_dir_1: pathlib.Path,
+        image_dir_2: pathlib.Path,
+        label_dir_2: pathlib.Path,
+        allow: list = [],
+        **kwargs
+    ) -> "ReadMultiImageLabelPair":
+        """
+        Return pairs aligned by patient position, decoding only the read_pair_2 slices that overlap read_pair_1.
+        read_pair_2 headers are read without pixel data to find the overlapping slices.
+        """
+        read_pair_1 = ReadImageLabelPair(
+            ReadDicom(image_dir_1, allow=allow), ReadDicom(label_dir_1, allow=allow)
+        )
+        space_1 = PatientSpace(read_pair_1.read_dicom_image.files)
+        read_pair_2 = ReadImageLabelPair(
+            ReadDicom(cls.get_overlapping_paths(image_dir_2, space_1), allow=allow),
+            ReadDicom(cls.get_overlapping_paths(label_dir_2, space_1), allow=allow),
+        )
+        return cls(read_pair_1, read_pair_2, allow=allow, align=True, **kwargs)
+
+    @staticmethod
+    def get_overlapping_paths(target_dir: pathlib.Path, space_1: PatientSpace) -> List[str]:
+        """Return paths of series slices within the extent of space_1, whole slices are kept in Y and X."""
+        loader = DicomLoader()
+        headers = {}
+        for file_path in loader.get_file_paths(target_dir):
+            header = loader.load_header(file_path)
+            if header is not None:
+                headers[id(header)] = (header, file_path)
+        dicom_files = DicomSorter().sort_dicom_files(
+            [header for header, _ in headers.values()]
+        )
+        roi = PatientSpace(dicom_files).get_overlap_roi(space_1)
+        assert roi is not None, f"{target_dir} does not overlap read_pair_1"
+        return [headers[id(dicom_file)][1] for dicom_file in dicom_files[roi[2]]]
+
     def validate(
         self,
         read_pair_1: ReadImageLabelPair,
@@ -60,14 +114,11 @@ class ReadMultiImageLabelPair(ReadImageLabelPair):
                 read_pair_1.read_dicom_image.arr.shape[-2]
                 == read_pair_2.read_dicom_image.arr.shape[-2]
             ), f"array shape mismatch: {read_pair_1.read_dicom_image.arr.shape[-2]}:{read_pair_1.read_dicom_image.arr.shape[-2]}"  # double check
-        assert (
-            len(self.get_label_values(read_pair_1.read_dicom_label.arr)) == 1
-            and self.get_label_values(read_pair_1.read_dicom_label.arr)[0] == 1
-        )
-        assert (
-            len(self.get_label_values(read_pair_2.read_dicom_label.arr)) == 1
-            and self.get_label_values(read_pair_2.read_dicom_label.arr)[0] == 1
-        )
+        for read_pair in (read_pair_1, read_pair_2):
+            label_values = self.get_label_values(
+                self.get_viewer_label(read_pair.read_dicom_label)
+            )
+            assert len(label_values) == 1 and label_values[0] == 1
 
     # assert array slices are same XY dims
     # assert slice positions align
@@ -80,16 +131,32 @@ class ReadMultiImageLabelPair(ReadImageLabelPair):
     ) -> Tuple[ReadImageLabelPair]:
         """
         Build empty array of read_pair_1.arr.shape and fill with aligned read_pair_2 values.
+        Centroids are found before resampling, so only the read_pair_2 region landing inside read_pair_1 is resampled.
         """
         # if self.check_volumes_aligned(read_pair_1, read_pair_2):
         #     return read_pair_1, read_pair_2
-        read_pair_2 = self.match_spacing(read_pair_1, read_pair_2)
+        resize_dims = self.get_resize_dims(read_pair_1, read_pair_2)
         pair_1_centroid, pair_2_centroid = self.get_centroids(
             read_pair_1, read_pair_2, align_by_roi
         )
+        pair_2_centroid = [
+            np.round(val)
+            for val in self.resampler.map_to_output(
+                pair_2_centroid, read_pair_2.read_dicom_image.arr.shape, resize_dims
+            )
+        ]
+        pair_2_shape = self.resampler.get_output_shape(
+            read_pair_2.read_dicom_image.arr.shape, resize_dims
+        )
         shift_positions = self.get_shift_positions(
-            read_pair_1, read_pair_2, pair_1_centroid, pair_2_centroid
+            read_pair_1, read_pair_2, pair_1_centroid, pair_2_centroid, pair_2_shape
+        )
+        roi = tuple(
+            slice(start, max(start, stop))
+            for start, stop in zip(shift_positions[0], shift_positions[1])
         )
+        read_pair_2 = self.match_spacing(read_pair_1, read_pair_2, roi)
+        shift_positions = self.crop_shift_positions(shift_positions, roi)
         read_pair_2 = self.write_shifted(read_pair_1, read_pair_2, shift_positions)
         # reset arr?
         return read_pair_1, read_pair_2
@@ -109,20 +176,40 @@ class ReadMultiImageLabelPair(ReadImageLabelPair):
             pair_2_file.SpacingBetweenSlices = pair_1_file.SpacingBetweenSlices
         return read_pair_2
 
-    def match_spacing(
+    def get_resize_dims(
         self, read_pair_1: ReadImageLabelPair, read_pair_2: ReadImageLabelPair
+    ) -> List[float]:
+        """Return zoom factors resizing read_pair_2 to read_pair_1 voxel size."""
+        if read_pair_1.spacing == read_pair_2.spacing:
+            return [1.0, 1.0, 1.0]
+        return [
+            abs(float(j)) / abs(float(i))
+            for i, j in zip(read_pair_1.spacing, read_pair_2.spacing)
+        ]
+
+    def match_spacing(
+        self,
+        read_pair_1: ReadImageLabelPair,
+        read_pair_2: ReadImageLabelPair,
+        roi: Tuple[slice] = None,
     ) -> ReadImageLabelPair:
-        """Return read_pair_2 resized to align with read_pair_1 voxel size."""
+        """
+        Return read_pair_2 resized to align with read_pair_1 voxel size, image as float32 linear
+        and label as nearest neighbour (or label-wise) resampling. Only roi of the resized grid is kept.
+        """
         if read_pair_1.spacing == read_pair_2.spacing:
+            if roi:
+                read_pair_2.read_dicom_image.arr = read_pair_2.read_dicom_image.arr[roi]
+                read_pair_2.read_dicom_label.arr = read_pair_2.read_dicom_label.arr[roi]
             return read_pair_2
-        resize_dims = [j / i for i, j in zip(read_pair_1.spacing, read_pair_2.spacing)]
+        resize_dims = self.get_resize_dims(read_pair_1, read_pair_2)
         read_pair_2 = self.rewrite_spacing_tags(read_pair_1, read_pair_2)
 
-        read_pair_2.read_dicom_image.arr = scipy.ndimage.zoom(
-            read_pair_2.read_dicom_image.arr, resize_dims
+        read_pair_2.read_dicom_image.arr = self.resampler.resample_image(
+            read_pair_2.read_dicom_image.arr, resize_dims, roi
         )
-        read_pair_2.read_dicom_label.arr = scipy.ndimage.zoom(
-            read_pair_2.read_dicom_label.arr, resize_dims
+        read_pair_2.read_dicom_label.arr = self.resampler.resample_label(
+            read_pair_2.read_dicom_label.arr, resize_dims, roi, self.label_wise
         )
         return read_pair_2
 
@@ -147,16 +234,37 @@ class ReadMultiImageLabelPair(ReadImageLabelPair):
                 for val in self.get_centroids_by_roi(read_pair_1, read_pair_2)
             ]
         else:
-            return [
-                np.floor(val)
-                for val in self.get_centroids_by_position_patient(
-                    read_pair_1, read_pair_2
-                )
-            ]
+            # read_pair_2 position stays fractional, it is rounded once mapped onto the resized grid
+            pair_1_centroid, pair_2_centroid = self.get_centroids_by_position_patient(
+                read_pair_1, read_pair_2
+            )
+            return pair_1_centroid, pair_2_centroid
 
-    def get_centroids_by_position_patient(self) -> List[int]:
-        """Return coordinate shift to align read_pair_2 array with read_pair_1 by ImagePositionPatient."""
-        assert False, "build out to return center of ImagePositionPatient... "
+    def validate_patient_spaces(self, space_1: PatientSpace, space_2: PatientSpace) -> None:
+        if not "FrameOfReferenceUID" in self.allow:
+            assert (
+                space_1.get_frame_of_reference() == space_2.get_frame_of_reference()
+            ), f"pairs do not share a frame of reference: {space_1.get_frame_of_reference()}:{space_2.get_frame_of_reference()}"
+        if not "ImageOrientationPatient" in self.allow:
+            assert np.allclose(
+                space_1.get_orientation(), space_2.get_orientation(), atol=1e-3
+            ), f"ImageOrientationPatient between pairs does not match, alignment only shifts: {space_1.get_orientation()}:{space_2.get_orientation()}"
+
+    def get_centroids_by_position_patient(
+        self, read_pair_1: ReadImageLabelPair, read_pair_2: ReadImageLabelPair
+    ) -> Tuple[List[float]]:
+        """
+        Return center idx of read_pair_1 volume and idx of the same patient position in read_pair_2,
+        from ImagePositionPatient, ImageOrientationPatient and PixelSpacing headers only (no pixel data).
+        """
+        space_1 = PatientSpace(read_pair_1.read_dicom_image.files)
+        space_2 = PatientSpace(read_pair_2.read_dicom_image.files)
+        self.validate_patient_spaces(space_1, space_2)
+        pair_1_centroid = np.floor(space_1.get_center())
+        return (
+            list(pair_1_centroid),
+            list(space_2.patient_to_index(space_1.index_to_patient(pair_1_centroid))),
+        )
 
     def get_centroids_by_roi(
         self, read_pair_1: ReadImageLabelPair, read_pair_2: ReadImageLabelPair
@@ -166,10 +274,10 @@ class ReadMultiImageLabelPair(ReadImageLabelPair):
         Return
         """
         pair_1_centroid = read_pair_1.viewer.get_center_of_mass(
-            read_pair_1.read_dicom_label.arr
+            self.get_viewer_label(read_pair_1.read_dicom_label)
         )
         pair_2_centroid = read_pair_2.viewer.get_center_of_mass(
-            read_pair_2.read_dicom_label.arr
+            self.get_viewer_label(read_pair_2.read_dicom_label)
         )
         return pair_1_centroid, pair_2_centroid
 
@@ -183,8 +291,11 @@ class ReadMultiImageLabelPair(ReadImageLabelPair):
         read_pair_2.read_dicom_image.arr = self.write_shifted_pixel_data(
             np.copy(empty_array), read_pair_2.read_dicom_image.arr, shift_positions
         )
+        label_array = read_pair_2.read_dicom_label.arr
         read_pair_2.read_dicom_label.arr = self.write_shifted_pixel_data(
-            np.copy(empty_array), read_pair_2.read_dicom_label.arr, shift_positions
+            np.zeros(empty_array.shape, dtype=label_array.dtype),
+            label_array,
+            shift_positions,
         )
         return read_pair_2
 
@@ -218,7 +329,10 @@ class ReadMultiImageLabelPair(ReadImageLabelPair):
         read_pair_2: ReadImageLabelPair,
         pair_1_centroid: Tuple[int],
         pair_2_centroid: Tuple[int],
+        pair_2_shape: Tuple[int] = None,
     ) -> Tuple[int]:
+        if pair_2_shape is None:
+            pair_2_shape = read_pair_2.read_dicom_image.arr.shape
         input_arr_start = list(
             np.array(
                 [int(b - a) for a, b in zip(pair_1_centroid, pair_2_centroid)]
@@ -230,7 +344,7 @@ class ReadMultiImageLabelPair(ReadImageLabelPair):
                 pair_1_centroid,
                 pair_2_centroid,
                 list(read_pair_1.read_dicom_image.arr.shape),
-                list(read_pair_2.read_dicom_image.arr.shape),
+                list(pair_2_shape),
             )
         ]
 
@@ -245,52 +359,47 @@ class ReadMultiImageLabelPair(ReadImageLabelPair):
                 pair_1_centroid,
                 pair_2_centroid,
                 list(read_pair_1.read_dicom_image.arr.shape),
-                list(read_pair_2.read_dicom_image.arr.shape),
+                list(pair_2_shape),
             )
         ]
         return input_arr_start, input_arr_stop, output_arr_start, output_arr_stop
 
+    def crop_shift_positions(self, shift_positions: tuple, roi: Tuple[slice]) -> tuple:
+        """Return shift positions indexing read_pair_2 arrays already cropped to roi (first two entries index read_pair_2)."""
+        input_arr_start, input_arr_stop, output_arr_start, output_arr_stop = shift_positions
+        return (
+            [start - dim.start for start, dim in zip(input_arr_start, roi)],
+            [max(0, stop - dim.start) for stop, dim in zip(input_arr_stop, roi)],
+            output_arr_start,
+            output_arr_stop,
+        )
+
     def get_dsc(self) -> float:
         """Return DSC between 2 labels."""
-        overlap = (
-            self.read_pair_1.read_dicom_label.arr
-            * self.read_pair_2.read_dicom_label.arr
+        label_1, label_2 = self.read_pair_1.read_dicom_label, self.read_pair_2.read_dicom_label
+        if isinstance(label_1, LabelVolume) and isinstance(label_2, LabelVolume):
+            return (2 * label_1.count_overlap(label_2)) / (
+                label_1.count() + label_2.count()
+            )
+        mask_1, mask_2 = label_1.arr > 0, label_2.arr > 0
+        return (2 * np.count_nonzero(mask_1 & mask_2)) / (
+            np.count_nonzero(mask_1) + np.count_nonzero(mask_2)
         )
-        return (2 * np.sum(overlap)) / (
-            np.sum(self.read_pair_1.read_dicom_label.arr)
-            + np.sum(self.read_pair_2.read_dicom_label.arr)
+
+    def get_surface_distances(self, margin: int = 1) -> Dict[str, float]:
+        """Return hausdorff, hd95 and assd (mm) between 2 labels, using spacing of read_pair_1 image."""
+        return SurfaceDistance(
+            self.read_pair_1.read_dicom_image.spacing, margin=margin
+        ).get_surface_distances(
+            self.read_pair_1.read_dicom_label.arr,
+            self.read_pair_2.read_dicom_label.arr,
         )
 
     # SET ARR STUFFS --separate out
 
     def draw_multi_label_array_contours(self, multi_label_array: np.array, overlap: np.array, pixel_data_1: np.array, pixel_data_2: np.array) -> np.array:
-        """Draw contour of 1,2,3 values on multi_label_array."""
-
-        #multi_label_array = cv.cvtColor(multi_label_array, cv.COLOR_BGR2RGB)
-        temp_array = np.zeros((overlap.shape[0],overlap.shape[1]))
-        print(temp_array.shape)
-        #temp_array = cv.cvtColor(temp_array, cv.COLOR_BGR2RGB)
-        print(overlap.shape)
-
-        for sl in range(overlap.shape[2]):
-            #overlap_temp = overlap.astype(np.uint8)[:,:,sl]
-            pixel_data_1_temp = pixel_data_1.astype(np.uint8)[:,:,sl]
-            pixel_data_2_temp = pixel_data_2.astype(np.uint8)[:,:,sl]
-            #ret,thresh = cv.threshold(pixel_data_2_temp,0.5,255,cv.THRESH_BINARY)
-
-            #contour_overlap, _ = cv.findContours(overlap_temp, cv.RETR_EXTERNAL, cv.CHAIN_APPROX_SIMPLE)
-            contour_pixel_data_1, _ = cv.findContours(pixel_data_1_temp, cv.RETR_EXTERNAL, cv.CHAIN_APPROX_SIMPLE)
-            contour_pixel_data_2, _ = cv.findContours(pixel_data_2_temp, cv.RETR_EXTERNAL, cv.CHAIN_APPROX_SIMPLE)
-            # need to consider what order we're drawing for overwriting of values 
-            # might want to play around with line thickness - last arg in drawContours(), or incorporate this as a passable arg 
-            #cv.drawContours(temp_array, contour_overlap, -1, 1, self.contour_thickness)
-            #cv.drawContours(temp_array, contour_pixel_data_1, -1, 2, self.contour_thickness)
-            cv.drawContours(temp_array, contour_pixel_data_2, 0, 3, self.contour_thickness)
-
-            multi_label_array[:,:,sl] = temp_array
-
-        return multi_label_array
-     
+        """Draw contours of pixel_data_1=2, pixel_data_2=3 and shared contours=1 on multi_label_array, only over slices holding labels."""
+        return self.contour_renderer.render(pixel_data_1, pixel_data_2, multi_label_array)
 
     def draw_multi_label_array_overlay(self, multi_label_array: np.array, overlap: np.array, pixel_data_1: np.array, pixel_data_2: np.array) -> np.array:
         """Fill overlay of 1,2,3 values on multi_label_array."""
@@ -304,27 +413,38 @@ class ReadMultiImageLabelPair(ReadImageLabelPair):
     ) -> np.array:
         """Return 2d array with overlap=1, pixel_data_1=2, pixel_data_2=3."""
         assert pixel_data_1.shape == pixel_data_2.shape
-        multi_label_array = np.zeros(pixel_data_1.shape)
-        overlap = pixel_data_1 * pixel_data_2
+        multi_label_array = np.zeros(pixel_data_1.shape, dtype=np.uint8)
         if contour:
-            return self.draw_multi_label_array_contours(multi_label_array, overlap, pixel_data_1, pixel_data_2)
+            return self.draw_multi_label_array_contours(multi_label_array, None, pixel_data_1, pixel_data_2)
         else:
+            overlap = (pixel_data_1 > 0) & (pixel_data_2 > 0)
             return self.draw_multi_label_array_overlay(multi_label_array, overlap, pixel_data_1, pixel_data_2)
 
     # might want to retitle this function for clarity now that it can handle contours in addition to overlay
     def build_rgb_overlay(self, **kwargs) -> np.array:
-
-        rgb_array = self.convert_grayscale_to_rgb(self.read_pair_1.read_dicom_image.arr)
+        """Return (Z, Y, X, 3) overlay of multi label array on read_pair_1 image, lazy unless lazy=False is passed."""
         multi_label_array = self.get_multi_label_array(
             self.read_pair_1.read_dicom_label.arr, self.read_pair_2.read_dicom_label.arr, self.contours
         )
-        self.foreground = np.copy(multi_label_array)
-        self.foreground[multi_label_array > 0] = 1
+        self.foreground = multi_label_array > 0
+        if not ("lazy" in kwargs and not kwargs["lazy"]):
+            return RGBOverlay(
+                self.read_pair_1.read_dicom_image.arr,
+                multi_label_array,
+                self.colors,
+                self.transparency,
+                side_by_side="side_by_side" in kwargs and kwargs["side_by_side"],
+                window=kwargs["window"] if "window" in kwargs else None,
+                rescale=Windowing.get_rescale(self.read_pair_1.read_dicom_image),
+            )
+
+        windowing = self.get_windowing(self.read_pair_1.read_dicom_image, **kwargs)
+        rgb_array = self.convert_grayscale_to_rgb(self.read_pair_1.read_dicom_image.arr, windowing)
 
         rgb_array = self.dampen_mask_regions(rgb_array, self.foreground) # might want to only do this for overlay (not contour)
         rgb_array = self.color_in_labels(rgb_array, multi_label_array)
         if "side_by_side" in kwargs and kwargs["side_by_side"]:
-            gray_array = self.convert_grayscale_to_rgb(self.read_dicom_image.arr)
+            gray_array = self.convert_grayscale_to_rgb(self.read_pair_1.read_dicom_image.arr, windowing)
             rgb_array = np.concatenate((gray_array, rgb_array), axis=1)
         rgb_array = np.swapaxes(rgb_array, 0, -1)
         return rgb_array
\ No newline at end of file
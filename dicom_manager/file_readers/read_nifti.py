@@ -11,16 +11,56 @@ class ReadNifti(ReadImageVolume):
 
     loader = NiftiLoader()
 
-    def __init__(self, target_path: pathlib.Path, value_clip=False):
+    def __init__(self, target_path: pathlib.Path, value_clip=False, dtype=None):
         super().__init__(target_path)
         #         self.files = self.sorter.sort_dicom_files(self.files)
         #         self.validator.validate(self.files)
         self.value_clip = value_clip
-        self.spacing = self.files[0].header.get_zooms()
+        self.dtype = dtype
+        self.spacing = self.get_spacing()
         self.set_arr()
 
+    def get_spacing(self) -> tuple:
+        """Return voxel size as (Y-spacing, X-spacing, step-size), header zooms of the first two axes swap with rot90."""
+        zooms = self.files[0].header.get_zooms()
+        return (zooms[1], zooms[0]) + tuple(zooms[2:])
+
+    def get_data(self) -> np.array:
+        """
+        Return float64 voxel data, or voxel data cast to dtype (e.g. uint8 for labels) without a float64 copy.
+        dtype="native" returns voxel data in its on-disk dtype.
+        """
+        if self.dtype is None:
+            return self.files[0].get_fdata()
+        if isinstance(self.dtype, str) and self.dtype == "native":
+            return np.asanyarray(self.files[0].dataobj)
+        if not np.issubdtype(self.dtype, np.integer):
+            return np.asanyarray(self.files[0].dataobj).astype(self.dtype, copy=False)
+        data = self.get_integer_data()
+        assert (
+            np.amin(data) >= np.iinfo(self.dtype).min
+            and np.amax(data) <= np.iinfo(self.dtype).max
+        ), f"{self.files[0].get_filename()} values exceed {np.dtype(self.dtype).name} range"
+        return data.astype(self.dtype, copy=False)
+
+    def get_integer_data(self) -> np.array:
+        """
+        Return voxel data for casting to an integer dtype. Unscaled data is read as stored,
+        scaled data (scl_slope/scl_inter) is rounded so e.g. 0.9999 is label 1 rather than truncated to 0.
+        """
+        dataobj = self.files[0].dataobj
+        if (
+            hasattr(dataobj, "get_unscaled")
+            and np.issubdtype(dataobj.dtype, np.integer)
+            and dataobj.slope == 1
+            and dataobj.inter == 0
+        ):
+            return dataobj.get_unscaled()
+        data = np.asanyarray(dataobj)
+        return np.rint(data) if data.dtype.kind == "f" else data
+
     def set_arr(self):
-        self.arr = np.rot90(self.files[0].get_fdata(), k=1, axes=(0, 1))  #
+        self.arr = np.rot90(self.get_data(), k=1, axes=(0, 1))  #
         if self.value_clip:
             self.arr = np.clip(self.arr, self.value_clip[0], self.value_clip[1])
         self.viewer = ArrayViewer(self.arr, self.spacing)
@@ -1,5 +1,8 @@
-from matplotlib.patches import Patch
-from matplotlib import pyplot as plt
+try:
+    from matplotlib.patches import Patch
+    from matplotlib import pyplot as plt
+except ImportError:
+    plt = None
 
 
 class ArrayPlotter:
@@ -33,6 +36,7 @@ class ArrayPlotter:
             self.legend_position = kwargs["legend_position"]
 
     def plot_images(self, image_list, **kwargs) -> None:
+        assert plt is not None, "matplotlib is required to plot images"
         self.read_kwargs(**kwargs)
         fig = plt.figure(figsize=(15 * self.zoom, 15 * self.zoom), dpi=64)
         for i in range(1, (1 + len(image_list))):
@@ -4,23 +4,46 @@ import cv2
 import numpy as np
 
 from dicom_manager.file_viewers.array_plotter import ArrayPlotter
+from dicom_manager.file_viewers.windowing import Windowing
 
 
 class ArrayViewer:
 
     plotter = ArrayPlotter()
+    window = None
+    windowing = None
 
-    def __init__(self, arr, spacing):
+    def __init__(self, arr, spacing, rescale: Tuple[float] = (1.0, 0.0)):
         self.arr = arr
         self.spacing = spacing
+        self.rescale = rescale
         return
 
+    def get_windowing(self) -> Windowing:
+        """Return windowing of self.arr, lookup table is only rebuilt when the window changes."""
+        if self.windowing is None or self.windowing.window != self.window:
+            self.windowing = Windowing.from_array(self.arr, self.window, *self.rescale)
+        return self.windowing
+
+    def window_plane(self, plane: np.array) -> np.array:
+        """Return plane windowed to uint8 so it is resized and plotted as uint8."""
+        return self.get_windowing().apply(plane)
+
     def print_range(self) -> None:
         print(f"RANGE: {np.amin(self.arr)}:{np.amax(self.arr)}")
 
+    def get_transverse_plane(self, arr: np.array) -> np.array:
+        return arr[..., int(arr.shape[2] / 2)]
+
+    def get_sagittal_plane(self, arr: np.array) -> np.array:
+        return arr[:, int(arr.shape[0] / 2), :]
+
+    def get_coronal_plane(self, arr: np.array) -> np.array:
+        return arr[int(arr.shape[1] / 2), ...]
+
     def get_transverse(self, arr: np.array, resize_dims: List[int]) -> np.array:
         """Return transverse slice through center for orthogonal preview."""
-        transverse = arr[..., int(arr.shape[2] / 2)]
+        transverse = self.window_plane(self.get_transverse_plane(arr))
         return cv2.resize(
             transverse,
             dsize=(resize_dims[1], resize_dims[0]),
@@ -29,7 +52,9 @@ class ArrayViewer:
 
     def get_sagittal(self, arr: np.array, resize_dims: List[int]) -> np.array:
         """Return sagittal slice through center for orthogonal preview."""
-        sagittal = np.rot90(arr[:, int(arr.shape[0] / 2), :], k=1, axes=(0, 1))
+        sagittal = self.window_plane(
+            np.rot90(self.get_sagittal_plane(arr), k=1, axes=(0, 1))
+        )
         return cv2.resize(
             sagittal,
             dsize=(resize_dims[1], resize_dims[2]),
@@ -38,7 +63,9 @@ class ArrayViewer:
 
     def get_coronal(self, arr: np.array, resize_dims: List[int]) -> np.array:
         """Return coronal slice through center for orthogonal preview."""
-        coronal = np.rot90(arr[int(arr.shape[1] / 2), ...], k=1, axes=(0, 1))
+        coronal = self.window_plane(
+            np.rot90(self.get_coronal_plane(arr), k=1, axes=(0, 1))
+        )
         return cv2.resize(
             coronal,
             dsize=(resize_dims[0], resize_dims[2]),
@@ -58,7 +85,11 @@ class ArrayViewer:
         return transverse, sagittal, coronal
 
     def orthoview(self, **kwargs) -> None:
-        """Plots orthognal slice preview of image volume."""
+        """
+        Plots orthognal slice preview of image volume, window may be a Windowing preset or (center, width).
+        Without window the volume min:max is shown, a window does not carry over to later calls.
+        """
+        self.window = kwargs["window"] if "window" in kwargs else None
         if "print_range" in kwargs and kwargs["print_range"]:
             self.print_range()
         transverse, sagittal, coronal = self.get_orthogonal_slices()
@@ -0,0 +1,61 @@
+"""Draw label contours slice by slice, only over the z-range where labels are present."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+
+class ContourRenderer:
+    def __init__(self, thickness: int = 2, workers: int = 1):
+        self.thickness = thickness
+        self.workers = workers
+
+    def get_z_range(self, *label_arrays: np.array) -> slice:
+        """Return slice of Z indices between first and last slice holding any label, None if all are empty."""
+        present = np.zeros(label_arrays[0].shape[-1], dtype=bool)
+        for label_array in label_arrays:
+            present |= np.any(label_array, axis=(0, 1))
+        slice_nums = np.flatnonzero(present)
+        if not slice_nums.size:
+            return None
+        return slice(int(slice_nums[0]), int(slice_nums[-1]) + 1)
+
+    def get_masks(self, label_array: np.array, z_range: slice) -> np.array:
+        """Return (Z, Y, X) C-contiguous uint8 mask of z_range, converted once so every slice is contiguous."""
+        return np.ascontiguousarray(np.moveaxis(label_array[..., z_range] > 0, -1, 0), dtype=np.uint8)
+
+    def draw_contours(self, mask: np.array) -> np.array:
+        """Return (Y, X) bool image of all external contours of 2d uint8 mask."""
+        contour_image = np.zeros(mask.shape, dtype=np.uint8)
+        if mask.any():
+            contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            cv2.drawContours(contour_image, contours, -1, 1, self.thickness)
+        return contour_image.view(bool)
+
+    def render_slice(self, mask_1: np.array, mask_2: np.array, multi_label_slice: np.array) -> None:
+        """Write label_1 contour=2, label_2 contour=3 and shared contour=1 into (Y, X) multi_label_slice."""
+        contour_1, contour_2 = self.draw_contours(mask_1), self.draw_contours(mask_2)
+        multi_label_slice[contour_1] = 2
+        multi_label_slice[contour_2] = 3
+        multi_label_slice[contour_1 & contour_2] = 1
+
+    def render(
+        self, label_array_1: np.array, label_array_2: np.array, multi_label_array: np.array = None
+    ) -> np.array:
+        """Return (Y, X, Z) uint8 contour array of two (Y, X, Z) labels, slices split across threads."""
+        if multi_label_array is None:
+            multi_label_array = np.zeros(label_array_1.shape, dtype=np.uint8)
+        z_range = self.get_z_range(label_array_1, label_array_2)
+        if z_range is None:
+            return multi_label_array
+        masks_1 = self.get_masks(label_array_1, z_range)
+        masks_2 = self.get_masks(label_array_2, z_range)
+        contour_slices = np.zeros(masks_1.shape, dtype=np.uint8)
+        if self.workers > 1 and len(masks_1) > 1:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                list(executor.map(self.render_slice, masks_1, masks_2, contour_slices))
+        else:
+            list(map(self.render_slice, masks_1, masks_2, contour_slices))
+        multi_label_array[..., z_range] = np.moveaxis(contour_slices, 0, -1)
+        return multi_label_array
@@ -0,0 +1,61 @@
+from typing import List, Tuple
+
+import numpy as np
+
+from dicom_manager.file_viewers.array_viewer import ArrayViewer
+from dicom_manager.file_viewers.windowing import Windowing
+
+
+class PlaneViewer(ArrayViewer):
+    """ArrayViewer of the three pre-read orthogonal planes of a (Y, X, Z) volume that is never loaded in full."""
+
+    def __init__(
+        self,
+        transverse: np.array,
+        sagittal: np.array,
+        coronal: np.array,
+        shape: Tuple[int],
+        spacing: List[float],
+        rescale: Tuple[float] = (1.0, 0.0),
+    ):
+        self.transverse = transverse  # (Y, X) at Z = shape[2] / 2
+        self.sagittal = sagittal  # (Y, Z) at X = shape[0] / 2, same index as ArrayViewer
+        self.coronal = coronal  # (X, Z) at Y = shape[1] / 2
+        self.shape = tuple(shape)
+        self.arr = None
+        self.spacing = spacing
+        self.rescale = rescale
+
+    def get_value_range(self) -> Tuple[float]:
+        """Return min:max over the three planes, stands in for the volume range."""
+        planes = (self.transverse, self.sagittal, self.coronal)
+        return (
+            min(np.amin(plane) for plane in planes),
+            max(np.amax(plane) for plane in planes),
+        )
+
+    def get_windowing(self) -> Windowing:
+        if self.windowing is None or self.windowing.window != self.window:
+            self.windowing = Windowing(
+                self.get_value_range(),
+                self.window,
+                *self.rescale,
+                integer=np.issubdtype(self.transverse.dtype, np.integer),
+            )
+        return self.windowing
+
+    def print_range(self) -> None:
+        print(f"RANGE: {self.get_value_range()[0]}:{self.get_value_range()[1]}")
+
+    def get_transverse_plane(self, arr: np.array) -> np.array:
+        return self.transverse
+
+    def get_sagittal_plane(self, arr: np.array) -> np.array:
+        return self.sagittal
+
+    def get_coronal_plane(self, arr: np.array) -> np.array:
+        return self.coronal
+
+    def get_resize_dimensions(self) -> List[int]:
+        resize_dims = np.multiply(self.shape, self.spacing)
+        return [abs(int(dim)) for dim in resize_dims]
@@ -0,0 +1,163 @@
+"""RGB overlay of a label on a grayscale image, colored only for the planes or slabs that are indexed."""
+
+from typing import List, Tuple
+
+import numpy as np
+
+from dicom_manager.file_readers.label_volume import LabelVolume
+from dicom_manager.file_viewers.windowing import Windowing
+
+
+class RGBOverlay:
+    """
+    Lazy stand-in for the (Z, Y, X, 3) uint8 overlay array built by ReadImageLabelPair.build_rgb_overlay.
+    Indexing windows only the requested image region to uint8 and blends it with its labels through a
+    (label, gray) -> rgb lookup table, so orthoview previews and QC never hold the full RGB volume.
+    """
+
+    def __init__(
+        self,
+        image_array: np.array,
+        label: np.array,  # or LabelVolume
+        colors: List[tuple],
+        transparency: float = 0.3,
+        side_by_side: bool = False,
+        window=None,
+        rescale: Tuple[float] = (1.0, 0.0),
+    ):
+        assert (
+            image_array.shape == label.shape
+        ), f"image and label shape mismatch: {image_array.shape}:{label.shape}"
+        self.image_array = image_array
+        self.label = label
+        self.colors = colors
+        self.transparency = transparency
+        self.side_by_side = side_by_side
+        self.windowing = Windowing.from_array(image_array, window, *rescale)
+        self.lut = self.build_lut()
+
+    @property
+    def shape(self) -> Tuple[int]:
+        rows, columns, slices = self.image_array.shape
+        return (slices, rows * 2 if self.side_by_side else rows, columns, 3)
+
+    @property
+    def ndim(self) -> int:
+        return 4
+
+    @property
+    def dtype(self):
+        return np.dtype(np.uint8)
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __array__(self, dtype=None, copy=None) -> np.array:
+        """
+        Materialize the full overlay, only for callers that need the whole array.
+        Always a new array, so copy=False (no copy allowed, NumPy 2) raises ValueError.
+        """
+        if copy is False:
+            raise ValueError("RGBOverlay is colored on indexing, an array cannot be returned without a copy")
+        rgb_array = self[...]
+        return rgb_array if dtype is None else rgb_array.astype(dtype)
+
+    def build_lut(self) -> np.array:
+        """
+        Return (len(colors) + 1, 256, 3) uint8 table of blended color per label value and gray value.
+        Row 0 is unlabelled gray, matches the dampen then color in steps of the full volume overlay.
+        """
+        gray = np.arange(256, dtype=np.uint8)
+        lut = np.repeat(gray[np.newaxis, :, np.newaxis], len(self.colors) + 1, axis=0)
+        lut = np.repeat(lut, 3, axis=2)
+        dampened = (gray - gray * self.transparency).astype(np.uint8)
+        for label_value, color in enumerate(self.colors, start=1):
+            lut[label_value] = (
+                dampened[:, np.newaxis]
+                + np.array(color, dtype=float)[np.newaxis, :] * self.transparency
+            ).astype(np.uint8)
+        return lut
+
+    def normalize(self, image_block: np.array) -> np.array:
+        """Return image_block windowed to uint8 with the lookup table of the whole image."""
+        return self.windowing.apply(image_block)
+
+    def blend(self, gray_block: np.array, label_block: np.array) -> np.array:
+        """Return (..., 3) uint8 colors of uint8 gray_block under label_block."""
+        if not label_block.size:
+            return np.zeros(label_block.shape + (3,), dtype=np.uint8)
+        assert np.amin(label_block) >= 0, "negative values present in mask"
+        assert np.amax(label_block) <= len(
+            self.colors
+        ), f"label value {np.amax(label_block)} has no color, pass more colors"
+        return self.lut[label_block.astype(np.intp), gray_block]
+
+    def get_block_index(self, key, dim: int) -> Tuple:
+        """Return (contiguous slice to read, index into the read block) for an int or slice key."""
+        if isinstance(key, slice):
+            indices = range(*key.indices(dim))
+            if not len(indices):
+                return slice(0, 0), slice(None)
+            start = min(indices[0], indices[-1])
+            stop = indices[-1] - start + (1 if key.indices(dim)[2] > 0 else -1)
+            return (
+                slice(start, max(indices[0], indices[-1]) + 1),
+                slice(indices[0] - start, stop if stop >= 0 else None, key.indices(dim)[2]),
+            )
+        key = int(key)
+        assert -dim <= key < dim, f"index {key} out of bounds for axis with size {dim}"
+        key = key % dim
+        return slice(key, key + 1), 0
+
+    def get_label_block(self, roi: Tuple[slice]) -> np.array:
+        """Return labels within (Y, X, Z) roi, LabelVolumes only unpack the roi."""
+        if isinstance(self.label, LabelVolume):
+            return self.label.get_block(roi)
+        return self.label[roi]
+
+    def get_region(self, key: Tuple, side: int = 1) -> np.array:
+        """Return (Z, Y, X, 3) indexed region, side 0 is the gray image of side by side overlays."""
+        reads, block_index = zip(
+            *[
+                self.get_block_index(dim_key, dim)
+                for dim_key, dim in zip(key, self.image_array.shape[2:] + self.image_array.shape[:2])
+            ]
+        )
+        roi = (reads[1], reads[2], reads[0])  # (Y, X, Z) of image and label
+        gray_block = np.moveaxis(self.normalize(self.image_array[roi]), -1, 0)
+        if side == 0:
+            rgb_block = np.repeat(gray_block[..., np.newaxis], 3, axis=-1)
+        else:
+            label_block = np.moveaxis(self.get_label_block(roi), -1, 0)
+            rgb_block = self.blend(gray_block, label_block)
+        return rgb_block[block_index]
+
+    def expand_key(self, key) -> Tuple:
+        key = key if isinstance(key, tuple) else (key,)
+        if Ellipsis in key:
+            idx = key.index(Ellipsis)
+            key = key[:idx] + (slice(None),) * (4 - len(key) + 1) + key[idx + 1 :]
+        key = key + (slice(None),) * (4 - len(key))
+        assert len(key) == 4, f"too many indices for (Z, Y, X, 3) overlay: {key}"
+        return key
+
+    def __getitem__(self, key) -> np.array:
+        key = self.expand_key(key)
+        if not self.side_by_side:
+            return self.get_region(key[:3])[(Ellipsis, key[3])]
+        rows = self.image_array.shape[0]
+        if not isinstance(key[1], slice):
+            row = int(key[1]) % self.shape[1]
+            region = self.get_region((key[0], row % rows, key[2]), side=row // rows)
+            return region[(Ellipsis, key[3])]
+        # gray image stacked above overlay along Y
+        row_axis = 1 if isinstance(key[0], slice) else 0
+        rgb_array = np.concatenate(
+            [self.get_region((key[0], slice(None), key[2]), side=side) for side in (0, 1)],
+            axis=row_axis,
+        )
+        return rgb_array[(slice(None),) * row_axis + (key[1], Ellipsis, key[3])]
+
+    def get_slab(self, slab: slice) -> np.array:
+        """Return (Z, Y, X, 3) overlay of a Z slab."""
+        return self[slab]
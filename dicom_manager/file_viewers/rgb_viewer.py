@@ -1,6 +1,7 @@
 from typing import List, Tuple
 
 from dicom_manager.file_viewers.array_viewer import ArrayViewer
+from dicom_manager.file_readers.label_volume import LabelVolume
 
 import cv2
 import scipy
@@ -37,11 +38,11 @@ class RGBViewer(ArrayViewer):
         return self.resize_rgb(sagittal, resize_dims=resize_dims, resize_idx=(0, 2))
 
     def get_center_of_mass(self, label: np.array) -> Tuple[float]:
-        """Return center idx of ROI."""
-        flat_label = np.copy(label)
-        flat_label[flat_label > 1] = 1
-        if np.amax(flat_label) > 0:
-            return scipy.ndimage.center_of_mass(flat_label)
+        """Return center idx of ROI, label as array or LabelVolume."""
+        if isinstance(label, LabelVolume):
+            return label.get_center_of_mass()
+        if np.amax(label) > 0:
+            return scipy.ndimage.center_of_mass(label > 0)
         else:
             # for scans with empty masks
             return [int(dim / 2) for dim in label.shape]
@@ -49,17 +50,12 @@ class RGBViewer(ArrayViewer):
     def resize_rgb(
         self, arr: np.array, resize_dims: Tuple[float], resize_idx: Tuple[int]
     ) -> np.array:
-        """Resize RGB slice so pixel spacing is accounted for."""
-        resized_rgb = np.zeros(
-            [resize_dims[resize_idx[1]], resize_dims[resize_idx[0]], 3]
+        """Resize uint8 RGB slice so pixel spacing is accounted for, all channels in one pass."""
+        return cv2.resize(
+            np.ascontiguousarray(arr, dtype=np.uint8),
+            dsize=(resize_dims[resize_idx[0]], resize_dims[resize_idx[1]]),
+            interpolation=cv2.INTER_CUBIC,
         )
-        for channel in range(3):
-            resized_rgb[..., channel] = cv2.resize(
-                arr[..., channel],
-                dsize=(resize_dims[resize_idx[0]], resize_dims[resize_idx[1]]),
-                interpolation=cv2.INTER_CUBIC,
-            )
-        return resized_rgb.astype("uint8")
 
     def get_resize_dimensions(self):
         """Return voxel size for resizing orthogonal slices."""
@@ -0,0 +1,109 @@
+"""Window grayscale volumes to uint8 for display through a lookup table built once per volume and window."""
+
+from typing import Tuple, Union
+
+import numpy as np
+
+
+class Windowing:
+    """
+    Integer volumes are windowed with np.take into a uint8 table indexed by value - volume minimum,
+    so planes are converted without float arithmetic. Float volumes and value ranges wider than
+    uint16 fall back to clipped linear scaling.
+    Without a window the volume min:max is stretched to 0:255 (same as ReadImageLabelPair.normalize_image).
+    """
+
+    # (center, width) in Hounsfield units
+    presets = {
+        "ct_abdomen": (40, 400),
+        "ct_lung": (-600, 1500),
+        "ct_mediastinum": (50, 350),
+        "ct_bone": (400, 1800),
+        "ct_brain": (40, 80),
+    }
+    max_lut_size = 2**16
+
+    def __init__(
+        self,
+        value_range: Tuple[float],
+        window: Union[str, Tuple[float]] = None,
+        slope: float = 1.0,
+        intercept: float = 0.0,
+        integer: bool = True,
+    ):
+        self.value_range = tuple(int(value) for value in value_range) if integer else value_range
+        self.window = window
+        self.window_range = self.get_window_range(window, slope, intercept)
+        lut_size = int(value_range[1]) - int(value_range[0]) + 1
+        self.lut = (
+            self.build_lut(lut_size)
+            if integer and 0 < lut_size <= self.max_lut_size
+            else None
+        )
+
+    @classmethod
+    def from_array(
+        cls,
+        arr: np.array,
+        window: Union[str, Tuple[float]] = None,
+        slope: float = 1.0,
+        intercept: float = 0.0,
+    ) -> "Windowing":
+        return cls(
+            (np.amin(arr), np.amax(arr)),
+            window,
+            slope,
+            intercept,
+            integer=np.issubdtype(arr.dtype, np.integer) or arr.dtype == bool,
+        )
+
+    @staticmethod
+    def get_rescale(read_image) -> Tuple[float]:
+        """Return (RescaleSlope, RescaleIntercept) of first DICOM file, stored values map to HU with these."""
+        files = getattr(read_image, "files", None)
+        if files and "RescaleIntercept" in files[0]:
+            return (
+                float(getattr(files[0], "RescaleSlope", 1) or 1),
+                float(files[0].RescaleIntercept),
+            )
+        return (1.0, 0.0)
+
+    def get_window_range(
+        self, window: Union[str, Tuple[float]], slope: float, intercept: float
+    ) -> Tuple[float]:
+        """Return (low, high) window in stored pixel values, volume range if no window."""
+        if window is None:
+            return self.value_range
+        if isinstance(window, str):
+            assert (
+                window in self.presets
+            ), f"unknown window preset {window}, choose from {list(self.presets)} or pass (center, width)"
+            window = self.presets[window]
+        center, width = window
+        return (
+            (center - width / 2 - intercept) / slope,
+            (center + width / 2 - intercept) / slope,
+        )
+
+    def scale(self, arr: np.array) -> np.array:
+        """Return arr linearly scaled from window range to clipped 0:255 uint8."""
+        low, high = self.window_range
+        if not high > low:
+            return np.zeros(np.shape(arr), dtype=np.uint8)
+        scaled = (arr - low) / (high - low)
+        scaled *= 255
+        return np.clip(scaled, 0, 255).astype(np.uint8)
+
+    def build_lut(self, lut_size: int) -> np.array:
+        """Return uint8 table of windowed value for every value in volume range."""
+        return self.scale(np.arange(lut_size, dtype=np.float64) + float(self.value_range[0]))
+
+    def apply(self, arr: np.array) -> np.array:
+        """Return uint8 windowed arr, values outside the volume range are clipped."""
+        if self.lut is None:
+            return self.scale(arr)
+        return np.take(
+            self.lut,
+            np.subtract(arr, int(self.value_range[0]), dtype=np.int64),
+            mode="clip",
+        )
@@ -0,0 +1,286 @@
+"""Write label volumes as a single multi-frame, bit-packed DICOM Segmentation object."""
+
+import os
+import datetime
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pydicom as dcm
+from pydicom.dataset import Dataset, FileDataset, FileMetaDataset
+from pydicom.sequence import Sequence
+from pydicom.uid import generate_uid
+
+
+class DicomSegWriter:
+
+    sop_class_uid = "1.2.840.10008.5.1.4.1.1.66.4"  # Segmentation Storage
+    transfer_syntax_uid = "1.2.840.10008.1.2.1"  # Explicit VR Little Endian
+    copied_tags = (
+        "PatientName",
+        "PatientID",
+        "PatientBirthDate",
+        "PatientSex",
+        "StudyInstanceUID",
+        "StudyDate",
+        "StudyTime",
+        "StudyID",
+        "AccessionNumber",
+        "ReferringPhysicianName",
+        "FrameOfReferenceUID",
+    )
+
+    def __init__(self):
+        return
+
+    def build_code(self, value: str, scheme: str, meaning: str) -> Dataset:
+        code = Dataset()
+        code.CodeValue = value
+        code.CodingSchemeDesignator = scheme
+        code.CodeMeaning = meaning
+        return code
+
+    def get_segment_names(
+        self, num_segments: int, label_key: Dict[str, int] = None
+    ) -> Dict[int, str]:
+        """Return {segment_number: name}, segment numbers equal mask values."""
+        segment_names = {
+            segment_number: f"label {segment_number}"
+            for segment_number in range(1, num_segments + 1)
+        }
+        if label_key:
+            for label_name, label_value in label_key.items():
+                if label_value in segment_names:
+                    segment_names[label_value] = label_name
+        return segment_names
+
+    def build_segment_sequence(self, segment_names: Dict[int, str]) -> Sequence:
+        segments = []
+        for segment_number, segment_name in segment_names.items():
+            segment = Dataset()
+            segment.SegmentNumber = segment_number
+            segment.SegmentLabel = segment_name
+            segment.SegmentAlgorithmType = "AUTOMATIC"
+            segment.SegmentAlgorithmName = "dicom_manager"
+            segment.SegmentedPropertyCategoryCodeSequence = Sequence(
+                [self.build_code("85756007", "SCT", "Tissue")]
+            )
+            segment.SegmentedPropertyTypeCodeSequence = Sequence(
+                [self.build_code("85756007", "SCT", "Tissue")]
+            )
+            segments.append(segment)
+        return Sequence(segments)
+
+    def get_frames(
+        self, label_array: np.array, num_segments: int
+    ) -> Tuple[np.array, List[Tuple[int, int]]]:
+        """
+        Return non-empty (frames, Y, X) boolean masks for (Y, X, Z) label array,
+        with (segment_number, slice_num) for each frame.
+        """
+        frames, frame_positions = [], []
+        for segment_number in range(1, num_segments + 1):
+            segment_mask = label_array == segment_number
+            slice_nums = np.flatnonzero(segment_mask.any(axis=(0, 1)))
+            frames.append(np.moveaxis(segment_mask[..., slice_nums], -1, 0))
+            frame_positions += [
+                (segment_number, int(slice_num)) for slice_num in slice_nums
+            ]
+        if not frame_positions:
+            # segmentation objects require at least one frame, even for empty masks
+            return np.zeros((1, *label_array.shape[:2]), dtype=bool), [(1, 0)]
+        return np.concatenate(frames), frame_positions
+
+    def pack_frames(self, frames: np.array) -> bytes:
+        """Return frames as little endian bit-packed PixelData, padded to even length."""
+        pixel_data = np.packbits(frames.ravel(), bitorder="little").tobytes()
+        if len(pixel_data) % 2:
+            pixel_data += b"\x00"
+        return pixel_data
+
+    def build_dimension_index(self, dimension_organization_uid: str) -> Sequence:
+        segment_dimension = Dataset()
+        segment_dimension.DimensionOrganizationUID = dimension_organization_uid
+        segment_dimension.DimensionIndexPointer = dcm.tag.Tag("ReferencedSegmentNumber")
+        segment_dimension.FunctionalGroupPointer = dcm.tag.Tag(
+            "SegmentIdentificationSequence"
+        )
+        position_dimension = Dataset()
+        position_dimension.DimensionOrganizationUID = dimension_organization_uid
+        position_dimension.DimensionIndexPointer = dcm.tag.Tag("ImagePositionPatient")
+        position_dimension.FunctionalGroupPointer = dcm.tag.Tag(
+            "PlanePositionSequence"
+        )
+        return Sequence([segment_dimension, position_dimension])
+
+    def build_shared_functional_groups(
+        self, dicom_file: dcm.dataset.Dataset, spacing: List[float]
+    ) -> Sequence:
+        pixel_measures = Dataset()
+        pixel_measures.PixelSpacing = [float(dim) for dim in spacing[:2]]
+        pixel_measures.SliceThickness = getattr(
+            dicom_file, "SliceThickness", abs(float(spacing[2]))
+        )
+        pixel_measures.SpacingBetweenSlices = abs(float(spacing[2]))
+        shared_functional_groups = Dataset()
+        shared_functional_groups.PixelMeasuresSequence = Sequence([pixel_measures])
+        if hasattr(dicom_file, "ImageOrientationPatient"):
+            plane_orientation = Dataset()
+            plane_orientation.ImageOrientationPatient = (
+                dicom_file.ImageOrientationPatient
+            )
+            shared_functional_groups.PlaneOrientationSequence = Sequence(
+                [plane_orientation]
+            )
+        return Sequence([shared_functional_groups])
+
+    def build_per_frame_functional_groups(
+        self,
+        dicom_files: List[dcm.dataset.Dataset],
+        frame_positions: List[Tuple[int, int]],
+    ) -> Sequence:
+        purpose_of_reference = self.build_code(
+            "121322", "DCM", "Source image for image processing operation"
+        )
+        derivation_code = self.build_code("113076", "DCM", "Segmentation")
+        per_frame_functional_groups = []
+        for segment_number, slice_num in frame_positions:
+            source_image = Dataset()
+            source_image.ReferencedSOPClassUID = dicom_files[slice_num].SOPClassUID
+            source_image.ReferencedSOPInstanceUID = dicom_files[
+                slice_num
+            ].SOPInstanceUID
+            source_image.PurposeOfReferenceCodeSequence = Sequence(
+                [purpose_of_reference]
+            )
+            derivation_image = Dataset()
+            derivation_image.DerivationCodeSequence = Sequence([derivation_code])
+            derivation_image.SourceImageSequence = Sequence([source_image])
+
+            frame_content = Dataset()
+            frame_content.DimensionIndexValues = [segment_number, slice_num + 1]
+
+            segment_identification = Dataset()
+            segment_identification.ReferencedSegmentNumber = segment_number
+
+            frame_functional_groups = Dataset()
+            frame_functional_groups.DerivationImageSequence = Sequence(
+                [derivation_image]
+            )
+            frame_functional_groups.FrameContentSequence = Sequence([frame_content])
+            frame_functional_groups.SegmentIdentificationSequence = Sequence(
+                [segment_identification]
+            )
+            if hasattr(dicom_files[slice_num], "ImagePositionPatient"):
+                plane_position = Dataset()
+                plane_position.ImagePositionPatient = dicom_files[
+                    slice_num
+                ].ImagePositionPatient
+                frame_functional_groups.PlanePositionSequence = Sequence(
+                    [plane_position]
+                )
+            per_frame_functional_groups.append(frame_functional_groups)
+        return Sequence(per_frame_functional_groups)
+
+    def build_referenced_series(
+        self, dicom_files: List[dcm.dataset.Dataset]
+    ) -> Sequence:
+        """Reference every source instance in slice order, readers use this order to rebuild the volume."""
+        referenced_instances = []
+        for dicom_file in dicom_files:
+            referenced_instance = Dataset()
+            referenced_instance.ReferencedSOPClassUID = dicom_file.SOPClassUID
+            referenced_instance.ReferencedSOPInstanceUID = dicom_file.SOPInstanceUID
+            referenced_instances.append(referenced_instance)
+        referenced_series = Dataset()
+        referenced_series.SeriesInstanceUID = dicom_files[0].SeriesInstanceUID
+        referenced_series.ReferencedInstanceSequence = Sequence(referenced_instances)
+        return Sequence([referenced_series])
+
+    def build_seg(
+        self,
+        label_array: np.array,
+        dicom_files: List[dcm.dataset.Dataset],
+        spacing: List[float],
+        label_key: Dict[str, int] = None,
+    ) -> FileDataset:
+        """Return DICOM SEG dataset for (Y, X, Z) label array referencing sorted source dicom_files."""
+        assert (
+            label_array.shape[-1] == len(dicom_files)
+        ), f"{label_array.shape[-1]} label slices for {len(dicom_files)} source DICOM files"
+        assert np.amin(label_array) >= 0, "negative values present in mask"
+        num_segments = max(1, int(np.amax(label_array)))
+        frames, frame_positions = self.get_frames(label_array, num_segments)
+
+        file_meta = FileMetaDataset()
+        file_meta.MediaStorageSOPClassUID = self.sop_class_uid
+        file_meta.MediaStorageSOPInstanceUID = generate_uid()
+        file_meta.TransferSyntaxUID = self.transfer_syntax_uid
+        seg = FileDataset(None, {}, file_meta=file_meta, preamble=b"\0" * 128)
+
+        for tag in self.copied_tags:
+            if hasattr(dicom_files[0], tag):
+                setattr(seg, tag, getattr(dicom_files[0], tag))
+        now = datetime.datetime.now()
+        seg.SOPClassUID = self.sop_class_uid
+        seg.SOPInstanceUID = file_meta.MediaStorageSOPInstanceUID
+        seg.SeriesInstanceUID = generate_uid()
+        seg.SeriesNumber = int(getattr(dicom_files[0], "SeriesNumber", 0) or 0) + 1000
+        seg.InstanceNumber = 1
+        seg.Modality = "SEG"
+        seg.SeriesDescription = "Segmentation"
+        seg.ContentLabel = "SEGMENTATION"
+        seg.ContentDescription = "postprocessed segmentation"
+        seg.ContentCreatorName = "dicom_manager"
+        seg.ContentDate = now.strftime("%Y%m%d")
+        seg.ContentTime = now.strftime("%H%M%S")
+        seg.Manufacturer = "dicom_manager"
+        seg.ManufacturerModelName = "dicom_manager"
+        seg.DeviceSerialNumber = "0"
+        seg.SoftwareVersions = "0"
+
+        seg.ImageType = ["DERIVED", "PRIMARY"]
+        seg.SamplesPerPixel = 1
+        seg.PhotometricInterpretation = "MONOCHROME2"
+        seg.Rows, seg.Columns = label_array.shape[:2]
+        seg.BitsAllocated = 1
+        seg.BitsStored = 1
+        seg.HighBit = 0
+        seg.PixelRepresentation = 0
+        seg.LossyImageCompression = "00"
+        seg.SegmentationType = "BINARY"
+        seg.NumberOfFrames = len(frame_positions)
+
+        dimension_organization_uid = generate_uid()
+        dimension_organization = Dataset()
+        dimension_organization.DimensionOrganizationUID = dimension_organization_uid
+        seg.DimensionOrganizationSequence = Sequence([dimension_organization])
+        seg.DimensionIndexSequence = self.build_dimension_index(
+            dimension_organization_uid
+        )
+        seg.SegmentSequence = self.build_segment_sequence(
+            self.get_segment_names(num_segments, label_key)
+        )
+        seg.SharedFunctionalGroupsSequence = self.build_shared_functional_groups(
+            dicom_files[0], spacing
+        )
+        seg.PerFrameFunctionalGroupsSequence = self.build_per_frame_functional_groups(
+            dicom_files, frame_positions
+        )
+        seg.ReferencedSeriesSequence = self.build_referenced_series(dicom_files)
+        seg.PixelData = self.pack_frames(frames)
+        seg["PixelData"].VR = "OB"
+        return seg
+
+    def save_seg(
+        self,
+        label_array: np.array,
+        dicom_files: List[dcm.dataset.Dataset],
+        spacing: List[float],
+        destination_dir: str,
+        label_key: Dict[str, int] = None,
+    ) -> None:
+        """Save label array as single DICOM SEG file in target directory."""
+        if not os.path.exists(destination_dir):
+            os.makedirs(destination_dir)
+        seg = self.build_seg(label_array, dicom_files, spacing, label_key)
+        seg.save_as(os.path.join(destination_dir, "seg.dcm"))
@@ -1,48 +1,288 @@
 import os
+import copy
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from typing import List
 
 import numpy as np
 import pydicom as dcm
+from pydicom.encaps import encapsulate
+
+try:
+    from pydicom.pixels import get_encoder
+except ImportError:
+    # pydicom < 3.0
+    from pydicom.encoders import get_encoder
 
 
 class DicomWriter:
+
+    transfer_syntaxes = {
+        "uncompressed": "1.2.840.10008.1.2",  # Implicit VR Little Endian
+        "deflate": "1.2.840.10008.1.2.1.99",  # Deflated Explicit VR Little Endian
+        "rle": "1.2.840.10008.1.2.5",  # RLE Lossless
+        "jpeg-ls": "1.2.840.10008.1.2.4.80",  # JPEG-LS Lossless
+    }
+    encapsulated = ("rle", "jpeg-ls")
+    pixel_tags = (
+        "PixelData",
+        "BitsAllocated",
+        "BitsStored",
+        "HighBit",
+        "PixelRepresentation",
+    )
+
     def __init__(self):
         return
 
-    def save_all(self, dicom_files: List[dcm.dataset.Dataset], destination_dir: str):
-        """Save all dicom files in list to target directory."""
+    def save_file(self, dicom_file: dcm.dataset.Dataset, write_path: str) -> None:
+        dicom_file.save_as(write_path)
+
+    def save_all(
+        self,
+        dicom_files: List[dcm.dataset.Dataset],
+        destination_dir: str,
+        compression: str = "uncompressed",
+        workers: int = 1,
+    ):
+        """Save all dicom files in list to target directory, compressed with lossless compression transfer syntax."""
         if not os.path.exists(destination_dir):
             os.makedirs(destination_dir)
-        for num, dicom_file in enumerate(dicom_files):
-            dicom_file.save_as(
-                os.path.join(destination_dir, f"{str(num).zfill(4)}.dcm")
-            )
+        dicom_files = self.compress_all(dicom_files, compression, workers)
+        write_paths = [
+            os.path.join(destination_dir, f"{str(num).zfill(4)}.dcm")
+            for num in range(len(dicom_files))
+        ]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(self.save_file, dicom_files, write_paths))
+
+    def get_transfer_syntax(self, compression: str) -> str:
+        """Return transfer syntax UID for compression option, asserting an encoder is installed."""
+        assert (
+            compression in self.transfer_syntaxes
+        ), f"compression must be one of {list(self.transfer_syntaxes.keys())}, not {compression}"
+        if compression in self.encapsulated:
+            try:
+                available = get_encoder(self.transfer_syntaxes[compression]).is_available
+            except NotImplementedError:
+                available = False
+            assert (
+                available
+            ), f"no {compression} encoder available, install an encoding plugin (e.g. pylibjpeg-rle, pyjpegls or gdcm)"
+        return self.transfer_syntaxes[compression]
+
+    def set_transfer_syntax(
+        self, dicom_file: dcm.dataset.Dataset, transfer_syntax_uid: str
+    ) -> dcm.dataset.Dataset:
+        """Set transfer syntax, save_as derives the dataset encoding from it."""
+        dicom_file.file_meta.TransferSyntaxUID = transfer_syntax_uid
+        return dicom_file
+
+    def get_encoding_kwargs(self, dicom_file: dcm.dataset.Dataset) -> dict:
+        """Return pixel module description required by pydicom encoders."""
+        return {
+            "rows": dicom_file.Rows,
+            "columns": dicom_file.Columns,
+            "samples_per_pixel": dicom_file.SamplesPerPixel,
+            "bits_allocated": dicom_file.BitsAllocated,
+            "bits_stored": dicom_file.BitsStored,
+            "pixel_representation": dicom_file.PixelRepresentation,
+            "photometric_interpretation": dicom_file.PhotometricInterpretation,
+            "number_of_frames": 1,
+        }
+
+    @staticmethod
+    def encode_frame(
+        transfer_syntax_uid: str, pixel_array: np.array, encoding_kwargs: dict
+    ) -> bytes:
+        """Return single frame encoded with transfer syntax (static so it can run in worker processes)."""
+        return get_encoder(transfer_syntax_uid).encode(pixel_array, **encoding_kwargs)
+
+    def encode_all(
+        self,
+        dicom_files: List[dcm.dataset.Dataset],
+        transfer_syntax_uid: str,
+        workers: int,
+    ) -> List[bytes]:
+        """Return encoded frames for all files, split across worker processes."""
+        frame_args = (
+            [transfer_syntax_uid] * len(dicom_files),
+            [dicom_file.pixel_array for dicom_file in dicom_files],
+            [self.get_encoding_kwargs(dicom_file) for dicom_file in dicom_files],
+        )
+        if workers > 1 and len(dicom_files) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                return list(
+                    executor.map(
+                        self.encode_frame,
+                        *frame_args,
+                        chunksize=max(1, len(dicom_files) // (4 * workers)),
+                    )
+                )
+        return list(map(self.encode_frame, *frame_args))
+
+    def compress_all(
+        self,
+        dicom_files: List[dcm.dataset.Dataset],
+        compression: str = "uncompressed",
+        workers: int = 1,
+    ) -> List[dcm.dataset.Dataset]:
+        """Set files to lossless compression transfer syntax, encoding PixelData when encapsulated."""
+        if compression == "uncompressed":
+            return dicom_files
+        transfer_syntax_uid = self.get_transfer_syntax(compression)
+        if compression in self.encapsulated:
+            for dicom_file, frame in zip(
+                dicom_files,
+                self.encode_all(dicom_files, transfer_syntax_uid, workers),
+            ):
+                dicom_file.PixelData = encapsulate([frame])
+                dicom_file["PixelData"].VR = "OB"
+                dicom_file["PixelData"].is_undefined_length = True
+        for dicom_file in dicom_files:
+            self.set_transfer_syntax(dicom_file, transfer_syntax_uid)
+        return dicom_files
 
     def decompress_dicom(self, dicom_file: dcm.dataset.Dataset) -> dcm.dataset.Dataset:
         """Set metadata as decompressed so preprocessed arrays save properly."""
-        dicom_file.file_meta.TransferSyntaxUID = "1.2.840.10008.1.2"
-        dicom_file.file_meta.is_little_endian = True
-        dicom_file.file_meta.is_implicit_VR = True
-        dicom_file.PixelRepresentation = 1
+        dicom_file.file_meta.TransferSyntaxUID = self.transfer_syntaxes["uncompressed"]
+        return dicom_file
+
+    def copy_header(self, dicom_file: dcm.dataset.Dataset) -> dcm.dataset.Dataset:
+        """Return deep copy of DICOM file without duplicating PixelData or cached pixel_array."""
+        memo = {
+            id(value): None
+            for value in (
+                dicom_file.get("PixelData"),
+                getattr(dicom_file, "_pixel_array", None),
+            )
+            if value is not None
+        }
+        return copy.deepcopy(dicom_file, memo)
+
+    def get_varying_tags(self, dicom_files: List[dcm.dataset.Dataset]) -> set:
+        """Return tags whose value differs from the first file in any file, or is missing from any file."""
+        template = dicom_files[0]
+        varying_tags = set()
+        for dicom_file in dicom_files[1:]:
+            for element in dicom_file:
+                if element.tag in varying_tags or element.keyword in self.pixel_tags:
+                    continue
+                if not element.tag in template or template[element.tag].value != element.value:
+                    varying_tags.add(element.tag)
+            varying_tags.update(tag for tag in template.keys() if not tag in dicom_file)
+        return varying_tags
+
+    def build_slice_header(
+        self,
+        template: dcm.dataset.Dataset,
+        dicom_file: dcm.dataset.Dataset,
+        varying_tags: set,
+    ) -> dcm.dataset.Dataset:
+        """Return header sharing template elements, with elements of varying tags taken from dicom_file."""
+        file_meta = dcm.dataset.FileMetaDataset()
+        for element in getattr(template, "file_meta", []):
+            file_meta[element.tag] = copy.copy(element)
+        if "MediaStorageSOPInstanceUID" in file_meta and "SOPInstanceUID" in dicom_file:
+            file_meta.MediaStorageSOPInstanceUID = dicom_file.SOPInstanceUID
+        slice_header = dcm.dataset.FileDataset(
+            "", {}, file_meta=file_meta, preamble=getattr(template, "preamble", None)
+        )
+        slice_header.update(template)
+        for tag in varying_tags:
+            if tag in dicom_file:
+                slice_header[tag] = dicom_file[tag]
+            elif tag in slice_header:
+                del slice_header[tag]
+        return slice_header
+
+    def build_slice_headers(
+        self, dicom_files: List[dcm.dataset.Dataset]
+    ) -> List[dcm.dataset.Dataset]:
+        """
+        Return headers for dicom_files from a single template copy of the first header plus per slice overrides,
+        instead of a deep copy per slice. Elements are shared between headers, so replace elements rather
+        than editing their values in place. Pixel tags are left unset for write_array_to_dicom.
+        """
+        template = self.copy_header(dicom_files[0])
+        for keyword in self.pixel_tags:
+            if keyword in template:
+                delattr(template, keyword)
+        varying_tags = self.get_varying_tags(dicom_files)
+        return [
+            self.build_slice_header(template, dicom_file, varying_tags)
+            for dicom_file in dicom_files
+        ]
+
+    def get_pixel_dtype(self, pixel_array: np.array) -> np.dtype:
+        """Return little endian integer dtype able to store pixel_array values without wrapping."""
+        if pixel_array.dtype == bool:
+            return np.dtype("<u1")
+        if pixel_array.dtype.kind in "iu" and pixel_array.dtype.itemsize <= 2:
+            return pixel_array.dtype.newbyteorder("<")
+        min_value, max_value = (
+            (np.amin(pixel_array), np.amax(pixel_array))
+            if pixel_array.size
+            else (0, 0)
+        )
+        candidates = ("int16", "int32") if min_value < 0 else ("uint16", "uint32")
+        for candidate in candidates:
+            if (
+                np.iinfo(candidate).min <= min_value
+                and max_value <= np.iinfo(candidate).max
+            ):
+                return np.dtype(candidate).newbyteorder("<")
+        raise ValueError(f"pixel values {min_value}:{max_value} exceed 32 bit DICOM range")
+
+    def set_pixel_tags(
+        self, dicom_file: dcm.dataset.Dataset, dtype: np.dtype
+    ) -> dcm.dataset.Dataset:
+        """Set pixel module tags to describe dtype of written PixelData."""
+        dicom_file.BitsAllocated = dtype.itemsize * 8
+        dicom_file.BitsStored = dtype.itemsize * 8
+        dicom_file.HighBit = dtype.itemsize * 8 - 1
+        dicom_file.PixelRepresentation = int(dtype.kind == "i")
         return dicom_file
 
+    def get_slice_buffer(self, pixel_array_volume: np.array, dtype: np.dtype) -> np.array:
+        """Return (Z, Y, X) C-contiguous copy of (Y, X, Z) volume cast to dtype, so each slice is contiguous."""
+        if pixel_array_volume.dtype.kind == "f":
+            pixel_array_volume = np.rint(pixel_array_volume)
+        return np.moveaxis(pixel_array_volume, -1, 0).astype(dtype, order="C")
+
     def write_array_to_dicom(
-        self, pixel_array: np.array, dicom_file: dcm.dataset.Dataset
+        self,
+        pixel_array: np.array,
+        dicom_file: dcm.dataset.Dataset,
+        dtype: np.dtype = None,
     ) -> dcm.dataset.Dataset:
-        """Write 2d preprocessed pixel array to DICOM file."""
+        """Write 2d preprocessed pixel array to DICOM file as bytes of dtype."""
+        if dtype is None:
+            dtype = self.get_pixel_dtype(pixel_array)
+        if pixel_array.dtype.kind == "f":
+            pixel_array = np.rint(pixel_array)
+        pixel_array = np.ascontiguousarray(pixel_array, dtype=dtype)
         dicom_file = self.decompress_dicom(dicom_file)
-        dicom_file.PixelData = pixel_array.astype("uint16").tobytes()
-        # dicom_file.PixelData = pixel_array.tobytes()
+        dicom_file = self.set_pixel_tags(dicom_file, dtype)
+        # bytes rather than a view of the buffer, datasets must stay deep copyable
+        dicom_file.PixelData = pixel_array.tobytes()
         return dicom_file
 
     def write_array_volume_to_dicom(
         self, pixel_array_volume: np.array, dicom_files: List[dcm.dataset.Dataset]
     ) -> List[dcm.dataset.Dataset]:
-        """Write 3d preprocessed pixel array to list of DICOM files."""
+        """
+        Write 3d preprocessed pixel array to list of DICOM files.
+        Volume is cast once to a Z-major buffer, each file receives the bytes of its contiguous slice.
+        """
         assert pixel_array_volume is not None, "pixel_array value cannot be None"
+        assert (
+            pixel_array_volume.shape[-1] == len(dicom_files)
+        ), f"{pixel_array_volume.shape[-1]} slices in pixel array for {len(dicom_files)} DICOM files"
+        dtype = self.get_pixel_dtype(pixel_array_volume)
+        slice_buffer = self.get_slice_buffer(pixel_array_volume, dtype)
         for num, dicom_file in enumerate(dicom_files):
             dicom_file = self.write_array_to_dicom(
-                pixel_array_volume[..., num], dicom_file
+                slice_buffer[num], dicom_file, dtype=dtype
             )
         return dicom_files
 
@@ -0,0 +1,150 @@
+"""Compose and encode QC images directly with cv2, without building matplotlib figures."""
+
+import pathlib
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice, repeat
+from typing import Iterable, List
+
+import cv2
+import numpy as np
+
+
+class QCImageWriter:
+    """
+    Write uint8 RGB or grayscale QC images as PNG or JPEG, legends drawn with cv2.
+    write_all encodes images across self.workers threads (cv2 releases the GIL while resizing and encoding,
+    and slices are not copied to worker processes), submitting at most workers * chunk_size images at a time
+    so a full volume of slices is never held in memory.
+    """
+
+    image_formats = ("png", "jpg", "jpeg")
+    legend_positions = ("upper left", "upper right", "lower left", "lower right")
+
+    def __init__(
+        self,
+        image_format: str = "png",
+        workers: int = 1,
+        jpeg_quality: int = 95,
+        png_compression: int = 1,
+        chunk_size: int = 8,
+    ):
+        assert (
+            image_format in self.image_formats
+        ), f"image_format must be one of {self.image_formats}, not {image_format}"
+        self.image_format = image_format
+        self.workers = workers
+        self.jpeg_quality = jpeg_quality
+        self.png_compression = png_compression
+        self.chunk_size = chunk_size
+
+    def get_write_path(self, write_path: pathlib.Path) -> pathlib.Path:
+        """Return write_path with image format extension."""
+        return f"{write_path}.{self.image_format}"
+
+    def get_encode_params(self) -> List[int]:
+        if self.image_format == "png":
+            return [cv2.IMWRITE_PNG_COMPRESSION, self.png_compression]
+        return [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality]
+
+    def to_rgb(self, image: np.array) -> np.array:
+        """Return (Y, X, 3) uint8 image, grayscale planes are repeated across channels."""
+        if image.dtype != np.uint8:
+            image = np.clip(image, 0, 255).astype(np.uint8)
+        if image.ndim == 2:
+            image = np.repeat(image[..., np.newaxis], 3, axis=-1)
+        return np.ascontiguousarray(image)
+
+    def draw_legend(
+        self,
+        image: np.array,
+        legend: List[list],
+        legend_position: str = "upper left",
+        legend_size: int = 1,
+    ) -> np.array:
+        """Draw [[name, hex color], ...] legend entries as color patches with labels in image corner."""
+        assert (
+            legend_position in self.legend_positions
+        ), f"legend_position must be one of {self.legend_positions}, not {legend_position}"
+        font_scale = 0.4 * legend_size
+        row_height = int(16 * legend_size)
+        text_widths = [
+            cv2.getTextSize(str(name), cv2.FONT_HERSHEY_SIMPLEX, font_scale, 1)[0][0]
+            for name, _ in legend
+        ]
+        box_width = max(text_widths) + row_height + 12
+        box_height = row_height * len(legend) + 8
+        top = 4 if legend_position.startswith("upper") else image.shape[0] - box_height - 4
+        left = 4 if legend_position.endswith("left") else image.shape[1] - box_width - 4
+        top, left = max(0, top), max(0, left)
+        cv2.rectangle(image, (left, top), (left + box_width, top + box_height), (255, 255, 255), -1)
+        for row, (name, color) in enumerate(legend):
+            rgb = tuple(int(color.strip("#")[i : i + 2], 16) for i in (0, 2, 4))
+            row_top = top + 4 + row * row_height
+            cv2.rectangle(
+                image,
+                (left + 4, row_top + 2),
+                (left + row_height, row_top + row_height - 2),
+                rgb,
+                -1,
+            )
+            cv2.putText(
+                image,
+                str(name),
+                (left + row_height + 6, row_top + row_height - 4),
+                cv2.FONT_HERSHEY_SIMPLEX,
+                font_scale,
+                (0, 0, 0),
+                1,
+                cv2.LINE_AA,
+            )
+        return image
+
+    def compose(self, image: np.array, **kwargs) -> np.array:
+        """Return RGB image scaled by zoom with legend drawn, using the same kwargs as ArrayPlotter."""
+        image = self.to_rgb(image)
+        if "zoom" in kwargs and kwargs["zoom"] != 1:
+            image = cv2.resize(
+                image,
+                dsize=(int(image.shape[1] * kwargs["zoom"]), int(image.shape[0] * kwargs["zoom"])),
+                interpolation=cv2.INTER_NEAREST,
+            )
+        if "legend" in kwargs and kwargs["legend"]:
+            image = self.draw_legend(
+                image,
+                kwargs["legend"],
+                kwargs["legend_position"] if "legend_position" in kwargs else "upper left",
+                kwargs["legend_size"] if "legend_size" in kwargs else 1,
+            )
+        return image
+
+    def write(self, write_path: pathlib.Path, image: np.array, **kwargs) -> None:
+        """Compose and encode single QC image, write_path includes extension."""
+        image = self.compose(image, **kwargs)
+        assert cv2.imwrite(
+            str(write_path), cv2.cvtColor(image, cv2.COLOR_RGB2BGR), self.get_encode_params()
+        ), f"failed to write QC image {write_path}"
+
+    def write_kwargs(self, write_path: pathlib.Path, image: np.array, kwargs: dict) -> None:
+        self.write(write_path, image, **kwargs)
+
+    def write_all(
+        self, write_paths: List[pathlib.Path], images: Iterable[np.array], **kwargs
+    ) -> None:
+        """Write images (any iterable, e.g. a generator of slices) to write_paths."""
+        if self.workers <= 1 or len(write_paths) <= 1:
+            for write_path, image in zip(write_paths, images):
+                self.write(write_path, image, **kwargs)
+            return
+        images = iter(images)
+        chunk = self.workers * self.chunk_size
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for start in range(0, len(write_paths), chunk):
+                chunk_paths = write_paths[start : start + chunk]
+                list(
+                    executor.map(
+                        self.write_kwargs,
+                        chunk_paths,
+                        islice(images, len(chunk_paths)),
+                        repeat(kwargs),
+                    )
+                )
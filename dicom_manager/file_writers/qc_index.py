@@ -0,0 +1,72 @@
+"""Sidecar index of QC fingerprints so unchanged cases are not re-rendered."""
+
+import hashlib
+import json
+import os
+import pathlib
+from typing import Dict
+
+
+class QCIndex:
+    """
+    {case: fingerprint} stored as json in the QC directory. A case fingerprint hashes the name, size and
+    mtime of every postprocessed image and label file together with the QC render parameters,
+    so only file stats are read to decide that a case is unchanged.
+    """
+
+    def __init__(self, DIR_QC: pathlib.Path, index_name: str = "qc_index.json"):
+        self.index_path = os.path.join(DIR_QC, index_name)
+        self.fingerprints = self.load()
+
+    def load(self) -> Dict[str, str]:
+        if not os.path.exists(self.index_path):
+            return {}
+        try:
+            with open(self.index_path) as f:
+                return json.load(f)
+        except (json.JSONDecodeError, OSError):
+            # unreadable index only costs a full re-render
+            return {}
+
+    def save(self) -> None:
+        """Write index atomically so an interrupted run never leaves a partial index."""
+        if not os.path.exists(os.path.dirname(self.index_path)):
+            os.makedirs(os.path.dirname(self.index_path))
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.fingerprints, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.index_path)
+
+    def get_dir_stats(self, target_dir: pathlib.Path) -> list:
+        if not os.path.isdir(target_dir):
+            return []
+        return sorted(
+            (entry.name, entry.stat().st_size, entry.stat().st_mtime_ns)
+            for entry in os.scandir(target_dir)
+        )
+
+    def get_fingerprint(
+        self, image_dir: pathlib.Path, label_dir: pathlib.Path, params: dict
+    ) -> str:
+        """Return hash of image and label file stats and render params, params must be json serializable or repr-able."""
+        return hashlib.sha1(
+            json.dumps(
+                {
+                    "image": self.get_dir_stats(image_dir),
+                    "label": self.get_dir_stats(label_dir),
+                    "params": params,
+                },
+                sort_keys=True,
+                default=repr,
+            ).encode()
+        ).hexdigest()
+
+    def is_current(self, case: str, fingerprint: str, output_path: pathlib.Path) -> bool:
+        """Return True if case was rendered with fingerprint and its QC output still exists."""
+        return self.fingerprints.get(case) == fingerprint and os.path.exists(output_path)
+
+    def update(self, case: str, fingerprint: str) -> None:
+        self.fingerprints[case] = fingerprint
+
+    def remove(self, case: str) -> None:
+        self.fingerprints.pop(case, None)
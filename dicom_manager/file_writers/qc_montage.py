@@ -0,0 +1,142 @@
+"""Tile downsampled per-case QC images into paged contact sheets."""
+
+import os
+import pathlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List
+
+import cv2
+import numpy as np
+from tqdm import tqdm
+
+from dicom_manager.file_writers.qc_image_writer import QCImageWriter
+
+
+class QCMontage:
+    """
+    Render one tile per case with render(case) -> RGB/grayscale image, downsampled and captioned with the case name,
+    and assemble rows x columns tiles per page. Tiles are rendered across self.workers processes a page ahead of assembly,
+    so only the current page buffer and at most two pages of tiles are ever held in memory.
+    """
+
+    caption_height = 18
+
+    def __init__(
+        self,
+        columns: int = 8,
+        rows: int = 12,
+        tile_size: tuple = (160, 384),
+        image_format: str = "jpg",
+        workers: int = 1,
+    ):
+        self.columns = columns
+        self.rows = rows
+        self.tile_size = tuple(tile_size)
+        self.workers = workers
+        self.image_writer = QCImageWriter(image_format=image_format)
+
+    def get_case_name(self, case: str) -> str:
+        return os.path.basename(str(case).rstrip("/"))
+
+    def get_pages(self, cases: List[str]) -> List[List[str]]:
+        page_size = self.columns * self.rows
+        return [cases[start : start + page_size] for start in range(0, len(cases), page_size)]
+
+    def fit_image(self, image: np.array) -> np.array:
+        """Return image downsampled to fit the tile above its caption, centered on black."""
+        image = self.image_writer.to_rgb(image)
+        height, width = self.tile_size[0] - self.caption_height, self.tile_size[1]
+        scale = min(height / image.shape[0], width / image.shape[1])
+        dsize = (max(1, int(image.shape[1] * scale)), max(1, int(image.shape[0] * scale)))
+        image = cv2.resize(image, dsize=dsize, interpolation=cv2.INTER_AREA)
+        fitted = np.zeros((height, width, 3), dtype=np.uint8)
+        top, left = (height - image.shape[0]) // 2, (width - image.shape[1]) // 2
+        fitted[top : top + image.shape[0], left : left + image.shape[1]] = image
+        return fitted
+
+    def draw_caption(self, tile: np.array, caption: str, color=(255, 255, 255)) -> np.array:
+        cv2.putText(
+            tile,
+            caption,
+            (4, tile.shape[0] - 5),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            0.45,
+            color,
+            1,
+            cv2.LINE_AA,
+        )
+        return tile
+
+    def build_tile(self, render: Callable[[str], np.array], case: str) -> np.array:
+        """Return (tile_height, tile_width, 3) uint8 tile of rendered case with case name caption."""
+        tile = np.zeros(self.tile_size + (3,), dtype=np.uint8)
+        tile[: -self.caption_height] = self.fit_image(render(case))
+        return self.draw_caption(tile, self.get_case_name(case))
+
+    def build_failed_tile(self, case: str) -> np.array:
+        tile = np.full(self.tile_size + (3,), 64, dtype=np.uint8)
+        return self.draw_caption(tile, f"FAILED {self.get_case_name(case)}", (255, 80, 80))
+
+    def place_tile(self, page: np.array, tile: np.array, position: int) -> None:
+        row, column = divmod(position, self.columns)
+        page[
+            row * self.tile_size[0] : (row + 1) * self.tile_size[0],
+            column * self.tile_size[1] : (column + 1) * self.tile_size[1],
+        ] = tile
+
+    def get_page_buffer(self, num_cases: int) -> np.array:
+        rows = -(-num_cases // self.columns)
+        return np.zeros(
+            (rows * self.tile_size[0], self.columns * self.tile_size[1], 3), dtype=np.uint8
+        )
+
+    def save(
+        self,
+        cases: List[str],
+        render: Callable[[str], np.array],
+        write_dir: pathlib.Path,
+        page_name: str = "montage",
+    ) -> Dict[str, str]:
+        """
+        Write paged contact sheets of all cases to write_dir as <page_name>_<page>.<image_format>.
+        render must be picklable when workers > 1. Returns {case: error} of cases that failed to render.
+        """
+        if not os.path.exists(write_dir):
+            os.makedirs(write_dir)
+        failed_cases = {}
+        executor = (
+            ProcessPoolExecutor(max_workers=self.workers)
+            if self.workers > 1 and len(cases) > 1
+            else None
+        )
+        pages = self.get_pages(cases)
+
+        def submit_page(page_cases: List[str]) -> list:
+            if not executor:
+                return page_cases
+            return [executor.submit(self.build_tile, render, case) for case in page_cases]
+
+        try:
+            # next page renders while the current one is assembled, at most two pages of tiles in flight
+            pending = submit_page(pages[0]) if pages else []
+            for page_num, page_cases in enumerate(tqdm(pages, desc="writing QC montage pages..."), start=1):
+                tiles = pending
+                pending = submit_page(pages[page_num]) if page_num < len(pages) else []
+                page = self.get_page_buffer(len(page_cases))
+                for position, (case, tile) in enumerate(zip(page_cases, tiles)):
+                    try:
+                        tile = tile.result() if executor else self.build_tile(render, case)
+                    except Exception as e:
+                        failed_cases[case] = repr(e)
+                        tile = self.build_failed_tile(case)
+                    self.place_tile(page, tile, position)
+                self.image_writer.write(
+                    self.image_writer.get_write_path(
+                        os.path.join(write_dir, f"{page_name}_{str(page_num).zfill(4)}")
+                    ),
+                    page,
+                )
+        finally:
+            if executor:
+                executor.shutdown()
+        return failed_cases
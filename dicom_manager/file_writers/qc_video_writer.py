@@ -0,0 +1,78 @@
+"""Stream QC slices into a single MP4, animated WebP or GIF per case."""
+
+import pathlib
+from typing import Iterable
+
+import imageio
+import numpy as np
+
+try:
+    import imageio_ffmpeg
+except ImportError:
+    imageio_ffmpeg = None
+
+from dicom_manager.file_writers.qc_image_writer import QCImageWriter
+
+
+class QCVideoWriter:
+    """
+    Frames are composed (zoom, legend) and appended to the imageio writer one at a time, so only the frame
+    being encoded is in memory. MP4 and WebP are piped to ffmpeg (requires imageio-ffmpeg),
+    GIF is written frame by frame with the GIF-PIL writer.
+    """
+
+    video_formats = ("mp4", "webp", "gif")
+
+    def __init__(self, video_format: str = "mp4", fps: int = 10, quality: int = 7):
+        assert (
+            video_format in self.video_formats
+        ), f"video_format must be one of {self.video_formats}, not {video_format}"
+        self.video_format = video_format
+        self.fps = fps
+        self.quality = quality
+        self.image_writer = QCImageWriter()
+
+    def get_write_path(self, write_path: pathlib.Path) -> pathlib.Path:
+        return f"{write_path}.{self.video_format}"
+
+    def get_writer(self, write_path: pathlib.Path):
+        if self.video_format == "gif":
+            return imageio.get_writer(
+                write_path, format="GIF-PIL", mode="I", duration=1 / self.fps, loop=0
+            )
+        assert (
+            imageio_ffmpeg is not None
+        ), f"imageio-ffmpeg is required to write {self.video_format} QC, use gif otherwise"
+        if self.video_format == "mp4":
+            return imageio.get_writer(
+                write_path,
+                format="FFMPEG",
+                mode="I",
+                fps=self.fps,
+                codec="libx264",
+                quality=self.quality,
+                macro_block_size=2,
+            )
+        return imageio.get_writer(
+            write_path,
+            format="FFMPEG",
+            mode="I",
+            fps=self.fps,
+            codec="libwebp_anim",
+            quality=None,
+            macro_block_size=2,
+            output_params=["-loop", "0", "-quality", str(self.quality * 10)],
+        )
+
+    def pad_frame(self, frame: np.array) -> np.array:
+        """Pad frame to even height and width, required by yuv420p encoding."""
+        if self.video_format == "gif":
+            return frame
+        pad = [(0, frame.shape[0] % 2), (0, frame.shape[1] % 2), (0, 0)]
+        return np.pad(frame, pad) if any(dim_pad[1] for dim_pad in pad) else frame
+
+    def write(self, write_path: pathlib.Path, frames: Iterable[np.array], **kwargs) -> None:
+        """Write frames (any iterable, e.g. a generator of slices) to write_path, one frame in memory at a time."""
+        with self.get_writer(write_path) as writer:
+            for frame in frames:
+                writer.append_data(self.pad_frame(self.image_writer.compose(frame, **kwargs)))
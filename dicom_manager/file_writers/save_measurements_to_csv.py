@@ -1,3 +1,172 @@
+"""Append-only measurement results writer, one row per case as each case completes."""
+
+import os
+import csv
+import pathlib
+from typing import Dict, List, Union
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+
 class MeasurementSaver:
-    def __init__(self):
-        return
+    """
+    Stream {case: {label_name: measurement}} rows to csv (.csv), Arrow IPC stream (.arrow) or parquet (.parquet).
+    Rows are flushed as they are saved, so a crash keeps all completed cases.
+    Parquet is columnar-only, so rows stream to a "<write_path>.arrow" sidecar converted on close.
+    """
+
+    backends = (".csv", ".arrow", ".parquet")
+    end_of_stream = b"\xff\xff\xff\xff\x00\x00\x00\x00"  # Arrow IPC continuation marker with 0 length
+
+    def __init__(
+        self,
+        write_path: pathlib.Path,
+        label_names: List[str],
+        per_slice: bool = False,
+        resume: bool = False,
+    ):
+        self.write_path = write_path
+        self.backend = os.path.splitext(write_path)[-1]
+        assert (
+            self.backend in self.backends
+        ), f"measurement file must end with one of {self.backends}, not {write_path}"
+        if self.backend != ".csv":
+            assert pa is not None, f"pyarrow is required to write {self.backend} files"
+        self.fieldnames = ["case"] + list(label_names)
+        self.per_slice = per_slice
+        self.stream_path = (
+            f"{write_path}.arrow" if self.backend == ".parquet" else write_path
+        )
+        self.completed = {}
+        if resume:
+            self.completed = {row["case"]: row for row in self.read_rows(self.stream_path)}
+            if self.backend == ".parquet" and not self.completed:
+                self.completed = {row["case"]: row for row in self.read_rows(write_path)}
+        self.open(list(self.completed.values()))
+
+    def get_schema(self):
+        value_type = pa.list_(pa.float64()) if self.per_slice else pa.float64()
+        return pa.schema(
+            [("case", pa.string())]
+            + [(label_name, value_type) for label_name in self.fieldnames[1:]]
+        )
+
+    def format_value(self, value) -> Union[float, List[float], None]:
+        """Return measurement as python float(s), scalars wrapped in list for per slice columnar columns."""
+        if value is None:
+            return None
+        if isinstance(value, str):
+            if not value.strip():
+                return None
+            value = (
+                [float(val) for val in value.strip("[]").split(",") if val.strip()]
+                if value.strip().startswith("[")
+                else float(value)
+            )
+        if isinstance(value, (list, tuple)) or hasattr(value, "__len__"):
+            return [float(val) for val in value]
+        if self.per_slice and self.backend != ".csv":
+            return [float(value)]
+        return float(value)
+
+    def format_row(self, case: str, measurements: Dict[str, float]) -> dict:
+        return {
+            "case": str(case),
+            **{
+                label_name: self.format_value(measurements.get(label_name))
+                for label_name in self.fieldnames[1:]
+            },
+        }
+
+    def read_csv_rows(self, read_path: pathlib.Path) -> List[dict]:
+        """Return complete rows of csv, dropping partial last line of an interrupted write."""
+        with open(read_path, newline="") as f:
+            text = f.read()
+        if not text.endswith("\n"):
+            text = text[: text.rfind("\n") + 1]
+        return list(csv.DictReader(text.splitlines()))
+
+    def read_arrow_rows(self, read_path: pathlib.Path) -> List[dict]:
+        """Return rows of all complete record batches of an Arrow IPC stream, ignoring a truncated tail."""
+        rows = []
+        with open(read_path, "rb") as f:
+            try:
+                reader = pa.ipc.open_stream(f)
+                while True:
+                    rows += reader.read_next_batch().to_pylist()
+            except (StopIteration, pa.ArrowInvalid, OSError):
+                pass
+        return rows
+
+    def read_rows(self, read_path: pathlib.Path) -> List[dict]:
+        """Return all rows of existing measurement file (csv, arrow stream or parquet) as formatted dicts."""
+        if not os.path.exists(read_path):
+            return []
+        extension = os.path.splitext(read_path)[-1]
+        if extension == ".csv":
+            rows = self.read_csv_rows(read_path)
+        elif extension == ".arrow":
+            rows = self.read_arrow_rows(read_path)
+        else:
+            rows = pq.read_table(read_path).to_pylist()
+        return [self.format_row(row.pop("case"), row) for row in rows]
+
+    def open(self, rows: List[dict]) -> None:
+        """
+        (Re)write rows to write path and keep file open for appending, replacing existing file only once rows are written.
+        The temporary file is closed before it replaces the target (required on Windows), then the target is reopened to append.
+        """
+        temp_path = f"{self.stream_path}.tmp"
+        self.open_file(temp_path, "w")
+        if self.backend == ".csv":
+            self.writer.writeheader()
+        else:
+            self.file.write(self.get_schema().serialize().to_pybytes())
+        for row in rows:
+            self.write_row(row)
+        self.file.close()
+        os.replace(temp_path, self.stream_path)
+        self.open_file(self.stream_path, "a")
+
+    def open_file(self, file_path: pathlib.Path, mode: str) -> None:
+        """Open file_path to write ("w") or append ("a"), csv rows through a DictWriter, Arrow rows as IPC stream messages."""
+        if self.backend == ".csv":
+            self.file = open(file_path, mode, newline="")
+            self.writer = csv.DictWriter(self.file, fieldnames=self.fieldnames)
+        else:
+            self.file = open(file_path, f"{mode}b")
+
+    def write_row(self, row: dict) -> None:
+        if self.backend == ".csv":
+            self.writer.writerow(row)
+        else:
+            self.file.write(
+                pa.RecordBatch.from_pylist([row], schema=self.get_schema())
+                .serialize()
+                .to_pybytes()
+            )
+        self.file.flush()
+
+    def save(self, case: str, measurements: Dict[str, float]) -> None:
+        """Append measurements of single completed case."""
+        row = self.format_row(case, measurements)
+        self.completed[row["case"]] = row
+        self.write_row(row)
+
+    def close(self) -> None:
+        """Finish stream, converting to parquet when requested."""
+        if self.backend != ".csv":
+            self.file.write(self.end_of_stream)
+        self.file.close()
+        if self.backend == ".parquet":
+            pq.write_table(
+                pa.Table.from_pylist(
+                    list(self.completed.values()), schema=self.get_schema()
+                ),
+                self.write_path,
+            )
+            os.remove(self.stream_path)
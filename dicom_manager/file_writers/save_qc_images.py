@@ -1,35 +1,101 @@
 import pathlib
 import os
 
-import imageio
 import cv2
 import numpy as np
-from matplotlib import pyplot as plt
+
+try:
+    from matplotlib import pyplot as plt
+except ImportError:
+    plt = None
 
 from dicom_manager.file_readers.read_dicom import ReadDicom
 from dicom_manager.file_viewers.array_plotter import ArrayPlotter
+from dicom_manager.file_writers.qc_image_writer import QCImageWriter
+from dicom_manager.file_writers.qc_video_writer import QCVideoWriter
 
 
 class QCSaver(ArrayPlotter):
-    def __init__(self):
-        pass
+    """
+    Save orthoview or full volume QC images. The default "cv2" backend encodes uint8 images directly
+    (slices split across workers threads), "matplotlib" renders figures for publication.
+    With a video_format (mp4, webp, gif) full volume QC is streamed into a single file per case instead.
+    """
+
+    backends = ("cv2", "matplotlib")
+
+    def __init__(
+        self,
+        backend: str = "cv2",
+        image_format: str = "png",
+        workers: int = 1,
+        video_format: str = None,
+        fps: int = 10,
+    ):
+        assert (
+            backend in self.backends
+        ), f"backend must be one of {self.backends}, not {backend}"
+        self.backend = backend
+        self.image_writer = QCImageWriter(image_format=image_format, workers=workers)
+        self.video_format = video_format
+        self.fps = fps
+
+    def get_backend(self, **kwargs) -> str:
+        backend = kwargs["backend"] if "backend" in kwargs else self.backend
+        assert (
+            backend in self.backends
+        ), f"backend must be one of {self.backends}, not {backend}"
+        if backend == "matplotlib":
+            assert plt is not None, "matplotlib is required for the matplotlib QC backend"
+        return backend
+
+    def get_video_format(self, **kwargs) -> str:
+        return kwargs["video_format"] if "video_format" in kwargs else self.video_format
+
+    def get_settings(self, **kwargs) -> dict:
+        """Return writer settings that change QC output, used to fingerprint rendered cases."""
+        return {
+            "backend": self.get_backend(**kwargs),
+            "image_format": self.image_writer.image_format,
+            "video_format": self.get_video_format(**kwargs),
+            "fps": kwargs["fps"] if "fps" in kwargs else self.fps,
+        }
+
+    def get_output_path(self, QC_PATH: pathlib.Path, orthoview: bool, **kwargs) -> pathlib.Path:
+        """Return path save writes for QC_PATH, a directory of slices for full volume images."""
+        if orthoview:
+            return self.get_write_path(QC_PATH, **kwargs)
+        if self.get_video_format(**kwargs):
+            return f"{QC_PATH}.{self.get_video_format(**kwargs)}"
+        return QC_PATH
 
     def save(
         self, QC_PATH: pathlib.Path, qc_file: ReadDicom, orthoview: bool, **kwargs
     ) -> None:
         if orthoview:
             self.save_orthoview(QC_PATH, qc_file, **kwargs)
+        elif self.get_video_format(**kwargs):
+            self.save_video(QC_PATH, qc_file, **kwargs)
         else:
             self.save_full_volume(QC_PATH, qc_file, **kwargs)
 
     def save_image(self, write_path: pathlib.Path, image: np.array, **kwargs) -> None:
         """Write single RGB QC image."""
+        if self.get_backend(**kwargs) == "cv2":
+            self.image_writer.write(write_path, image, **kwargs)
+            return
         self.plot_images([image], **kwargs)
         plt.tick_params(left=False, bottom=False, labelleft=False, labelbottom=False)
         plt.tight_layout()
         plt.savefig(write_path)
         plt.close()
 
+    def get_write_path(self, write_path: pathlib.Path, **kwargs) -> pathlib.Path:
+        """Return write_path with extension, matplotlib figures are always png."""
+        if self.get_backend(**kwargs) == "cv2":
+            return self.image_writer.get_write_path(write_path)
+        return f"{write_path}.png"
+
     def concatenate(self, image_list) -> np.array:
         image_shapes = [image.shape for image in image_list]
         resize_dims = [image_shape[0] for image_shape in image_shapes]
@@ -47,18 +113,43 @@ class QCSaver(ArrayPlotter):
     def save_orthoview(self, QC_PATH, qc_file, **kwargs) -> None:
         transverse, sagittal, coronal = qc_file.viewer.get_orthogonal_slices()
         orthoview = self.concatenate([transverse, sagittal, coronal])
-        write_path = os.path.join(
-            os.path.dirname(QC_PATH), f"{os.path.basename(QC_PATH)}.png"
+        if not os.path.exists(os.path.dirname(QC_PATH)):
+            os.makedirs(os.path.dirname(QC_PATH))
+        write_path = self.get_write_path(
+            os.path.join(os.path.dirname(QC_PATH), os.path.basename(QC_PATH)), **kwargs
         )
         self.save_image(write_path, orthoview, **kwargs)
 
+    def get_slice(self, qc_file, image_num: int) -> np.array:
+        return np.rot90(qc_file.arr[image_num, ...], k=1, axes=(0, 1))
+
     def save_full_volume(self, QC_PATH, qc_file, **kwargs) -> None:
         if not os.path.exists(QC_PATH):
             os.makedirs(QC_PATH)
-        for image_num in range(qc_file.arr.shape[0]):
-            write_path = os.path.join(QC_PATH, f"{str(image_num).zfill(4)}.png")
-            self.save_image(
-                write_path,
-                np.rot90(qc_file.arr[image_num, ...], k=1, axes=(0, 1)),
+        write_paths = [
+            self.get_write_path(os.path.join(QC_PATH, str(image_num).zfill(4)), **kwargs)
+            for image_num in range(qc_file.arr.shape[0])
+        ]
+        if self.get_backend(**kwargs) == "cv2":
+            # slices are only built as the writer pulls them
+            self.image_writer.write_all(
+                write_paths,
+                (self.get_slice(qc_file, image_num) for image_num in range(len(write_paths))),
                 **kwargs,
             )
+            return
+        for image_num, write_path in enumerate(write_paths):
+            self.save_image(write_path, self.get_slice(qc_file, image_num), **kwargs)
+
+    def save_video(self, QC_PATH, qc_file, **kwargs) -> None:
+        """Stream full volume QC slices into a single video file, slices are built as they are encoded."""
+        video_writer = QCVideoWriter(
+            self.get_video_format(**kwargs), kwargs["fps"] if "fps" in kwargs else self.fps
+        )
+        if not os.path.exists(os.path.dirname(QC_PATH)):
+            os.makedirs(os.path.dirname(QC_PATH))
+        video_writer.write(
+            video_writer.get_write_path(QC_PATH),
+            (self.get_slice(qc_file, image_num) for image_num in range(qc_file.arr.shape[0])),
+            **kwargs,
+        )
@@ -1,6 +1,7 @@
 import os
 import pathlib
-from copy import deepcopy
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict
 
 from natsort import natsorted
 from tqdm import tqdm
@@ -13,11 +14,16 @@ from dicom_manager.file_readers.read_dicom import ReadDicom
 from dicom_manager.file_readers.read_image_label_pair import ReadImageLabelPair
 from dicom_manager.directory_manager import DirManager
 
-from matplotlib import pyplot as plt
-
 
 class AlignMasks:
-    def __init__(self, DIR_1: pathlib.Path, DIR_2: pathlib.Path, allow: list = []):
+    def __init__(
+        self,
+        DIR_1: pathlib.Path,
+        DIR_2: pathlib.Path,
+        allow: list = [],
+        workers: int = 1,
+        compression: str = "uncompressed",
+    ):
         self.DIRS = DirManager(
             DIR_IMAGE_1=os.path.join(DIR_1, "images"),
             DIR_LABEL_1=os.path.join(DIR_1, "labels"),
@@ -27,81 +33,145 @@ class AlignMasks:
             DIR_LABEL_2_SHIFTED=os.path.join(DIR_2, "labels_shifted"),
         )
         self.allow = allow
+        self.workers = workers
+        self.compression = compression
 
     def write_pixel_data_to_dicom(
-        self, read_dicom_1: ReadDicom, read_dicom_2: ReadDicom, slice_num: int
-    ):
-        dicom_file = deepcopy(read_dicom_1.files[slice_num])
-        dicom_file = read_dicom_1.writer.decompress_dicom(dicom_file)
-        dicom_file = read_dicom_1.writer.write_array_to_dicom(
-            read_dicom_2.arr[..., slice_num], dicom_file
+        self, read_dicom_1: ReadDicom, read_dicom_2: ReadDicom
+    ) -> list:
+        """Return read_dicom_1 headers (one template plus per slice overrides) carrying read_dicom_2 pixel data."""
+        dicom_files = read_dicom_1.writer.build_slice_headers(
+            read_dicom_1.files[: read_dicom_2.arr.shape[-1]]
+        )
+        return read_dicom_1.writer.write_array_volume_to_dicom(
+            read_dicom_2.arr, dicom_files
         )
-        return dicom_file
 
     def save_shifted(
-        self, case: str, pair_1=ReadImageLabelPair, pair_2=ReadImageLabelPair
+        self,
+        case: str,
+        pair_1=ReadImageLabelPair,
+        pair_2=ReadImageLabelPair,
+        workers: int = 1,
     ) -> None:
-        pair_2.read_dicom_image.files = [
-            self.write_pixel_data_to_dicom(
-                pair_1.read_dicom_image,
-                pair_2.read_dicom_image,
-                slice_num,
-            )
-            for slice_num in range(pair_2.read_dicom_image.arr.shape[-1])
-        ]
+        """Write shifted image and label of pair_2 with pair_1 headers, slices written across worker threads."""
+        pair_2.read_dicom_image.files = self.write_pixel_data_to_dicom(
+            pair_1.read_dicom_image, pair_2.read_dicom_image
+        )
         pair_2.read_dicom_image.writer.save_all(
             pair_2.read_dicom_image.files,
             os.path.join(self.DIRS.DIR_IMAGE_2_SHIFTED, case),
+            compression=self.compression,
+            workers=workers,
         )
 
-        pair_2.read_dicom_label.files = [
-            self.write_pixel_data_to_dicom(
-                pair_1.read_dicom_label,
-                pair_2.read_dicom_label,
-                slice_num,
-            )
-            for slice_num in range(pair_2.read_dicom_label.arr.shape[-1])
-        ]
+        pair_2.read_dicom_label.files = self.write_pixel_data_to_dicom(
+            pair_1.read_dicom_label, pair_2.read_dicom_label
+        )
         pair_2.read_dicom_label.writer.save_all(
             pair_2.read_dicom_label.files,
             os.path.join(self.DIRS.DIR_LABEL_2_SHIFTED, case),
+            compression=self.compression,
+            workers=workers,
         )
 
         # then load and preview with multi-label code...
 
-    def align(self) -> None:
-        for case in tqdm(
-            natsorted(os.listdir(self.DIRS.DIR_IMAGE_1)),
-            desc="aligning masks...",
-        ):
-            try:
-                read_dicom_image_1 = ReadDicom(
-                    os.path.join(self.DIRS.DIR_IMAGE_1, case), allow=self.allow
-                )
-                read_dicom_label_1 = ReadDicom(
-                    os.path.join(self.DIRS.DIR_LABEL_1, case), allow=self.allow
-                )
-                pair_1 = ReadImageLabelPair(
-                    read_dicom_image_1, read_dicom_label_1, allow=self.allow
-                )
+    def align_case(self, case: str, workers: int = 1) -> None:
+        """Align and save shifted image and label of a single case, everything read and written within the call."""
+        read_dicom_image_1 = ReadDicom(
+            os.path.join(self.DIRS.DIR_IMAGE_1, case), allow=self.allow
+        )
+        read_dicom_label_1 = ReadDicom(
+            os.path.join(self.DIRS.DIR_LABEL_1, case), allow=self.allow
+        )
+        pair_1 = ReadImageLabelPair(
+            read_dicom_image_1, read_dicom_label_1, allow=self.allow
+        )
 
-                read_dicom_image_2 = ReadDicom(
-                    os.path.join(self.DIRS.DIR_IMAGE_2, case), allow=self.allow
-                )
-                read_dicom_label_2 = ReadDicom(
-                    os.path.join(self.DIRS.DIR_LABEL_2, case), allow=self.allow
-                )
-                pair_2 = ReadImageLabelPair(
-                    read_dicom_image_2, read_dicom_label_2, allow=self.allow
-                )
+        read_dicom_image_2 = ReadDicom(
+            os.path.join(self.DIRS.DIR_IMAGE_2, case), allow=self.allow
+        )
+        read_dicom_label_2 = ReadDicom(
+            os.path.join(self.DIRS.DIR_LABEL_2, case), allow=self.allow
+        )
+        pair_2 = ReadImageLabelPair(
+            read_dicom_image_2, read_dicom_label_2, allow=self.allow
+        )
+
+        multi_pair = ReadMultiImageLabelPair(
+            pair_1,
+            pair_2,
+            align=True,
+            align_by_roi=True,
+            allow=self.allow,
+            workers=workers,
+        )
+
+        self.save_shifted(
+            case, multi_pair.read_pair_1, multi_pair.read_pair_2, workers=workers
+        )
 
-                multi_pair = ReadMultiImageLabelPair(
-                    pair_1, pair_2, align=True, align_by_roi=True, allow=self.allow
-                )
+    def handle_case_error(
+        self,
+        case: str,
+        error: Exception,
+        failed_cases: Dict[str, str],
+        unpaired_cases: Dict[str, str],
+    ) -> None:
+        """Record error of case, a missing series (FileNotFoundError) as unpaired, anything else as failed."""
+        if isinstance(error, FileNotFoundError):
+            unpaired_cases[case] = str(error)
+        else:
+            failed_cases[case] = repr(error)
 
-                self.save_shifted(case, multi_pair.read_pair_1, multi_pair.read_pair_2)
-            # break
-            except FileNotFoundError as e:
-                if not "unpaired" in self.allow:
-                    assert False, f"MISSING MATCH: {e}"
-                print(f"MISSING MATCH: {e}")
+    def handle_failed_cases(
+        self, failed_cases: Dict[str, str], unpaired_cases: Dict[str, str]
+    ) -> None:
+        """
+        Report unpaired and failed cases once all cases have run.
+        Assert unless "unpaired" and "failed_align" respectively are allowed.
+        """
+        for case, error in unpaired_cases.items():
+            print(f"MISSING MATCH {case}: {error}")
+        for case, error in failed_cases.items():
+            print(f"FAILED ALIGN {case}: {error}")
+        if not "unpaired" in self.allow:
+            assert (
+                len(unpaired_cases) == 0
+            ), f'{len(unpaired_cases)} cases missing a match: {list(unpaired_cases.keys())}, fix or pass "unpaired" in allow list'
+        if not "failed_align" in self.allow:
+            assert (
+                len(failed_cases) == 0
+            ), f'{len(failed_cases)} cases failed alignment: {list(failed_cases.keys())}, fix or pass "failed_align" in allow list'
+
+    def align(self) -> None:
+        """
+        Align all cases, split across self.workers processes with each case isolated in its own process.
+        Run serially, a single case uses self.workers threads for resampling and writing.
+        """
+        cases = natsorted(os.listdir(self.DIRS.DIR_IMAGE_1))
+        self.failed_cases = {}
+        self.unpaired_cases = {}
+        if self.workers > 1 and len(cases) > 1:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                futures = {executor.submit(self.align_case, case): case for case in cases}
+                for future in tqdm(
+                    as_completed(futures), total=len(futures), desc="aligning masks..."
+                ):
+                    if future.exception() is not None:
+                        self.handle_case_error(
+                            futures[future],
+                            future.exception(),
+                            self.failed_cases,
+                            self.unpaired_cases,
+                        )
+        else:
+            for case in tqdm(cases, desc="aligning masks..."):
+                try:
+                    self.align_case(case, workers=self.workers)
+                except Exception as e:
+                    self.handle_case_error(
+                        case, e, self.failed_cases, self.unpaired_cases
+                    )
+        self.handle_failed_cases(self.failed_cases, self.unpaired_cases)
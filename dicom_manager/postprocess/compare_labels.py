@@ -1,6 +1,10 @@
 import os
-from typing import Tuple
+import pathlib
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Dict, List
 
+import numpy as np
 from natsort import natsorted
 from tqdm import tqdm
 from copy import deepcopy
@@ -10,13 +14,14 @@ from dicom_manager.file_readers.read_multi_image_label_pair import (
 )
 from dicom_manager.directory_manager import DirManager
 from dicom_manager.postprocess.postprocess import PostProcess
-from dicom_manager.file_readers.read_multi_image_label_pair import (
-    ReadMultiImageLabelPair,
-)
 from dicom_manager.file_readers.read_image_label_pair import (
     ReadImageLabelPair,
 )
 from dicom_manager.file_readers.read_dicom import ReadDicom
+from dicom_manager.file_readers.read_nifti import ReadNifti
+from dicom_manager.file_readers.label_volume import LabelVolume
+from dicom_manager.file_writers.save_measurements_to_csv import MeasurementSaver
+from dicom_manager.postprocess.label_overlap import LabelOverlap
 
 
 class CompareLabels(PostProcess):
@@ -30,6 +35,7 @@ class CompareLabels(PostProcess):
         DIR_LABELS_2,
         DIR_POSTPROCESS,
         allow=[],
+        workers=1,
     ):
 
         DIR_QC = os.path.join(DIR_LABELS_2, "QC")
@@ -42,29 +48,138 @@ class CompareLabels(PostProcess):
             DIR_MEASUREMENTS=DIR_MEASUREMENTS,
         )
         self.allow = allow
+        self.workers = workers
+
+    def get_case_name(self, label_path: pathlib.Path) -> str:
+        return os.path.basename(str(label_path).rstrip("/")).split(".nii")[0]
+
+    def get_case_label_path(self, labels_dir: pathlib.Path, case: str) -> pathlib.Path:
+        """Return label DICOM directory or NIFTI file (.nii.gz/.nii) of case in labels_dir."""
+        for label_path in (
+            os.path.join(labels_dir, case),
+            os.path.join(labels_dir, f"{case}.nii.gz"),
+            os.path.join(labels_dir, f"{case}.nii"),
+        ):
+            if os.path.exists(label_path):
+                return label_path
+        raise FileNotFoundError(f"no label found for {case} in {labels_dir}")
+
+    def get_label_format(self, label_path: pathlib.Path) -> str:
+        """Return "nifti" for NIFTI label files, "dicom" for DICOM or DICOM SEG label directories."""
+        return "nifti" if os.path.isfile(label_path) else "dicom"
+
+    def read_label_path(self, label_path: pathlib.Path):
+        """Return label only (no image) as uint8 ReadNifti (scaled or float labels rounded), ReadDicomSeg or ReadDicom."""
+        if self.get_label_format(label_path) == "nifti":
+            return ReadNifti(label_path, dtype=np.uint8)
+        return self.read_label_dir(label_path)
+
+    def read_label_volume(self, label_path: pathlib.Path) -> LabelVolume:
+        """Return label as compact LabelVolume (sparse for lesion-sized labels), reader and its files are dropped."""
+        read_label = self.read_label_path(label_path)
+        return LabelVolume.build_compact(read_label.arr, read_label.spacing)
 
-    def calculate_dsc(self):
-        for case in tqdm()
+    def compare_case(
+        self,
+        case: str,
+        label_key: Dict[str, int],
+        surface_distance: bool = False,
+        workers: int = None,
+    ) -> Dict[str, float]:
+        """
+        Return overlap metrics between label 1 and label 2 of case, reading only the two label volumes.
+        Surface distances of labels are split across workers processes (default self.workers).
+        """
+        label_path_1 = self.get_case_label_path(self.DIRS.DIR_LABELS_1, case)
+        label_path_2 = self.get_case_label_path(self.DIRS.DIR_LABELS_2, case)
+        if not "mixed_label_formats" in self.allow:
+            assert self.get_label_format(label_path_1) == self.get_label_format(
+                label_path_2
+            ), f'{case} labels are {self.get_label_format(label_path_1)}:{self.get_label_format(label_path_2)}, voxel orientation may differ between NIFTI and DICOM, compare labels of one format or pass "mixed_label_formats" in allow list'
+        label_1 = self.read_label_volume(label_path_1)
+        label_2 = self.read_label_volume(label_path_2)
+        if not "PixelSpacing" in self.allow:
+            assert np.allclose(
+                np.abs(np.array(label_1.spacing, dtype=float)),
+                np.abs(np.array(label_2.spacing, dtype=float)),
+            ), f"spacing between labels does not match: {label_1.spacing}:{label_2.spacing}"
+        return LabelOverlap(label_1, label_2).get_metrics(
+            label_key,
+            surface_distance=surface_distance,
+            workers=self.workers if workers is None else workers,
+        )
+
+    def get_cases(self) -> List[str]:
+        return natsorted(
+            self.get_case_name(label_path)
+            for label_path in os.listdir(self.DIRS.DIR_LABELS_1)
+            if not label_path.startswith(".")
+        )
+
+    def calculate_dsc(
+        self,
+        label_key: Dict[str, int] = {"Segmentation Mask": 1},
+        csv_name: str = "label_overlap.csv",
+        resume: bool = False,
+        surface_distance: bool = False,
+    ) -> None:
+        """
+        Write dice, jaccard and volume (cm^3) of label 1, label 2 and their difference per label for all cases
+        to one results table in DIR_MEASUREMENTS, backend (.csv/.arrow/.parquet) chosen by csv_name extension.
+        surface_distance adds hausdorff, hd95 and assd (mm) columns.
+        Cases are split across self.workers processes (labels of a single remaining case are split instead),
+        results stream to file as each case completes.
+        """
+        saver = MeasurementSaver(
+            os.path.join(self.DIRS.DIR_MEASUREMENTS, csv_name),
+            label_names=LabelOverlap.get_metric_names(label_key, surface_distance),
+            resume=resume,
+        )
+        cases = [case for case in self.get_cases() if not case in saver.completed]
+        executor = (
+            ProcessPoolExecutor(max_workers=self.workers)
+            if self.workers > 1 and len(cases) > 1
+            else None
+        )
+        # labels are split across processes only when cases are not
+        all_metrics = (executor.map if executor else map)(
+            self.compare_case,
+            cases,
+            repeat(label_key),
+            repeat(surface_distance),
+            repeat(1 if executor else self.workers),
+        )
+        try:
+            for case, metrics in zip(
+                cases,
+                tqdm(all_metrics, total=len(cases), desc="calculating label overlap..."),
+            ):
+                self.dsc[case] = metrics
+                saver.save(case, metrics)
+        finally:
+            if executor:
+                executor.shutdown()
+            saver.close()
 
     def read_all_data(self, case: str) -> ReadImageLabelPair:
         read_dicom_image_1 = ReadDicom(
-        os.path.join(self.DIRS.DIR_IMAGES_1, case), allow=self.allow
+            os.path.join(self.DIRS.DIR_IMAGES_1, case), allow=self.allow
         )
         read_dicom_label_1 = ReadDicom(
-        os.path.join(self.DIRS.DIR_LABELS_1, case), allow=self.allow
+            os.path.join(self.DIRS.DIR_LABELS_1, case), allow=self.allow
         )
         pair_1 = ReadImageLabelPair(
-        read_dicom_image_1, read_dicom_label_1, allow=self.allow
+            read_dicom_image_1, read_dicom_label_1, allow=self.allow
         )
 
         read_dicom_image_2 = ReadDicom(
-        os.path.join(self.DIRS.DIR_IMAGES_1, case), allow=self.allow
+            os.path.join(self.DIRS.DIR_IMAGES_1, case), allow=self.allow
         )
         read_dicom_label_2 = ReadDicom(
-        os.path.join(self.DIRS.DIR_LABELS_2, case), allow=self.allow
+            os.path.join(self.DIRS.DIR_LABELS_2, case), allow=self.allow
         )
         pair_2 = ReadImageLabelPair(
-        read_dicom_image_2, read_dicom_label_2, allow=self.allow
+            read_dicom_image_2, read_dicom_label_2, allow=self.allow
         )
         return ReadMultiImageLabelPair(pair_1, pair_2, allow=self.allow)
 
@@ -0,0 +1,60 @@
+"""Area and volume measurements for every label value from a single pass over a label volume."""
+
+from typing import Dict, List, Union
+
+import numpy as np
+
+
+class LabelMeasurements:
+    def __init__(self, label_array: np.array, spacing: List[float]):
+        """Count voxels of every label value per slice of (Y, X, Z) label_array, spacing as (Y, X, step-size) in mm."""
+        self.spacing = [abs(float(dim)) for dim in spacing]
+        self.slice_counts = self.count_labels(label_array)
+
+    def count_labels(self, label_array: np.array) -> np.array:
+        """Return (label value, Z) voxel counts, one bincount per slice. Float labels are rounded, not truncated."""
+        round_values = np.rint if label_array.dtype.kind == "f" else np.asarray
+        num_values = int(round_values(np.amax(label_array))) + 1 if label_array.size else 1
+        assert round_values(np.amin(label_array)) >= 0, "negative values present in mask"
+        slice_counts = np.zeros((num_values, label_array.shape[-1]), dtype=np.int64)
+        for slice_num in range(label_array.shape[-1]):
+            slice_counts[:, slice_num] = np.bincount(
+                round_values(label_array[..., slice_num]).ravel().astype(np.intp, copy=False),
+                minlength=num_values,
+            )
+        return slice_counts
+
+    def get_pixel_area(self) -> float:
+        """Return pixel area in mm^2."""
+        return self.spacing[0] * self.spacing[1]
+
+    def get_voxel_volume(self) -> float:
+        """Return voxel volume in mm^3."""
+        return self.spacing[0] * self.spacing[1] * self.spacing[2]
+
+    def get_counts(self, label_value: int) -> np.array:
+        """Return per slice voxel counts for label value, zeros if value is absent."""
+        if not 0 <= label_value < self.slice_counts.shape[0]:
+            return np.zeros(self.slice_counts.shape[1], dtype=np.int64)
+        return self.slice_counts[int(label_value)]
+
+    def get_volume(self, label_value: int = 1) -> float:
+        """Return volume measurement in cm^3 for label int value passed."""
+        return np.sum(self.get_counts(label_value)) * self.get_voxel_volume() / 1000
+
+    def get_area(self, label_value: int = 1) -> Union[float, List[float]]:
+        """Return area measurement in cm^2 for label int value passed, per slice for multi-slice volumes."""
+        area_list = list(self.get_counts(label_value) * self.get_pixel_area() / 100)
+        return area_list[0] if len(area_list) == 1 else area_list
+
+    def get_volumes(self, label_key: Dict[str, int]) -> Dict[str, float]:
+        return {
+            label_name: self.get_volume(label_value)
+            for label_name, label_value in label_key.items()
+        }
+
+    def get_areas(self, label_key: Dict[str, int]) -> Dict[str, Union[float, List[float]]]:
+        return {
+            label_name: self.get_area(label_value)
+            for label_name, label_value in label_key.items()
+        }
@@ -0,0 +1,148 @@
+"""Overlap metrics (Dice, Jaccard, volume difference) between two label volumes using bit-packed masks."""
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from dicom_manager.file_readers.label_volume import LabelVolume
+from dicom_manager.postprocess.surface_distance import SurfaceDistance
+
+
+class LabelOverlap:
+
+    popcount = np.array([bin(byte).count("1") for byte in range(256)], dtype=np.uint8)
+
+    def __init__(
+        self, label_array_1: np.array, label_array_2: np.array, spacing: List[float] = None
+    ):
+        """Label arrays as (Y, X, Z) arrays or LabelVolumes, spacing defaults to spacing of LabelVolume 1."""
+        if spacing is None:
+            spacing = label_array_1.spacing
+        assert (
+            label_array_1.shape == label_array_2.shape
+        ), f"label shape mismatch: {label_array_1.shape}:{label_array_2.shape}"
+        self.label_array_1 = label_array_1
+        self.label_array_2 = label_array_2
+        self.spacing = [abs(float(dim)) for dim in spacing]
+
+    def get_label_values(self) -> List[int]:
+        """Return all non-zero values present in either label volume."""
+        return sorted(
+            set(self.get_values(self.label_array_1)).union(
+                self.get_values(self.label_array_2)
+            )
+            - {0}
+        )
+
+    def get_values(self, label_array: np.array) -> List[int]:
+        if isinstance(label_array, LabelVolume):
+            return label_array.get_values()
+        return np.unique(label_array).tolist()
+
+    def pack_mask(self, label_array: np.array, label_value: int) -> np.array:
+        """Return mask of label value packed 8 voxels per byte along X, same layout as LabelVolume."""
+        if isinstance(label_array, LabelVolume):
+            return label_array.get_packed_mask(label_value)
+        return np.packbits(label_array == label_value, axis=1)
+
+    def count(self, packed_mask: np.array) -> int:
+        """Return number of set voxels in packed mask."""
+        return int(np.sum(self.popcount[packed_mask], dtype=np.int64))
+
+    def get_voxel_volume(self) -> float:
+        """Return voxel volume in cm^3."""
+        return self.spacing[0] * self.spacing[1] * self.spacing[2] / 1000
+
+    def get_label_metrics(self, label_value: int) -> Dict[str, float]:
+        """Return dice, jaccard and volumes (cm^3) for single label value, dice/jaccard are nan if both masks are empty."""
+        if isinstance(self.label_array_1, LabelVolume) and isinstance(
+            self.label_array_2, LabelVolume
+        ):
+            count_1 = self.label_array_1.count(label_value)
+            count_2 = self.label_array_2.count(label_value)
+            intersection = self.label_array_1.count_overlap(
+                self.label_array_2, label_value
+            )
+        else:
+            packed_1 = self.pack_mask(self.label_array_1, label_value)
+            packed_2 = self.pack_mask(self.label_array_2, label_value)
+            count_1 = self.count(packed_1)
+            count_2 = self.count(packed_2)
+            intersection = self.count(packed_1 & packed_2)
+        union = count_1 + count_2 - intersection
+        return {
+            "dice": 2 * intersection / (count_1 + count_2) if union else np.nan,
+            "jaccard": intersection / union if union else np.nan,
+            "volume_1_cm3": count_1 * self.get_voxel_volume(),
+            "volume_2_cm3": count_2 * self.get_voxel_volume(),
+            "volume_difference_cm3": (count_2 - count_1) * self.get_voxel_volume(),
+        }
+
+    def get_label_blocks(self) -> Tuple[np.array]:
+        """Return both label arrays, cropped to the joint bounding box when both are LabelVolumes."""
+        label_arrays = [self.label_array_1, self.label_array_2]
+        if not all(isinstance(label_array, LabelVolume) for label_array in label_arrays):
+            return tuple(
+                label_array.arr if isinstance(label_array, LabelVolume) else label_array
+                for label_array in label_arrays
+            )
+        rois = [label_array.get_roi() for label_array in label_arrays if label_array.get_roi()]
+        if not rois:
+            return np.zeros((0, 0, 0), dtype=np.uint8), np.zeros((0, 0, 0), dtype=np.uint8)
+        roi = tuple(
+            slice(min(dim.start for dim in dims), max(dim.stop for dim in dims))
+            for dims in zip(*rois)
+        )
+        return tuple(label_array.get_block(roi) for label_array in label_arrays)
+
+    def get_metrics(
+        self,
+        label_key: Dict[str, int] = None,
+        surface_distance: bool = False,
+        workers: int = 1,
+    ) -> Dict[str, float]:
+        """
+        Return flat {"<label name> <metric>": value} for all labels in label_key (default all labels present).
+        surface_distance adds hausdorff, hd95 and assd (mm), labels split across worker processes.
+        """
+        if not label_key:
+            label_key = {
+                f"label {label_value}": label_value
+                for label_value in self.get_label_values()
+            }
+        label_metrics = {
+            label_value: self.get_label_metrics(label_value)
+            for label_value in label_key.values()
+        }
+        if surface_distance:
+            surface_distances = SurfaceDistance(self.spacing).get_label_surface_distances(
+                *self.get_label_blocks(),
+                list(label_metrics.keys()),
+                workers=workers,
+            )
+            for label_value, distances in surface_distances.items():
+                label_metrics[label_value].update(distances)
+        return {
+            f"{label_name} {metric}": value
+            for label_name, label_value in label_key.items()
+            for metric, value in label_metrics[label_value].items()
+        }
+
+    @staticmethod
+    def get_metric_names(
+        label_key: Dict[str, int], surface_distance: bool = False
+    ) -> List[str]:
+        metrics = (
+            "dice",
+            "jaccard",
+            "volume_1_cm3",
+            "volume_2_cm3",
+            "volume_difference_cm3",
+        )
+        if surface_distance:
+            metrics += SurfaceDistance.metrics
+        return [
+            f"{label_name} {metric}"
+            for label_name in label_key.keys()
+            for metric in metrics
+        ]
@@ -3,29 +3,60 @@ import os
 import copy
 import csv
 import json
-from typing import List, Dict
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+from itertools import repeat
+from typing import List, Dict, Tuple
 
 import numpy as np
 from glob import glob
+from natsort import natsorted
 from tqdm import tqdm
 import pydicom as dcm
 
 from dicom_manager.directory_manager import DirManager
+from dicom_manager.file_loaders.dicom_loader import DicomLoader
 from dicom_manager.file_readers.read_nifti import ReadNifti
 from dicom_manager.file_readers.read_dicom import ReadDicom, ReadRawDicom
+from dicom_manager.file_readers.read_dicom_seg import ReadDicomSeg
 from dicom_manager.file_readers.read_image_label_pair import ReadImageLabelPair
 from dicom_manager.file_writers.save_measurements_to_csv import MeasurementSaver
 from dicom_manager.file_writers.save_qc_images import QCSaver
+from dicom_manager.file_writers.qc_montage import QCMontage
+from dicom_manager.file_writers.qc_index import QCIndex
+from dicom_manager.file_viewers.array_plotter import ArrayPlotter
+from dicom_manager.file_writers.dicom_seg_writer import DicomSegWriter
+from dicom_manager.postprocess.label_measurements import LabelMeasurements
+from dicom_manager.preprocess.dicom_tag_parser import DicomTagParser
 
 # both this and preprocess image/label combo should inheret from image_label_reader
 class PostProcess:
 
     qc_saver = QCSaver()
-    measurements = MeasurementSaver()
+    plotter = ArrayPlotter()
+    seg_writer = DicomSegWriter()
     volume = {}
 
-    def __init__(self, DIR_PRE_DICOM, DIR_PRE_NIFTI, DIR_INFERENCE, allow=[]):
-        missing_inference_files = self.verify_inference_complete(DIR_PRE_NIFTI, DIR_INFERENCE, allow)
+    def __init__(
+        self,
+        DIR_PRE_DICOM,
+        DIR_PRE_NIFTI,
+        DIR_INFERENCE,
+        allow=[],
+        compression: str = "uncompressed",
+        workers: int = 1,
+        label_format: str = "dicom",
+        watch: bool = False,
+    ):
+        """watch=True skips the complete inference check, for PostProcess.watch while inference is still running."""
+        assert label_format in (
+            "dicom",
+            "seg",
+        ), f'label_format must be "dicom" (single-frame series) or "seg" (DICOM SEG), not {label_format}'
+        missing_inference_files = self.verify_inference_complete(
+            DIR_PRE_NIFTI, DIR_INFERENCE, allow + ["missing_inference"] if watch else allow
+        )
         DIR_POSTPROCESS = "postprocessed".join(DIR_INFERENCE.split("inference"))
         DIR_QC = os.path.join(DIR_POSTPROCESS, "QC")
         DIR_MEASUREMENTS = os.path.join(DIR_POSTPROCESS, "MEASUREMENTS")
@@ -39,6 +70,10 @@ class PostProcess:
         )
         self.allow = allow
         self.missing_inference_files = missing_inference_files
+        self.compression = compression
+        self.workers = workers
+        self.label_format = label_format
+        self.qc_saver = QCSaver(workers=workers)
 
     def verify_inference_complete(
         self, DIR_PRE_NIFTI: pathlib.Path, DIR_INFERENCE: pathlib.Path, allow
@@ -73,13 +108,21 @@ class PostProcess:
             ".nii.gz".join(os.path.basename(nifti_path).split("_0000.nii.gz")),
         )
 
-    def read_files(self, nifti_path: pathlib.Path):
+    def read_files(self, nifti_path: pathlib.Path, clone_label: bool = True):
+        """
+        Return NIFTI image and label, raw DICOM image and DICOM label with image headers carrying NIFTI label pixels.
+        If not clone_label (DICOM SEG output) no label series is built and None is returned in its place.
+        """
         nifti_read_image = ReadNifti(nifti_path)
-        nifti_read_label = ReadNifti(self.get_label_path(nifti_path))
+        nifti_read_label = ReadNifti(self.get_label_path(nifti_path), dtype=np.uint8)
         dicom_read_image = ReadRawDicom(
             self.get_dicom_path(nifti_path), allow=self.allow
         )
-        dicom_read_label = copy.deepcopy(dicom_read_image)
+        dicom_read_label = (
+            ReadDicom.clone_headers(dicom_read_image, arr=nifti_read_label.arr)
+            if clone_label
+            else None
+        )
         return nifti_read_image, nifti_read_label, dicom_read_image, dicom_read_label
 
     def undo_dicom2nifti_rescale(
@@ -100,96 +143,291 @@ class PostProcess:
         self, nifti_read: ReadNifti, dicom_read: ReadDicom, rescale: bool = False
     ) -> ReadDicom:
         """Copy pixel data from segmentation output NIFTI file to original (raw path) DICOM meta data."""
-        nifti_pixel_array = np.rot90(nifti_read.files[0].get_fdata(), k=1, axes=(0, 1))
+        nifti_pixel_array = nifti_read.arr
         if rescale:
             nifti_pixel_array = self.undo_dicom2nifti_rescale(
-                pixel_data=nifti_pixel_array, dicom_files=dicom_read.files
+                pixel_data=np.copy(nifti_pixel_array), dicom_files=dicom_read.files
             )
         dicom_read.files = dicom_read.writer.write_array_volume_to_dicom(
             nifti_pixel_array, dicom_read.files
         )
         return dicom_read
 
-    def postprocess(self) -> None:
-        for nifti_path in tqdm(
-            glob(os.path.join(self.DIRS.DIR_PRE_NIFTI, "*.nii.gz")),
-            desc="postprocessing...",
+    def get_case_name(self, nifti_path: pathlib.Path) -> str:
+        return os.path.basename(nifti_path).split("_0000.nii.gz")[0]
+
+    def get_postprocessed_dirs(self, nifti_path: pathlib.Path) -> Tuple[pathlib.Path]:
+        """Return write dirs for postprocessed DICOM image and label files."""
+        return (
+            os.path.join(
+                self.DIRS.DIR_POSTPROCESS, "images", self.get_case_name(nifti_path)
+            ),
+            os.path.join(
+                self.DIRS.DIR_POSTPROCESS, "labels", self.get_case_name(nifti_path)
+            ),
+        )
+
+    def get_dicom_file_paths(self, target_dir: pathlib.Path) -> List[str]:
+        """Return paths of .dcm files DicomWriter.save_all wrote to target_dir, ignoring DICOMDIR, json or thumbnails."""
+        return glob(os.path.join(target_dir, "*.dcm"))
+
+    def check_postprocessed(self, nifti_path: pathlib.Path) -> bool:
+        """Return True if all postprocessed outputs exist and are newer than the inference NIFTI file."""
+        image_dir, label_dir = self.get_postprocessed_dirs(nifti_path)
+        if not (os.path.isdir(image_dir) and os.path.isdir(label_dir)):
+            return False
+        num_slices = len(self.get_dicom_file_paths(self.get_dicom_path(nifti_path)))
+        image_paths = self.get_dicom_file_paths(image_dir)
+        label_paths = self.get_dicom_file_paths(label_dir)
+        if len(image_paths) != num_slices or len(label_paths) != (
+            1 if self.label_format == "seg" else num_slices
         ):
-            case = nifti_path.rsplit('/',1)[1].rsplit('_',1)[0]
-            if ((case in self.missing_inference_files) and ("missing_inference" in self.allow)):
-                continue
+            return False
+        inference_mtime = os.stat(self.get_label_path(nifti_path)).st_mtime
+        return all(
+            os.stat(file_path).st_mtime >= inference_mtime
+            for file_path in image_paths + label_paths
+        )
 
-            nifti_image, nifti_label, dicom_image, dicom_label = self.read_files(
-                nifti_path
-            )
-            # dicom_image = self.copy_nifti_to_dicom(nifti_image, dicom_image, rescale=True)
-            # dicom_image.files = dicom_image.writer.write_array_volume_to_dicom(
-            #     np.flip(dicom_image.arr, 1), dicom_image.files
-            # )
-            dicom_image.files = dicom_image.writer.write_array_volume_to_dicom(
-                dicom_image.arr, dicom_image.files
-            )
+    def postprocess_case(self, nifti_path: pathlib.Path, workers: int = 1) -> None:
+        """Write postprocessed DICOM image and label files for single case."""
+        nifti_image, nifti_label, dicom_image, dicom_label = self.read_files(
+            nifti_path, clone_label=self.label_format != "seg"
+        )
+        # dicom_image = self.copy_nifti_to_dicom(nifti_image, dicom_image, rescale=True)
+        # dicom_image.files = dicom_image.writer.write_array_volume_to_dicom(
+        #     np.flip(dicom_image.arr, 1), dicom_image.files
+        # )
+        dicom_image.files = dicom_image.writer.write_array_volume_to_dicom(
+            dicom_image.arr, dicom_image.files
+        )
 
-            dicom_label = self.copy_nifti_to_dicom(nifti_label, dicom_label)
-            dicom_image_write_dir = os.path.join(
-                self.DIRS.DIR_POSTPROCESS,
-                "images",
-                os.path.basename(nifti_path.split("_0000.nii.gz")[0]),
+        dicom_image_write_dir, dicom_label_write_dir = self.get_postprocessed_dirs(
+            nifti_path
+        )
+        dicom_image.writer.save_all(
+            dicom_image.files,
+            dicom_image_write_dir,
+            compression=self.compression,
+            workers=workers,
+        )
+        if self.label_format == "seg":
+            self.seg_writer.save_seg(
+                nifti_label.arr,
+                dicom_image.files,
+                dicom_image.spacing,
+                dicom_label_write_dir,
             )
-            dicom_image.writer.save_all(dicom_image.files, dicom_image_write_dir)
-            dicom_label_write_dir = os.path.join(
-                self.DIRS.DIR_POSTPROCESS,
-                "labels",
-                os.path.basename(nifti_path.split("_0000.nii.gz")[0]),
+        else:
+            dicom_label.writer.save_all(
+                dicom_label.files,
+                dicom_label_write_dir,
+                compression=self.compression,
+                workers=workers,
             )
-            dicom_label.writer.save_all(dicom_label.files, dicom_label_write_dir)
 
-    def preview_postprocessed_dicom(self, value_clip=False, **kwargs) -> None:
-        """Display segmentation mask overlay of postprocessed DICOM data as RGB."""
+    def handle_failed_cases(self, failed_cases: Dict[str, str]) -> None:
+        """Report cases that raised during postprocessing, assert unless "failed_postprocess" is allowed."""
+        for case, error in failed_cases.items():
+            print(f"FAILED POSTPROCESS {case}: {error}")
+        if not "failed_postprocess" in self.allow:
+            assert (
+                len(failed_cases) == 0
+            ), f'{len(failed_cases)} cases failed postprocessing: {list(failed_cases.keys())}, fix or pass "failed_postprocess" in allow list'
+
+    def postprocess(self, overwrite: bool = False) -> None:
+        """
+        Postprocess all inference files, cases split across self.workers processes.
+        Cases with postprocessed outputs newer than their inference NIFTI are skipped unless overwrite.
+        """
+        nifti_paths = []
+        for nifti_path in glob(os.path.join(self.DIRS.DIR_PRE_NIFTI, "*.nii.gz")):
+            case = self.get_case_name(nifti_path)
+            # only non-empty if "missing_inference" is allowed or in watch mode
+            if case in self.missing_inference_files:
+                continue
+            if not overwrite and self.check_postprocessed(nifti_path):
+                continue
+            nifti_paths.append(nifti_path)
+
+        self.failed_cases = {}
+        if self.workers > 1 and len(nifti_paths) > 1:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                futures = {
+                    executor.submit(self.postprocess_case, nifti_path): nifti_path
+                    for nifti_path in nifti_paths
+                }
+                for future in tqdm(
+                    as_completed(futures), total=len(futures), desc="postprocessing..."
+                ):
+                    if future.exception() is not None:
+                        self.failed_cases[
+                            self.get_case_name(futures[future])
+                        ] = repr(future.exception())
+        else:
+            for nifti_path in tqdm(nifti_paths, desc="postprocessing..."):
+                try:
+                    self.postprocess_case(nifti_path, workers=self.workers)
+                except Exception as e:
+                    self.failed_cases[self.get_case_name(nifti_path)] = repr(e)
+        self.handle_failed_cases(self.failed_cases)
+
+    def read_label(self, postprocessed_dir: pathlib.Path):
+        """Return postprocessed label paired with postprocessed image dir."""
+        return self.read_label_dir("labels".join(postprocessed_dir.split("images")))
+
+    def read_label_dir(self, label_dir: pathlib.Path):
+        """Return postprocessed label as ReadDicomSeg for DICOM SEG output, otherwise ReadDicom."""
+        label_paths = glob(os.path.join(label_dir, "*.dcm"))
+        if len(label_paths) == 1 and ReadDicomSeg.is_seg(label_paths[0]):
+            return ReadDicomSeg(label_dir)
+        return ReadDicom(label_dir, allow=self.allow)
+
+    def get_qc_fingerprint(
+        self, qc_index: QCIndex, postprocessed_dir: pathlib.Path, params: dict
+    ) -> str:
+        return qc_index.get_fingerprint(
+            postprocessed_dir, "labels".join(postprocessed_dir.split("images")), params
+        )
+
+    def preview_postprocessed_dicom(self, value_clip=False, cached: bool = True, **kwargs) -> None:
+        """
+        Display segmentation mask overlay of postprocessed DICOM data as RGB.
+        If cached, orthogonal slices are stored in DIR_QC/preview and cases whose postprocessed files
+        and preview kwargs are unchanged are displayed from the cache without reading DICOM.
+        """
         if "value_clip" in kwargs:
             value_clip = kwargs["value_clip"]
-
-        for postprocessed_dir in tqdm(
-            glob(os.path.join(self.DIRS.DIR_POSTPROCESS, "images", "*/")),
-            desc="generating previews of postprocessed DICOM data...",
-        ):
-            case_kwargs = copy.deepcopy(kwargs)
-            if "legend" in case_kwargs:
-                case_kwargs["legend"].append(
-                    [os.path.basename(postprocessed_dir.rstrip("/")), "#808080"]
+        preview_dir = os.path.join(self.DIRS.DIR_QC, "preview")
+        preview_index = QCIndex(preview_dir)
+        params = {"value_clip": value_clip, "kwargs": kwargs}
+        try:
+            for postprocessed_dir in tqdm(
+                glob(os.path.join(self.DIRS.DIR_POSTPROCESS, "images", "*/")),
+                desc="generating previews of postprocessed DICOM data...",
+            ):
+                case = os.path.basename(postprocessed_dir.rstrip("/"))
+                case_kwargs = copy.deepcopy(kwargs)
+                if "legend" in case_kwargs:
+                    case_kwargs["legend"].append([case, "#808080"])
+                cache_path = os.path.join(preview_dir, f"{case}.npz")
+                fingerprint = self.get_qc_fingerprint(preview_index, postprocessed_dir, params)
+                if cached and preview_index.is_current(case, fingerprint, cache_path):
+                    with np.load(cache_path) as planes:
+                        self.plotter.plot_images(
+                            [planes["transverse"], planes["coronal"], planes["sagittal"]],
+                            **case_kwargs,
+                        )
+                    continue
+                image = ReadDicom(
+                    postprocessed_dir, value_clip=value_clip, allow=self.allow
                 )
-            image = ReadDicom(
-                postprocessed_dir, value_clip=value_clip, allow=self.allow
-            )
-            label = ReadDicom(
-                "labels".join(postprocessed_dir.split("images")), allow=self.allow
-            )
-            pair = ReadImageLabelPair(image, label, **kwargs)
-            pair.viewer.orthoview(**case_kwargs)
+                label = self.read_label(postprocessed_dir)
+                pair = ReadImageLabelPair(image, label, **kwargs)
+                pair.viewer.orthoview(**case_kwargs)
+                if cached:
+                    transverse, sagittal, coronal = pair.viewer.get_orthogonal_slices()
+                    if not os.path.exists(preview_dir):
+                        os.makedirs(preview_dir)
+                    np.savez_compressed(
+                        cache_path, transverse=transverse, sagittal=sagittal, coronal=coronal
+                    )
+                    preview_index.update(case, fingerprint)
+        finally:
+            if cached:
+                preview_index.save()
 
-    def save_qc(self, orthoview: bool = True, value_clip=False, **kwargs) -> None:
-        """Save QC images with RGB overlay of segmentation masks."""
+    def save_qc(
+        self, orthoview: bool = True, value_clip=False, overwrite: bool = False, **kwargs
+    ) -> None:
+        """
+        Save QC images with RGB overlay of segmentation masks.
+        Cases whose postprocessed files, QC kwargs and existing QC output are unchanged since the last run
+        (tracked in DIR_QC/qc_index.json) are skipped unless overwrite.
+        """
         if "value_clip" in kwargs:
             value_clip = kwargs["value_clip"]
-        for postprocessed_dir in tqdm(
-            glob(os.path.join(self.DIRS.DIR_POSTPROCESS, "images", "*/")),
-            desc=f"writing QC images to {self.DIRS.DIR_QC}",
-        ):
-            image = ReadDicom(
-                postprocessed_dir, allow=self.allow, value_clip=value_clip
-            )
-            label = ReadDicom(
-                "labels".join(postprocessed_dir.split("images")), allow=self.allow
-            )
-            pair = ReadImageLabelPair(image, label, **kwargs)
-            self.qc_saver.save(
-                os.path.join(
-                    self.DIRS.DIR_QC, os.path.basename(postprocessed_dir.strip("/"))
-                ),
-                pair,
-                orthoview=orthoview,
-                **kwargs,
-            )
+        qc_index = QCIndex(self.DIRS.DIR_QC)
+        params = {
+            "orthoview": orthoview,
+            "value_clip": value_clip,
+            "kwargs": kwargs,
+            **self.qc_saver.get_settings(**kwargs),
+        }
+        try:
+            for postprocessed_dir in tqdm(
+                glob(os.path.join(self.DIRS.DIR_POSTPROCESS, "images", "*/")),
+                desc=f"writing QC images to {self.DIRS.DIR_QC}",
+            ):
+                output_path = self.qc_saver.get_output_path(
+                    os.path.join(
+                        self.DIRS.DIR_QC, os.path.basename(postprocessed_dir.strip("/"))
+                    ),
+                    orthoview,
+                    **kwargs,
+                )
+                # keyed by output so orthoview, full volume and video QC of a case are tracked separately
+                index_key = os.path.basename(output_path)
+                fingerprint = self.get_qc_fingerprint(qc_index, postprocessed_dir, params)
+                if not overwrite and qc_index.is_current(index_key, fingerprint, output_path):
+                    continue
+                self.save_case_qc(
+                    postprocessed_dir, orthoview=orthoview, value_clip=value_clip, **kwargs
+                )
+                qc_index.update(index_key, fingerprint)
+        finally:
+            qc_index.save()
+
+    def save_case_qc(
+        self,
+        postprocessed_dir: pathlib.Path,
+        orthoview: bool = True,
+        value_clip=False,
+        **kwargs,
+    ) -> None:
+        """Save QC image(s) with RGB overlay of segmentation mask for single postprocessed case."""
+        image = ReadDicom(postprocessed_dir, allow=self.allow, value_clip=value_clip)
+        label = self.read_label(postprocessed_dir)
+        pair = ReadImageLabelPair(image, label, **kwargs)
+        self.qc_saver.save(
+            os.path.join(
+                self.DIRS.DIR_QC, os.path.basename(postprocessed_dir.strip("/"))
+            ),
+            pair,
+            orthoview=orthoview,
+            **kwargs,
+        )
+
+    def get_case_orthoview(
+        self, postprocessed_dir: pathlib.Path, value_clip=False, **kwargs
+    ) -> np.array:
+        """Return concatenated transverse, sagittal and coronal RGB overlay of single postprocessed case."""
+        image = ReadDicom(postprocessed_dir, allow=self.allow, value_clip=value_clip)
+        label = self.read_label(postprocessed_dir)
+        pair = ReadImageLabelPair(image, label, **kwargs)
+        return self.qc_saver.concatenate(list(pair.viewer.get_orthogonal_slices()))
+
+    def save_qc_montage(
+        self,
+        value_clip=False,
+        columns: int = 8,
+        rows: int = 12,
+        tile_size: Tuple[int] = (160, 384),
+        image_format: str = "jpg",
+        **kwargs,
+    ) -> None:
+        """
+        Save paged contact sheets of downsampled orthoviews of all postprocessed cases to DIR_QC/montage,
+        each tile captioned with its case name. Tiles are rendered across self.workers processes.
+        """
+        montage = QCMontage(columns, rows, tile_size, image_format, self.workers)
+        self.failed_cases = montage.save(
+            natsorted(glob(os.path.join(self.DIRS.DIR_POSTPROCESS, "images", "*/"))),
+            partial(self.get_case_orthoview, value_clip=value_clip, **kwargs),
+            os.path.join(self.DIRS.DIR_QC, "montage"),
+        )
+        for case, error in self.failed_cases.items():
+            print(f"FAILED QC {case}: {error}")
 
     def get_csv_path(self, csv_name: str, single_slices: bool) -> pathlib.Path:
         """Return csv path for measurements results file."""
@@ -213,20 +451,17 @@ class PostProcess:
     def calculate_volume_for_all_labels(
         self, pair: ReadImageLabelPair, label_key: Dict[str, int], single_slices: bool
     ) -> Dict[str, int]:
-        if single_slices==True:
-            return {
-                label_name: pair.get_area(
-                    read_dicom_label=pair.read_dicom_label, label_value=label_value
-                )
-                for label_name, label_value in label_key.items()
-            }    
-        if single_slices==False:
-            return {
-                label_name: pair.get_volume(
-                    read_dicom_label=pair.read_dicom_label, label_value=label_value
-                )
-                for label_name, label_value in label_key.items()
-            }
+        """Return area (cm^2 per slice) or volume (cm^3) of all labels, counted in a single pass over the label volume."""
+        return self.measure_labels(pair.read_dicom_label, label_key, single_slices)
+
+    def measure_labels(
+        self, read_label, label_key: Dict[str, int], single_slices: bool
+    ) -> Dict[str, int]:
+        """Return area (cm^2 per slice) or volume (cm^3) of all labels from label reader alone."""
+        measurements = LabelMeasurements(read_label.arr, read_label.spacing)
+        if single_slices == True:
+            return measurements.get_areas(label_key)
+        return measurements.get_volumes(label_key)
 
     def parse_patient_key(self, patient_key_path: pathlib.Path) -> Dict[str, str]:
         """
@@ -261,33 +496,301 @@ class PostProcess:
                 key = key + " cm^3"
         return label_key
     """
+    def get_measurement_saver(
+        self, csv_name: str, label_key: Dict[str, int], single_slices: bool, resume: bool
+    ) -> MeasurementSaver:
+        """Return streaming results writer, backend (.csv/.arrow/.parquet) chosen by csv_name extension."""
+        return MeasurementSaver(
+            self.get_csv_path(csv_name, single_slices),
+            label_names=label_key.keys(),
+            per_slice=single_slices,
+            resume=resume,
+        )
+
+    def save_measurements(
+        self, saver: MeasurementSaver, case_id: str, measurements: Dict[str, int]
+    ) -> None:
+        self.volume[case_id] = measurements
+        saver.save(case_id, measurements)
+
     def autocalculate(
         self,
         single_slices: bool,
         csv_name: str = False,
         label_key: Dict[str, int] = {"Segmentation Mask": 1},
         patient_key: pathlib.Path = False,
+        label_only: bool = False,
+        resume: bool = False,
     ) -> None:
         """
         Calculate volume as cm^3 or area as cm^2 for all patients. e.g., label_values = {liver: 1, tumor: 2}.
         Builds nested dict with {case_name: {liver: 1500cm^3, tumor: 300cm^3}}....
+        Each case is appended to the results file as it completes, if resume cases already in results file are skipped.
+        If label_only, only postprocessed label series are read (no image volumes, pair validation or RGB overlay).
         """
         if patient_key:
             patient_key = self.parse_patient_key(patient_key)
-        for postprocessed_dir in tqdm(
-            glob(os.path.join(self.DIRS.DIR_POSTPROCESS, "images", "*/")),
-            desc="calculating...",
-        ):
-            read_dicom_image = ReadDicom(postprocessed_dir, allow=self.allow)
-            read_dicom_label = ReadDicom(
-                "labels".join(postprocessed_dir.split("images")), allow=self.allow
+        saver = self.get_measurement_saver(csv_name, label_key, single_slices, resume)
+        try:
+            if label_only:
+                for label_dir in tqdm(
+                    glob(os.path.join(self.DIRS.DIR_POSTPROCESS, "labels", "*/")),
+                    desc="calculating from labels...",
+                ):
+                    case_id = self.get_patient_id(label_dir, patient_key)
+                    if case_id in saver.completed:
+                        continue
+                    self.save_measurements(
+                        saver,
+                        case_id,
+                        self.measure_labels(
+                            self.read_label_dir(label_dir), label_key, single_slices
+                        ),
+                    )
+                return
+            for postprocessed_dir in tqdm(
+                glob(os.path.join(self.DIRS.DIR_POSTPROCESS, "images", "*/")),
+                desc="calculating...",
+            ):
+                case_id = self.get_patient_id(postprocessed_dir, patient_key)
+                if case_id in saver.completed:
+                    continue
+                read_dicom_image = ReadDicom(postprocessed_dir, allow=self.allow)
+                read_dicom_label = self.read_label(postprocessed_dir)
+                pair = ReadImageLabelPair(read_dicom_image, read_dicom_label)
+                #label_key = self.get_label_key_units(single_slices, label_key)
+                self.save_measurements(
+                    saver,
+                    case_id,
+                    self.calculate_volume_for_all_labels(pair=pair, label_key=label_key, single_slices=single_slices),
+                )
+        finally:
+            saver.close()
+
+    def read_dicom_headers(self, nifti_path: pathlib.Path) -> List[dcm.dataset.Dataset]:
+        """Return preprocessed DICOM headers (no pixel data) of case in ReadDicom slice order."""
+        loader = DicomLoader()
+        dicom_files = [
+            loader.load_header(file_path)
+            for file_path in loader.get_file_paths(self.get_dicom_path(nifti_path))
+        ]
+        return ReadDicom.sorter.sort_dicom_files(
+            [dicom_file for dicom_file in dicom_files if dicom_file is not None]
+        )
+
+    def get_inference_slice_spacing(
+        self, inference_path: pathlib.Path, num_slices: int
+    ) -> List[float]:
+        """
+        Return spacing of the preprocessed DICOM series inference slices pair with.
+        postprocess_case writes NIFTI slice k to sorted DICOM file k (read_files/clone_headers), so once
+        slice counts match, per slice areas follow the DICOM file order and spacing of autocalculate.
+        """
+        dicom_files = self.read_dicom_headers(self.get_nifti_path(inference_path))
+        assert (
+            len(dicom_files) == num_slices
+        ), f"{num_slices} slices in {inference_path} for {len(dicom_files)} preprocessed DICOM files"
+        return DicomTagParser(self.allow).get_dicom_spacing(dicom_files)
+
+    def measure_inference_file(
+        self, inference_path: pathlib.Path, label_key: Dict[str, int], single_slices: bool
+    ) -> Dict[str, int]:
+        """
+        Return label measurements from inference NIFTI file, volume spacing from header zooms.
+        Per slice areas are paired with the preprocessed DICOM slices (see get_inference_slice_spacing).
+        Read as uint8 so scaled or float stored labels are rounded (0.9999 is label 1, not background).
+        """
+        read_label = ReadNifti(inference_path, dtype=np.uint8)
+        if single_slices:
+            read_label.spacing = self.get_inference_slice_spacing(
+                inference_path, read_label.arr.shape[-1]
             )
-            pair = ReadImageLabelPair(read_dicom_image, read_dicom_label)
-            #label_key = self.get_label_key_units(single_slices, label_key)
-            self.volume[
-                self.get_patient_id(postprocessed_dir, patient_key)
-            ] = self.calculate_volume_for_all_labels(pair=pair, label_key=label_key, single_slices=single_slices)
-        self.write_csv(csv_name=csv_name, volume=self.volume, label_key=label_key, single_slices=single_slices)
+        return self.measure_labels(read_label, label_key, single_slices)
+
+    def calculate_from_inference(
+        self,
+        single_slices: bool,
+        csv_name: str = False,
+        label_key: Dict[str, int] = {"Segmentation Mask": 1},
+        patient_key: pathlib.Path = False,
+        resume: bool = False,
+    ) -> None:
+        """
+        Calculate volume as cm^3 or area as cm^2 for all patients directly from DIR_INFERENCE files,
+        without writing or reading postprocessed DICOM. Files are split across self.workers processes.
+        Writes the same csv as autocalculate, per slice areas follow the preprocessed DICOM slice order
+        (only headers are read) that postprocess_case pairs NIFTI slices with.
+        """
+        if patient_key:
+            patient_key = self.parse_patient_key(patient_key)
+        saver = self.get_measurement_saver(csv_name, label_key, single_slices, resume)
+        case_ids = {
+            inference_path: self.get_patient_id(
+                os.path.basename(inference_path).split(".nii.gz")[0], patient_key
+            )
+            for inference_path in glob(os.path.join(self.DIRS.DIR_INFERENCE, "*.nii.gz"))
+        }
+        inference_paths = [
+            inference_path
+            for inference_path, case_id in case_ids.items()
+            if not case_id in saver.completed
+        ]
+        executor = (
+            ProcessPoolExecutor(max_workers=self.workers)
+            if self.workers > 1 and len(inference_paths) > 1
+            else None
+        )
+        all_measurements = (executor.map if executor else map)(
+            self.measure_inference_file,
+            inference_paths,
+            repeat(label_key),
+            repeat(single_slices),
+        )
+        try:
+            for inference_path, measurements in zip(
+                inference_paths,
+                tqdm(
+                    all_measurements,
+                    total=len(inference_paths),
+                    desc="calculating from inference...",
+                ),
+            ):
+                self.save_measurements(saver, case_ids[inference_path], measurements)
+        finally:
+            if executor:
+                executor.shutdown()
+            saver.close()
+
+    def scan_inference(self) -> Dict[str, Tuple[int, int]]:
+        """Return {inference path: (size, mtime)} for NIFTI files currently in DIR_INFERENCE."""
+        with os.scandir(self.DIRS.DIR_INFERENCE) as entries:
+            return {
+                entry.path: (entry.stat().st_size, entry.stat().st_mtime_ns)
+                for entry in entries
+                if entry.name.endswith(".nii.gz") and entry.is_file()
+            }
+
+    def get_nifti_path(self, inference_path: pathlib.Path) -> pathlib.Path:
+        """Return preprocessed NIFTI image path for inference file."""
+        return os.path.join(
+            self.DIRS.DIR_PRE_NIFTI,
+            f"{os.path.basename(inference_path).split('.nii.gz')[0]}_0000.nii.gz",
+        )
+
+    def process_inference_case(
+        self,
+        nifti_path: pathlib.Path,
+        label_key: Dict[str, int],
+        single_slices: bool,
+        qc: bool,
+        **kwargs,
+    ) -> Dict[str, int]:
+        """Postprocess, QC and return measurements for single case as soon as its inference file is written."""
+        if not self.check_postprocessed(nifti_path):
+            self.postprocess_case(nifti_path)
+        if qc:
+            self.save_case_qc(
+                os.path.join(self.get_postprocessed_dirs(nifti_path)[0], ""), **kwargs
+            )
+        return self.measure_inference_file(
+            self.get_label_path(nifti_path), label_key, single_slices
+        )
+
+    def watch(
+        self,
+        poll_interval: float = 30,
+        timeout: float = None,
+        single_slices: bool = False,
+        csv_name: str = False,
+        label_key: Dict[str, int] = {"Segmentation Mask": 1},
+        patient_key: pathlib.Path = False,
+        qc: bool = True,
+        **kwargs,
+    ) -> None:
+        """
+        Poll DIR_INFERENCE and postprocess, measure and QC each inference file once it is fully written,
+        i.e. its size and mtime are unchanged over one poll_interval. Cases run across self.workers processes.
+        Returns when every preprocessed NIFTI has been handled, or after timeout seconds (None waits indefinitely).
+        Measurements stream to results file with resume, so restarting watch skips finished cases.
+        Construct PostProcess with watch=True to start watching before inference is complete.
+        """
+        if patient_key:
+            patient_key = self.parse_patient_key(patient_key)
+        saver = self.get_measurement_saver(csv_name, label_key, single_slices, resume=True)
+        expected_cases = set(
+            self.get_case_name(nifti_path)
+            for nifti_path in glob(os.path.join(self.DIRS.DIR_PRE_NIFTI, "*.nii.gz"))
+        )
+        self.failed_cases = {}
+        handled_cases, futures, last_scan = set(), {}, {}
+        start_time = time.time()
+        progress = tqdm(total=len(expected_cases), desc="watching inference...")
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            try:
+                while True:
+                    scan = self.scan_inference()
+                    for inference_path, file_stat in scan.items():
+                        nifti_path = self.get_nifti_path(inference_path)
+                        case = self.get_case_name(nifti_path)
+                        if (
+                            case in handled_cases
+                            or last_scan.get(inference_path) != file_stat
+                            or file_stat[0] == 0
+                            or not os.path.exists(nifti_path)
+                        ):
+                            continue
+                        handled_cases.add(case)
+                        if self.get_patient_id(
+                            case, patient_key
+                        ) in saver.completed and self.check_postprocessed(nifti_path):
+                            progress.update()
+                            continue
+                        futures[
+                            executor.submit(
+                                self.process_inference_case,
+                                nifti_path,
+                                label_key,
+                                single_slices,
+                                qc,
+                                **kwargs,
+                            )
+                        ] = case
+                    last_scan = scan
+
+                    for future in [future for future in futures if future.done()]:
+                        case = futures.pop(future)
+                        if future.exception() is not None:
+                            self.failed_cases[case] = repr(future.exception())
+                        else:
+                            self.save_measurements(
+                                saver,
+                                self.get_patient_id(case, patient_key),
+                                future.result(),
+                            )
+                        progress.update()
+
+                    if expected_cases.issubset(handled_cases) and not futures:
+                        break
+                    if timeout is not None and time.time() - start_time > timeout:
+                        print(
+                            f"watch timed out with {len(expected_cases - handled_cases)} cases awaiting inference"
+                        )
+                        break
+                    time.sleep(poll_interval)
+
+                for future in as_completed(futures):
+                    case = futures[future]
+                    if future.exception() is not None:
+                        self.failed_cases[case] = repr(future.exception())
+                    else:
+                        self.save_measurements(
+                            saver, self.get_patient_id(case, patient_key), future.result()
+                        )
+                    progress.update()
+            finally:
+                progress.close()
+                saver.close()
+        self.handle_failed_cases(self.failed_cases)
 
 
 # WHY ARE WE RESETTING ORIGINAL DICOM FILES WITH NIFTI ARRAY VALUES FOR POSTPROCESSED?
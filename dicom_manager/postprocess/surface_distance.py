@@ -0,0 +1,89 @@
+"""Surface distance metrics (Hausdorff, HD95, ASSD) between two masks, computed on their joint bounding box only."""
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+import numpy as np
+from scipy import ndimage
+
+
+class SurfaceDistance:
+
+    metrics = ("hausdorff_mm", "hd95_mm", "assd_mm")
+    structure = ndimage.generate_binary_structure(3, 1)
+
+    def __init__(self, spacing: List[float], margin: int = 1):
+        """Spacing as (Y, X, step-size) in mm matching (Y, X, Z) mask axes, e.g. ReadDicom.spacing."""
+        self.spacing = [abs(float(dim)) for dim in spacing]
+        self.margin = margin
+
+    def get_roi(self, mask_1: np.array, mask_2: np.array) -> Tuple[slice]:
+        """Return slices of joint bounding box of both masks plus margin, None if both masks are empty."""
+        joint_mask = mask_1 | mask_2
+        roi = []
+        for axis in range(joint_mask.ndim):
+            indices = np.flatnonzero(
+                joint_mask.any(axis=tuple(dim for dim in range(joint_mask.ndim) if dim != axis))
+            )
+            if not indices.size:
+                return None
+            roi.append(
+                slice(
+                    max(0, indices[0] - self.margin),
+                    min(joint_mask.shape[axis], indices[-1] + 1 + self.margin),
+                )
+            )
+        return tuple(roi)
+
+    def get_border(self, mask: np.array) -> np.array:
+        """Return boundary voxels of mask, voxels removed by a single face-connected erosion."""
+        return mask & ~ndimage.binary_erosion(mask, structure=self.structure)
+
+    def measure_roi(self, mask_1: np.array, mask_2: np.array) -> Dict[str, float]:
+        """Return surface distance metrics in mm between two cropped boolean masks, nan if either mask is empty."""
+        if not mask_1.any() or not mask_2.any():
+            return {metric: np.nan for metric in self.metrics}
+        border_1, border_2 = self.get_border(mask_1), self.get_border(mask_2)
+        distances_1 = ndimage.distance_transform_edt(~border_2, sampling=self.spacing)[
+            border_1
+        ]
+        distances_2 = ndimage.distance_transform_edt(~border_1, sampling=self.spacing)[
+            border_2
+        ]
+        return {
+            "hausdorff_mm": float(max(distances_1.max(), distances_2.max())),
+            "hd95_mm": float(
+                max(np.percentile(distances_1, 95), np.percentile(distances_2, 95))
+            ),
+            "assd_mm": float(
+                (distances_1.sum() + distances_2.sum())
+                / (distances_1.size + distances_2.size)
+            ),
+        }
+
+    def get_surface_distances(self, mask_1: np.array, mask_2: np.array) -> Dict[str, float]:
+        """Return surface distance metrics in mm between two full size masks."""
+        mask_1, mask_2 = mask_1.astype(bool, copy=False), mask_2.astype(bool, copy=False)
+        roi = self.get_roi(mask_1, mask_2)
+        if roi is None:
+            return {metric: np.nan for metric in self.metrics}
+        return self.measure_roi(mask_1[roi], mask_2[roi])
+
+    def get_label_surface_distances(
+        self,
+        label_array_1: np.array,
+        label_array_2: np.array,
+        label_values: List[int],
+        workers: int = 1,
+    ) -> Dict[int, Dict[str, float]]:
+        """Return {label_value: metrics} for every label value, cropped masks split across worker processes."""
+        crops = ([], [])
+        for label_value in label_values:
+            mask_1, mask_2 = label_array_1 == label_value, label_array_2 == label_value
+            roi = self.get_roi(mask_1, mask_2)
+            crops[0].append(mask_1[roi] if roi else mask_1[:0])
+            crops[1].append(mask_2[roi] if roi else mask_2[:0])
+        if workers > 1 and len(label_values) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                return dict(zip(label_values, executor.map(self.measure_roi, *crops)))
+        return dict(zip(label_values, map(self.measure_roi, *crops)))
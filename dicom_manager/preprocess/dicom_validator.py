@@ -21,7 +21,7 @@ class DicomVolumeValidator(DicomTagParser):
     def get_best_shape(self, all_shapes: List[tuple]) -> tuple:
         """Returns largest shape in shape list...maybe better than most common?"""
         # return self.slice_manager.most_common(all_shapes)
-        shape_sizes = [np.product(shape) for shape in all_shapes]
+        shape_sizes = [np.prod(shape) for shape in all_shapes]
         return all_shapes[shape_sizes.index(np.amax(shape_sizes))]
 
     def conform_array_shape(
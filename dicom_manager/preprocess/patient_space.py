@@ -0,0 +1,82 @@
+"""Map (Y, X, Z) voxel indices to patient space (mm) from ImagePositionPatient, ImageOrientationPatient and PixelSpacing."""
+
+from typing import List, Tuple
+
+import numpy as np
+import pydicom as dcm
+
+
+class PatientSpace:
+    """Header-only geometry of a sorted DICOM series, dicom_files can be read with stop_before_pixels."""
+
+    def __init__(self, dicom_files: List[dcm.dataset.Dataset]):
+        assert len(dicom_files), "no DICOM files to build patient space from"
+        self.dicom_files = dicom_files
+        self.shape = (
+            int(dicom_files[0].Rows),
+            int(dicom_files[0].Columns),
+            len(dicom_files),
+        )
+        self.affine = self.get_affine(dicom_files)
+
+    def get_affine(self, dicom_files: List[dcm.dataset.Dataset]) -> np.array:
+        """Return 4x4 affine mapping (row, column, slice) indices to patient (x, y, z) in mm."""
+        orientation = np.array(dicom_files[0].ImageOrientationPatient, dtype=float)
+        row_direction, column_direction = orientation[:3], orientation[3:]
+        row_spacing, column_spacing = [float(dim) for dim in dicom_files[0].PixelSpacing[:2]]
+        first_position = np.array(dicom_files[0].ImagePositionPatient, dtype=float)
+        if len(dicom_files) > 1:
+            slice_step = (
+                np.array(dicom_files[-1].ImagePositionPatient, dtype=float) - first_position
+            ) / (len(dicom_files) - 1)
+        else:
+            slice_step = np.cross(row_direction, column_direction) * float(
+                getattr(dicom_files[0], "SpacingBetweenSlices", None)
+                or getattr(dicom_files[0], "SliceThickness", 1)
+            )
+        affine = np.eye(4)
+        # increasing row index moves along column direction cosine, increasing column index along row direction cosine
+        affine[:3, 0] = column_direction * row_spacing
+        affine[:3, 1] = row_direction * column_spacing
+        affine[:3, 2] = slice_step
+        affine[:3, 3] = first_position
+        return affine
+
+    def get_frame_of_reference(self) -> str:
+        return getattr(self.dicom_files[0], "FrameOfReferenceUID", None)
+
+    def get_orientation(self) -> np.array:
+        return np.array(self.dicom_files[0].ImageOrientationPatient, dtype=float)
+
+    def index_to_patient(self, index: List[float]) -> np.array:
+        return (self.affine @ np.append(np.array(index, dtype=float), 1))[:3]
+
+    def patient_to_index(self, position: List[float]) -> np.array:
+        return (np.linalg.inv(self.affine) @ np.append(np.array(position, dtype=float), 1))[:3]
+
+    def get_center(self) -> np.array:
+        """Return index of volume center."""
+        return (np.array(self.shape) - 1) / 2
+
+    def get_corners(self) -> np.array:
+        """Return patient positions of all 8 volume corners."""
+        return np.array(
+            [
+                self.index_to_patient(np.array(corner) * (np.array(self.shape) - 1))
+                for corner in np.ndindex(2, 2, 2)
+            ]
+        )
+
+    def get_overlap_roi(self, patient_space: "PatientSpace") -> Tuple[slice]:
+        """Return slices of this volume covering the extent of patient_space, None if volumes do not overlap."""
+        indices = np.array(
+            [self.patient_to_index(corner) for corner in patient_space.get_corners()]
+        )
+        roi = tuple(
+            slice(
+                max(0, int(np.floor(np.amin(indices[:, axis])))),
+                min(dim, int(np.ceil(np.amax(indices[:, axis]))) + 1),
+            )
+            for axis, dim in enumerate(self.shape)
+        )
+        return roi if all(dim.start < dim.stop for dim in roi) else None
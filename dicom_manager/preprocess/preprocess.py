@@ -17,6 +17,7 @@ from natsort import natsorted
 
 from dicom_manager.directory_manager import DirManager
 from dicom_manager.file_readers.read_dicom import ReadDicom
+from dicom_manager.file_readers.read_dicom_preview import ReadDicomPreview
 from dicom_manager.file_readers.read_nifti import ReadNifti
 from dicom_manager.file_readers.read_image_label_pair import ReadImageLabelPair
 from dicom_manager.preprocess.dicom_finder import DicomFinder
@@ -28,7 +29,15 @@ class PreProcess:
 
     dicom_finder = DicomFinder()
 
-    def __init__(self, DIR_RAW, add_subgroup=False, value_clip=False, allow=[]):
+    def __init__(
+        self,
+        DIR_RAW,
+        add_subgroup=False,
+        value_clip=False,
+        allow=[],
+        compression: str = "uncompressed",
+        workers: int = 1,
+    ):
         self.RAW_DICOM_DIRS = self.dicom_finder.get_dicom_dirs(DIR_RAW)
         DIR_PREPROCESSED = (
             "raw".join(DIR_RAW.split("raw")[:-1]) + "preprocessed"
@@ -51,6 +60,8 @@ class PreProcess:
         self.configure_logger(DIR_PREPROCESSED, add_subgroup)
         self.value_clip = value_clip
         self.allow = allow
+        self.compression = compression
+        self.workers = workers
 
     def configure_logger(self, log_directory: pathlib.Path, add_subgroup) -> None:
         log_date = datetime.now()
@@ -92,7 +103,12 @@ class PreProcess:
     ) -> None:
         raw = ReadDicom(raw_dicom_dir, value_clip=self.value_clip, allow=self.allow)
         raw.prep_for_nifti(raw.files, is_label)
-        raw.writer.save_all(raw.files, clean_dicom_dir)
+        raw.writer.save_all(
+            raw.files,
+            clean_dicom_dir,
+            compression=self.compression,
+            workers=self.workers,
+        )
         log.info(f"{raw_dicom_dir} preprocessed as DICOM to {clean_dicom_dir}")
 
     def get_clean_dicom_dir(self, case_name: str, is_label=bool) -> pathlib.Path:
@@ -147,17 +163,32 @@ class PreProcess:
             return kwargs
         return kwargs
 
+    def read_dicom_preview(self, dicom_dir: pathlib.Path, value_clip=False):
+        """
+        Return ReadDicomPreview reading only the orthoview planes of uncompressed series,
+        full ReadDicom for compressed series or when value_clip is set.
+        """
+        if not value_clip:
+            dicom_preview = ReadDicomPreview(dicom_dir, allow=self.allow)
+            if dicom_preview.supported:
+                return dicom_preview
+        return ReadDicom(dicom_dir, allow=self.allow, value_clip=value_clip)
+
+    def get_preview_range(self, dicom_preview) -> np.array:
+        """Return array spanning the legend range, the three planes' range for partial-read previews."""
+        if isinstance(dicom_preview, ReadDicomPreview):
+            return np.array(dicom_preview.viewer.get_value_range())
+        return dicom_preview.arr
+
     def preview_raw_dicom(self, value_clip=False, **kwargs) -> None:
         """Generate orthoview previews of original/raw DICOM files."""
         for raw_dicom_dir in tqdm(
             natsorted(glob(os.path.join(self.DIRS.DIR_RAW, "*/"))),
             desc="generating previews of raw data...",
         ):
-            raw_dicom = ReadDicom(
-                raw_dicom_dir, allow=self.allow, value_clip=value_clip
-            )
+            raw_dicom = self.read_dicom_preview(raw_dicom_dir, value_clip=value_clip)
             raw_dicom.viewer.orthoview(
-                **self.build_legend(raw_dicom_dir, raw_dicom.arr, **kwargs)
+                **self.build_legend(raw_dicom_dir, self.get_preview_range(raw_dicom), **kwargs)
             )
 
     def preview_preprocessed_dicom(self, value_clip=False, **kwargs) -> None:
@@ -167,11 +198,11 @@ class PreProcess:
             + natsorted(glob(os.path.join(self.DIRS.DIR_PRE_DICOM_LABELS, "*/"))),
             desc="generating previews of preprocessed DICOM data...",
         ):
-            clean_dicom = ReadDicom(
-                clean_dicom_dir, allow=self.allow, value_clip=value_clip
-            )
+            clean_dicom = self.read_dicom_preview(clean_dicom_dir, value_clip=value_clip)
             clean_dicom.viewer.orthoview(
-                **self.build_legend(clean_dicom_dir, clean_dicom.arr, **kwargs)
+                **self.build_legend(
+                    clean_dicom_dir, self.get_preview_range(clean_dicom), **kwargs
+                )
             )
 
     def preview_preprocessed_dicom_pair(self, value_clip=False, **kwargs) -> None:
@@ -0,0 +1,153 @@
+"""Resample (Y, X, Z) volumes by per-axis zoom factors, computing only a region of the output grid."""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+
+import numpy as np
+
+
+class VolumeResampler:
+    """
+    Output grid matches scipy.ndimage.zoom (shape round(dim * zoom), corner-aligned coordinates).
+    Images are resampled with separable float32 linear interpolation, labels with nearest neighbour
+    (or label-wise linear interpolation), in Z slabs split across threads.
+    """
+
+    def __init__(self, workers: int = 1, slab_size: int = 16):
+        self.workers = workers
+        self.slab_size = slab_size
+
+    def get_output_shape(self, shape: Tuple[int], resize_dims: List[float]) -> Tuple[int]:
+        return tuple(int(round(dim * zoom)) for dim, zoom in zip(shape, resize_dims))
+
+    def get_scale(self, input_len: int, output_len: int) -> float:
+        """Return input coordinate step per output index."""
+        return (input_len - 1) / (output_len - 1) if output_len > 1 else 0.0
+
+    def map_to_output(
+        self, position: List[float], shape: Tuple[int], resize_dims: List[float]
+    ) -> List[float]:
+        """Return input grid position (e.g. a centroid) in output grid coordinates."""
+        return [
+            pos / self.get_scale(input_len, output_len)
+            if self.get_scale(input_len, output_len)
+            else 0.0
+            for pos, input_len, output_len in zip(
+                position, shape, self.get_output_shape(shape, resize_dims)
+            )
+        ]
+
+    def get_roi(self, output_shape: Tuple[int], roi: Tuple[slice] = None) -> Tuple[slice]:
+        if roi is None:
+            return tuple(slice(0, dim) for dim in output_shape)
+        return tuple(
+            slice(*dim.indices(output_len)[:2]) for dim, output_len in zip(roi, output_shape)
+        )
+
+    def get_coordinates(self, input_len: int, output_len: int, output_slice: slice) -> np.array:
+        return np.arange(output_slice.start, output_slice.stop) * self.get_scale(
+            input_len, output_len
+        )
+
+    def interpolate_axis(self, arr: np.array, coordinates: np.array, axis: int) -> np.array:
+        """Return float32 arr linearly interpolated at coordinates along axis."""
+        lower = np.clip(np.floor(coordinates).astype(np.intp), 0, arr.shape[axis] - 1)
+        upper = np.minimum(lower + 1, arr.shape[axis] - 1)
+        weight_shape = [1] * arr.ndim
+        weight_shape[axis] = -1
+        weights = (coordinates - lower).astype(np.float32).reshape(weight_shape)
+        lower_values = np.take(arr, lower, axis=axis).astype(np.float32, copy=False)
+        return lower_values + (np.take(arr, upper, axis=axis) - lower_values) * weights
+
+    def resample_slab(
+        self, arr: np.array, coordinates: List[np.array], order: int
+    ) -> np.array:
+        """Return arr sampled at separable per-axis coordinates, Z first so later axes only see needed slices."""
+        if order == 0:
+            indices = [
+                np.clip(np.rint(axis_coordinates).astype(np.intp), 0, dim - 1)
+                for axis_coordinates, dim in zip(coordinates, arr.shape)
+            ]
+            return arr[np.ix_(*indices)]
+        for axis in (2, 0, 1):
+            arr = self.interpolate_axis(arr, coordinates[axis], axis)
+        return arr
+
+    def resample(
+        self,
+        arr: np.array,
+        resize_dims: List[float],
+        roi: Tuple[slice] = None,
+        order: int = 1,
+        dtype=np.float32,
+    ) -> np.array:
+        """
+        Return (Y, X, Z) arr resampled by resize_dims, only computing roi slices of the output grid.
+        order 0 is nearest neighbour, order 1 is linear.
+        """
+        assert order in (0, 1), "only nearest neighbour (0) and linear (1) resampling are supported"
+        output_shape = self.get_output_shape(arr.shape, resize_dims)
+        roi = self.get_roi(output_shape, roi)
+        coordinates = [
+            self.get_coordinates(input_len, output_len, output_slice)
+            for input_len, output_len, output_slice in zip(arr.shape, output_shape, roi)
+        ]
+        resampled = np.zeros([dim.stop - dim.start for dim in roi], dtype=dtype)
+        slabs = [
+            slice(start, min(start + self.slab_size, resampled.shape[-1]))
+            for start in range(0, resampled.shape[-1], self.slab_size)
+        ]
+
+        def resample_slab(slab: slice) -> None:
+            slab_coordinates = coordinates[:2] + [coordinates[2][slab]]
+            if not slab_coordinates[2].size:
+                return
+            # only input slices between the slab's first and last coordinate are read
+            start = int(np.floor(slab_coordinates[2][0]))
+            stop = min(int(np.floor(slab_coordinates[2][-1])) + 2, arr.shape[-1])
+            slab_coordinates[2] = slab_coordinates[2] - start
+            resampled[..., slab] = self.resample_slab(
+                arr[..., start:stop], slab_coordinates, order
+            )
+
+        if self.workers > 1 and len(slabs) > 1:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                list(executor.map(resample_slab, slabs))
+        else:
+            for slab in slabs:
+                resample_slab(slab)
+        return resampled
+
+    def resample_image(
+        self, image_array: np.array, resize_dims: List[float], roi: Tuple[slice] = None
+    ) -> np.array:
+        """Return float32 linearly resampled image."""
+        return self.resample(image_array, resize_dims, roi, order=1, dtype=np.float32)
+
+    def resample_label(
+        self,
+        label_array: np.array,
+        resize_dims: List[float],
+        roi: Tuple[slice] = None,
+        label_wise: bool = False,
+    ) -> np.array:
+        """
+        Return uint8 resampled label keeping only original label values, nearest neighbour by default.
+        label_wise linearly resamples each label's mask and keeps the value with the largest weight.
+        """
+        if not label_wise:
+            return self.resample(label_array, resize_dims, roi, order=0, dtype=np.uint8)
+        label_values = np.unique(label_array)
+        best_weights, resampled = None, None
+        for label_value in label_values:
+            weights = self.resample(
+                (label_array == label_value).view(np.uint8), resize_dims, roi, order=1
+            )
+            if resampled is None:
+                best_weights = weights
+                resampled = np.full(weights.shape, label_value, dtype=np.uint8)
+                continue
+            better = weights > best_weights
+            best_weights[better] = weights[better]
+            resampled[better] = label_value
+        return resampled
@@ -0,0 +1,82 @@
+"""Build small synthetic CT series on disk for tests."""
+
+import os
+import pathlib
+from typing import List
+
+import numpy as np
+from pydicom.dataset import FileDataset, FileMetaDataset
+from pydicom.uid import generate_uid
+
+CT_IMAGE_STORAGE = "1.2.840.10008.5.1.4.1.1.2"
+EXPLICIT_VR_LITTLE_ENDIAN = "1.2.840.10008.1.2.1"
+IMPLICIT_VR_LITTLE_ENDIAN = "1.2.840.10008.1.2"
+
+
+def build_slice(
+    pixel_array: np.array,
+    slice_position: float,
+    instance_number: int,
+    series_uid: str,
+    spacing: tuple = (0.7, 0.7, 2.5),
+    implicit: bool = False,
+) -> FileDataset:
+    """Return single CT slice with signed 16 bit pixel data at z = slice_position."""
+    file_meta = FileMetaDataset()
+    file_meta.TransferSyntaxUID = (
+        IMPLICIT_VR_LITTLE_ENDIAN if implicit else EXPLICIT_VR_LITTLE_ENDIAN
+    )
+    file_meta.MediaStorageSOPClassUID = CT_IMAGE_STORAGE
+    file_meta.MediaStorageSOPInstanceUID = generate_uid()
+    dicom_file = FileDataset("", {}, file_meta=file_meta, preamble=b"\0" * 128)
+    dicom_file.SOPClassUID = CT_IMAGE_STORAGE
+    dicom_file.SOPInstanceUID = file_meta.MediaStorageSOPInstanceUID
+    dicom_file.SeriesInstanceUID = series_uid
+    dicom_file.Modality = "CT"
+    dicom_file.PixelSpacing = list(spacing[:2])
+    dicom_file.SpacingBetweenSlices = spacing[2]
+    dicom_file.ImagePositionPatient = [0, 0, slice_position]
+    dicom_file.ImageOrientationPatient = [1, 0, 0, 0, 1, 0]
+    dicom_file.InstanceNumber = instance_number
+    dicom_file.Rows, dicom_file.Columns = pixel_array.shape
+    dicom_file.SamplesPerPixel = 1
+    dicom_file.PhotometricInterpretation = "MONOCHROME2"
+    dicom_file.BitsAllocated = 16
+    dicom_file.BitsStored = 16
+    dicom_file.HighBit = 15
+    dicom_file.PixelRepresentation = 1
+    dicom_file.RescaleIntercept = 0
+    dicom_file.RescaleSlope = 1
+    dicom_file.PixelData = pixel_array.astype("<i2").tobytes()
+    return dicom_file
+
+
+def write_series(
+    target_dir: pathlib.Path,
+    volume: np.array,
+    slice_nums: List[int] = None,
+    spacing: tuple = (0.7, 0.7, 2.5),
+    implicit: bool = False,
+    origin: float = 0.0,
+) -> pathlib.Path:
+    """
+    Write (Y, X, Z) volume as a CT series starting at z = origin, one file per slice in shuffled file name order.
+    slice_nums selects which slices are written, so gaps in the series can be left.
+    """
+    os.makedirs(target_dir, exist_ok=True)
+    series_uid = generate_uid()
+    slice_nums = range(volume.shape[-1]) if slice_nums is None else slice_nums
+    for file_num, slice_num in enumerate(np.random.default_rng(0).permutation(list(slice_nums))):
+        build_slice(
+            volume[..., slice_num],
+            origin + spacing[2] * int(slice_num),
+            int(slice_num) + 1,
+            series_uid,
+            spacing,
+            implicit,
+        ).save_as(
+            os.path.join(target_dir, f"{str(file_num).zfill(4)}.dcm"),
+            implicit_vr=implicit,
+            little_endian=True,
+        )
+    return target_dir
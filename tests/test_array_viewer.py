@@ -0,0 +1,26 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from dicom_manager.file_viewers.array_viewer import ArrayViewer
+
+
+class TestArrayViewer(unittest.TestCase):
+    def test_orthoview_window_not_carried_over(self):
+        arr = np.random.default_rng(0).integers(-1000, 2000, (16, 12, 6))
+        viewer = ArrayViewer(arr, (0.7, 0.7, 2.5))
+        viewer.plotter = mock.Mock()
+        viewer.orthoview()
+        viewer.orthoview(window="ct_brain")
+        viewer.orthoview()
+        default, windowed, after = [
+            call.args[0][0] for call in viewer.plotter.plot_images.call_args_list
+        ]
+        self.assertFalse(np.array_equal(default, windowed))
+        self.assertTrue(np.array_equal(default, after))
+        self.assertIsNone(viewer.window)
+
+
+if __name__ == "__main__":
+    unittest.main()
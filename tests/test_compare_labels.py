@@ -0,0 +1,70 @@
+import os
+import tempfile
+import unittest
+
+import nibabel as nib
+import numpy as np
+
+from dicom_manager.postprocess.compare_labels import CompareLabels
+from tests.synthetic_dicom import write_series
+
+# (Y, X, step) with different in-plane spacing, so swapped Y/X spacing changes distances
+SPACING = (0.8, 0.6, 2.5)
+
+
+class TestCompareLabels(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.label = np.zeros((20, 16, 6), dtype=np.uint8)
+        self.label[5:12, 4:10, 1:5] = 1
+        self.compare_labels = self.get_compare_labels()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def get_compare_labels(self, allow: list = []) -> CompareLabels:
+        return CompareLabels(
+            self.tmp_dir.name,
+            os.path.join(self.tmp_dir.name, "labels_1"),
+            os.path.join(self.tmp_dir.name, "labels_2"),
+            self.tmp_dir.name,
+            allow=allow,
+        )
+
+    def write_nifti(self, labels_dir: str, label: np.array) -> None:
+        """Write (Y, X, Z) label in the NIFTI orientation ReadNifti rotates back from, zooms in (x, y, z) order."""
+        os.makedirs(os.path.join(self.tmp_dir.name, labels_dir), exist_ok=True)
+        nib.save(
+            nib.Nifti1Image(
+                np.ascontiguousarray(np.rot90(label, k=-1, axes=(0, 1))),
+                np.diag([SPACING[1], SPACING[0], SPACING[2], 1]),
+            ),
+            os.path.join(self.tmp_dir.name, labels_dir, "case.nii.gz"),
+        )
+
+    def test_float_stored_labels_round(self):
+        self.write_nifti("labels_1", self.label)
+        self.write_nifti("labels_2", self.label.astype(np.float32) * np.float32(0.99999994))
+        metrics = self.compare_labels.compare_case("case", {"a": 1})
+        self.assertEqual(metrics["a dice"], 1.0)
+        self.assertAlmostEqual(metrics["a volume_1_cm3"], metrics["a volume_2_cm3"])
+
+    def test_in_plane_spacing_order(self):
+        shifted_x, shifted_y = np.roll(self.label, 1, axis=1), np.roll(self.label, 1, axis=0)
+        for shifted, step in ((shifted_x, SPACING[1]), (shifted_y, SPACING[0])):
+            self.write_nifti("labels_1", self.label)
+            self.write_nifti("labels_2", shifted)
+            metrics = self.compare_labels.compare_case("case", {"a": 1}, surface_distance=True)
+            self.assertAlmostEqual(metrics["a hausdorff_mm"], step, places=5)
+
+    def test_mixed_label_formats(self):
+        self.write_nifti("labels_1", self.label)
+        write_series(os.path.join(self.tmp_dir.name, "labels_2", "case"), self.label, spacing=(0.8, 0.6, 2.5))
+        with self.assertRaises(AssertionError):
+            self.compare_labels.compare_case("case", {"a": 1})
+        metrics = self.get_compare_labels(allow=["mixed_label_formats"]).compare_case("case", {"a": 1})
+        self.assertEqual(metrics["a dice"], 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+
+import cv2
+import numpy as np
+
+from dicom_manager.file_viewers.contour_renderer import ContourRenderer
+
+
+class TestContourRenderer(unittest.TestCase):
+    def setUp(self):
+        self.label_1 = np.zeros((32, 24, 10), dtype=np.uint8)
+        self.label_2 = np.zeros((32, 24, 10), dtype=np.uint8)
+        self.label_1[4:12, 3:10, 1:3] = 1
+        self.label_2[18:28, 12:20, 6:8] = 1
+
+    def brute_force_render(self, label_1: np.array, label_2: np.array, thickness: int = 2) -> np.array:
+        """Draw contours of every slice with cv2 directly, no z-range restriction."""
+        expected = np.zeros(label_1.shape, dtype=np.uint8)
+        for slice_num in range(label_1.shape[-1]):
+            contours = []
+            for label_array in (label_1, label_2):
+                contour_image = np.zeros(label_array.shape[:2], dtype=np.uint8)
+                found, _ = cv2.findContours(
+                    np.ascontiguousarray(label_array[..., slice_num] > 0, dtype=np.uint8),
+                    cv2.RETR_EXTERNAL,
+                    cv2.CHAIN_APPROX_SIMPLE,
+                )
+                cv2.drawContours(contour_image, found, -1, 1, thickness)
+                contours.append(contour_image.astype(bool))
+            expected[..., slice_num][contours[0]] = 2
+            expected[..., slice_num][contours[1]] = 3
+            expected[..., slice_num][contours[0] & contours[1]] = 1
+        return expected
+
+    def test_empty_masks(self):
+        empty = np.zeros_like(self.label_1)
+        self.assertIsNone(ContourRenderer().get_z_range(empty, empty))
+        multi_label_array = np.zeros(empty.shape, dtype=np.uint8)
+        rendered = ContourRenderer().render(empty, empty, multi_label_array)
+        self.assertIs(rendered, multi_label_array)
+        self.assertFalse(rendered.any())
+
+    def test_disjoint_masks(self):
+        self.assertEqual(ContourRenderer().get_z_range(self.label_1, self.label_2), slice(1, 8))
+        expected = self.brute_force_render(self.label_1, self.label_2)
+        for workers in (1, 3):
+            rendered = ContourRenderer(workers=workers).render(self.label_1, self.label_2)
+            self.assertTrue(np.array_equal(rendered, expected))
+        # no slice holds both labels, so no shared contour and nothing between the label slices
+        self.assertFalse((rendered == 1).any())
+        self.assertFalse(rendered[..., 3:6].any())
+        self.assertEqual(set(np.unique(rendered[..., 1:3])), {0, 2})
+        self.assertEqual(set(np.unique(rendered[..., 6:8])), {0, 3})
+
+    def test_overlapping_masks(self):
+        self.label_2[4:12, 3:10, 2:4] = 1
+        expected = self.brute_force_render(self.label_1, self.label_2)
+        rendered = ContourRenderer(workers=2).render(self.label_1, self.label_2)
+        self.assertTrue(np.array_equal(rendered, expected))
+        self.assertTrue((rendered[..., 2] == 1).any())
+
+
+if __name__ == "__main__":
+    unittest.main()
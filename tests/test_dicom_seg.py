@@ -0,0 +1,46 @@
+import tempfile
+import unittest
+
+import numpy as np
+
+from dicom_manager.file_readers.read_dicom import ReadDicom
+from dicom_manager.file_readers.read_dicom_seg import ReadDicomSeg
+from dicom_manager.file_writers.dicom_seg_writer import DicomSegWriter
+from tests.synthetic_dicom import write_series
+
+
+class TestDicomSeg(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.dicom_read = ReadDicom(
+            write_series(f"{self.tmp_dir.name}/image", np.zeros((9, 7, 6), dtype=np.int16))
+        )
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_round_trip(self):
+        label = np.zeros((9, 7, 6), dtype=np.uint8)
+        label[1:3, 1:4, 2] = 1
+        label[4:6, 0:2, 3:5] = 2
+        label[0, 0, 5] = 3
+        DicomSegWriter().save_seg(
+            label, self.dicom_read.files, self.dicom_read.spacing, f"{self.tmp_dir.name}/seg"
+        )
+        seg_read = ReadDicomSeg(f"{self.tmp_dir.name}/seg")
+        self.assertTrue(np.array_equal(seg_read.arr, label))
+        self.assertEqual(
+            [float(spacing) for spacing in seg_read.spacing],
+            [float(spacing) for spacing in self.dicom_read.spacing],
+        )
+
+    def test_round_trip_empty(self):
+        label = np.zeros((9, 7, 6), dtype=np.uint8)
+        DicomSegWriter().save_seg(
+            label, self.dicom_read.files, self.dicom_read.spacing, f"{self.tmp_dir.name}/seg"
+        )
+        self.assertTrue(np.array_equal(ReadDicomSeg(f"{self.tmp_dir.name}/seg").arr, label))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import copy
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from dicom_manager.file_readers.read_dicom import ReadDicom
+from dicom_manager.file_writers.dicom_writer import DicomWriter
+from tests.synthetic_dicom import write_series
+
+
+class TestDicomWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.volume = np.random.default_rng(0).integers(-1000, 2000, (16, 12, 7))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_written_files_deep_copy(self):
+        dicom_read = ReadDicom(write_series(self.tmp_dir.name, self.volume))
+        dicom_copy = copy.deepcopy(dicom_read.files[0])
+        self.assertTrue(np.array_equal(dicom_copy.pixel_array, self.volume[..., 0]))
+
+    def test_prep_for_nifti_missing_slice(self):
+        slice_nums = [0, 1, 2, 4, 5, 6]
+        dicom_read = ReadDicom(write_series(self.tmp_dir.name, self.volume, slice_nums))
+        dicom_read.prep_for_nifti(dicom_read.files, is_label=False)
+        self.assertEqual(dicom_read.arr.shape, (16, 12, len(slice_nums)))
+        self.assertTrue(np.array_equal(dicom_read.arr, self.volume[..., slice_nums]))
+
+    def test_save_all_compression_round_trip(self):
+        raw_dir = write_series(os.path.join(self.tmp_dir.name, "raw"), self.volume)
+        for compression in ("uncompressed", "deflate", "rle"):
+            destination_dir = os.path.join(self.tmp_dir.name, compression)
+            DicomWriter().save_all(ReadDicom(raw_dir).files, destination_dir, compression=compression)
+            self.assertTrue(np.array_equal(ReadDicom(destination_dir).arr, self.volume))
+
+    def test_pixel_dtype_out_of_range(self):
+        with self.assertRaises(ValueError):
+            DicomWriter().get_pixel_dtype(np.array([0, 2**40]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+
+import numpy as np
+
+from dicom_manager.postprocess.label_measurements import LabelMeasurements
+
+
+class TestLabelMeasurements(unittest.TestCase):
+    def setUp(self):
+        self.spacing = [0.7, 0.8, 2.5]
+        self.label_array = np.random.default_rng(0).integers(0, 4, (16, 12, 7))
+        self.measurements = LabelMeasurements(self.label_array, self.spacing)
+
+    def test_volume(self):
+        for label_value in range(6):
+            self.assertAlmostEqual(
+                self.measurements.get_volume(label_value),
+                np.sum(self.label_array == label_value) * np.prod(self.spacing) / 1000,
+            )
+
+    def test_area(self):
+        for label_value in range(6):
+            np.testing.assert_allclose(
+                self.measurements.get_area(label_value),
+                np.sum(self.label_array == label_value, axis=(0, 1)) * 0.7 * 0.8 / 100,
+            )
+
+    def test_single_slice_area(self):
+        measurements = LabelMeasurements(self.label_array[..., :1], self.spacing)
+        self.assertAlmostEqual(
+            measurements.get_area(2), np.sum(self.label_array[..., 0] == 2) * 0.7 * 0.8 / 100
+        )
+
+    def test_label_key(self):
+        self.assertEqual(
+            self.measurements.get_volumes({"liver": 1, "absent": 9}),
+            {"liver": self.measurements.get_volume(1), "absent": 0},
+        )
+
+    def test_float_labels_round(self):
+        # float labels decoded just below their value count as that label, not the one below
+        measurements = LabelMeasurements(
+            self.label_array.astype(np.float32) * np.float32(0.99999994), self.spacing
+        )
+        self.assertTrue(np.array_equal(measurements.slice_counts, self.measurements.slice_counts))
+
+    def test_negative_values(self):
+        with self.assertRaises(AssertionError):
+            LabelMeasurements(self.label_array - 1, self.spacing)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+
+import numpy as np
+
+from dicom_manager.postprocess.label_overlap import LabelOverlap
+
+
+def random_labels(rng: np.random.Generator, shape: tuple, num_labels: int) -> np.array:
+    """Return (Y, X, Z) uint8 label volume of random overlapping boxes."""
+    label_array = np.zeros(shape, dtype=np.uint8)
+    for label_value in range(1, num_labels + 1):
+        for _ in range(2):
+            y, x, z = (rng.integers(0, dim - 2) for dim in shape)
+            label_array[
+                y : y + rng.integers(1, 9), x : x + rng.integers(1, 9), z : z + rng.integers(1, 5)
+            ] = label_value
+    return label_array
+
+
+class TestLabelOverlap(unittest.TestCase):
+    def setUp(self):
+        self.spacing = [0.7, 0.8, 2.5]
+        self.rng = np.random.default_rng(0)
+
+    def check_metrics(self, label_array_1: np.array, label_array_2: np.array) -> None:
+        metrics = LabelOverlap(label_array_1, label_array_2, self.spacing).get_metrics()
+        voxel_volume = np.prod(self.spacing) / 1000
+        for label_value in (set(np.unique(label_array_1)) | set(np.unique(label_array_2))) - {0}:
+            mask_1, mask_2 = label_array_1 == label_value, label_array_2 == label_value
+            intersection, union = np.sum(mask_1 & mask_2), np.sum(mask_1 | mask_2)
+            self.assertAlmostEqual(
+                metrics[f"label {label_value} dice"],
+                2 * intersection / (mask_1.sum() + mask_2.sum()),
+            )
+            self.assertAlmostEqual(metrics[f"label {label_value} jaccard"], intersection / union)
+            self.assertAlmostEqual(
+                metrics[f"label {label_value} volume_difference_cm3"],
+                (mask_2.sum() - mask_1.sum()) * voxel_volume,
+            )
+
+    def test_metrics_brute_force(self):
+        for shape in ((37, 45, 9), (16, 8, 3)):
+            for num_labels in (1, 3):
+                self.check_metrics(
+                    random_labels(self.rng, shape, num_labels),
+                    random_labels(self.rng, shape, num_labels),
+                )
+
+    def test_empty_labels(self):
+        empty = np.zeros((8, 9, 3), dtype=np.uint8)
+        metrics = LabelOverlap(empty, empty, self.spacing).get_metrics({"liver": 1})
+        self.assertTrue(np.isnan(metrics["liver dice"]))
+        self.assertEqual(metrics["liver volume_1_cm3"], 0)
+
+    def test_metric_names(self):
+        label_array = random_labels(self.rng, (16, 8, 3), 2)
+        label_key = {"liver": 1, "tumor": 2}
+        self.assertEqual(
+            list(LabelOverlap(label_array, label_array, self.spacing).get_metrics(label_key)),
+            LabelOverlap.get_metric_names(label_key),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
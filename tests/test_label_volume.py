@@ -0,0 +1,96 @@
+import unittest
+
+import numpy as np
+from scipy import ndimage
+
+from dicom_manager.file_readers.label_volume import LabelVolume, SparseLabelVolume
+
+
+class TestLabelVolume(unittest.TestCase):
+    def setUp(self):
+        self.spacing = [0.7, 0.8, 2.5]
+        rng = np.random.default_rng(0)
+        # X of 13 is not a multiple of 8, the last packed byte is partial
+        self.label_array = rng.integers(0, 3, (11, 13, 5)).astype(np.uint8)
+        self.mask = (self.label_array == 1).astype(np.uint8)
+
+    def check_planes(self, label_volume: LabelVolume, label_array: np.array) -> None:
+        self.assertTrue(np.array_equal(label_volume.arr, label_array))
+        for slice_num in range(label_array.shape[2]):
+            self.assertTrue(
+                np.array_equal(label_volume.get_transverse(slice_num), label_array[..., slice_num])
+            )
+        for row_num in range(label_array.shape[0]):
+            self.assertTrue(np.array_equal(label_volume.get_coronal(row_num), label_array[row_num]))
+        for column_num in range(label_array.shape[1]):
+            self.assertTrue(
+                np.array_equal(label_volume.get_sagittal(column_num), label_array[:, column_num])
+            )
+        roi = (slice(2, 7), slice(3, 12), slice(1, 4))
+        self.assertTrue(np.array_equal(label_volume.get_block(roi), label_array[roi]))
+        np.testing.assert_allclose(
+            label_volume.get_center_of_mass(), ndimage.center_of_mass(label_array > 0)
+        )
+
+    def test_packed(self):
+        label_volume = LabelVolume(self.mask, self.spacing)
+        self.assertTrue(label_volume.packed)
+        self.assertEqual(label_volume.nbytes, 11 * 2 * 5)
+        self.check_planes(label_volume, self.mask)
+
+    def test_multi_label(self):
+        label_volume = LabelVolume(self.label_array, self.spacing)
+        self.assertFalse(label_volume.packed)
+        self.check_planes(label_volume, self.label_array)
+
+    def test_counts(self):
+        for label_array in (self.mask, self.label_array):
+            label_volume = LabelVolume(label_array, self.spacing)
+            other = LabelVolume(np.roll(label_array, 1, axis=1), self.spacing)
+            for label_value in (1, 2):
+                self.assertEqual(label_volume.count(label_value), np.sum(label_array == label_value))
+                self.assertEqual(
+                    label_volume.count_overlap(other, label_value),
+                    np.sum((label_array == label_value) & (other.arr == label_value)),
+                )
+            self.assertTrue(
+                np.array_equal(
+                    label_volume.get_slice_counts(1), np.sum(label_array == 1, axis=(0, 1))
+                )
+            )
+
+    def test_sparse(self):
+        for roi in (
+            (slice(2, 5), slice(9, 12), slice(1, 3)),
+            (slice(0, 11), slice(0, 13), slice(0, 5)),
+            (slice(4, 6), slice(3, 4), slice(2, 3)),
+        ):
+            label_array = np.zeros_like(self.label_array)
+            label_array[roi] = self.label_array[roi]
+            label_volume = SparseLabelVolume(label_array, self.spacing)
+            self.check_planes(label_volume, label_array)
+            for label_value in (1, 2, 3):
+                self.assertTrue(
+                    np.array_equal(label_volume.get_mask(label_value), label_array == label_value)
+                )
+                self.assertTrue(
+                    np.array_equal(
+                        label_volume.get_packed_mask(label_value),
+                        np.packbits(label_array == label_value, axis=1),
+                    )
+                )
+                self.assertEqual(
+                    label_volume.count_overlap(LabelVolume(self.label_array, self.spacing), label_value),
+                    np.sum((label_array == label_value) & (self.label_array == label_value)),
+                )
+
+    def test_sparse_empty(self):
+        label_volume = SparseLabelVolume(np.zeros_like(self.label_array), self.spacing)
+        self.assertEqual(label_volume.nbytes, 0)
+        self.assertFalse(label_volume.get_mask(1).any())
+        self.assertFalse(label_volume.get_packed_mask(1).any())
+        self.assertEqual(label_volume.get_values(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,206 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import nibabel as nib
+import numpy as np
+
+from dicom_manager.file_readers.read_dicom import ReadDicom
+from dicom_manager.file_writers.save_measurements_to_csv import MeasurementSaver, pa
+from dicom_manager.postprocess.postprocess import PostProcess
+from tests.synthetic_dicom import write_series
+
+SPACING = (0.7, 0.8, 2.5)
+
+
+class PostProcessTestCase(unittest.TestCase):
+    """Raw, preprocessed DICOM/NIFTI and inference directories of synthetic cases, laid out as PostProcess expects."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = self.tmp_dir.name
+        self.label = np.zeros((16, 12, 7), dtype=np.uint8)
+        self.label[3:8, 2:6, 2:5] = 1
+        self.label[10:12, 8:10, 3] = 2
+        # asymmetric along Z, so reversed slice order would change per slice areas
+        self.label[0:2, 0:3, 0] = 1
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def get_postprocess(self, **kwargs) -> PostProcess:
+        postprocess = PostProcess(
+            os.path.join(self.root, "preprocessed", "dicom"),
+            os.path.join(self.root, "preprocessed", "nifti"),
+            os.path.join(self.root, "inference"),
+            **kwargs,
+        )
+        # volume is a class attribute, keep measurements of each test apart
+        postprocess.volume = {}
+        return postprocess
+
+    def write_nifti(self, write_path: str, arr: np.array, slope: float = 1.0) -> str:
+        """Write (Y, X, Z) arr in the NIFTI orientation ReadNifti rotates back from."""
+        os.makedirs(os.path.dirname(write_path), exist_ok=True)
+        image = nib.Nifti1Image(
+            np.ascontiguousarray(np.rot90(arr, k=-1, axes=(0, 1))),
+            np.diag([SPACING[1], SPACING[0], SPACING[2], 1]),
+        )
+        image.header.set_slope_inter(slope, 0)
+        nib.save(image, write_path)
+        return write_path
+
+    def write_case(self, case: str) -> None:
+        """Write raw series, preprocessed DICOM (pointing back at raw files) and preprocessed NIFTI of case."""
+        volume = np.random.default_rng(0).integers(-1000, 2000, self.label.shape)
+        raw_dir = write_series(os.path.join(self.root, "raw", case), volume, spacing=SPACING)
+        dicom_read = ReadDicom(raw_dir)
+        dicom_read.writer.save_all(
+            dicom_read.files, os.path.join(self.root, "preprocessed", "dicom", case)
+        )
+        self.write_nifti(
+            os.path.join(self.root, "preprocessed", "nifti", f"{case}_0000.nii.gz"),
+            dicom_read.arr.astype(np.int16),
+        )
+
+    def write_inference(self, case: str, stored: str = "uint8") -> str:
+        """
+        Write inference label of case, stored as uint8, as float32 just below the label values
+        or as int16 scaled by a slope just below 1, the last two decode to e.g. 0.99999994 for label 1.
+        """
+        write_path = os.path.join(self.root, "inference", f"{case}.nii.gz")
+        if stored == "float32":
+            return self.write_nifti(
+                write_path, (self.label * np.float32(0.99999994)).astype(np.float32)
+            )
+        if stored == "scaled":
+            return self.write_nifti(write_path, self.label.astype(np.int16), slope=0.9999)
+        return self.write_nifti(write_path, self.label)
+
+    def get_expected_volumes(self) -> dict:
+        return {
+            label_name: np.sum(self.label == label_value) * np.prod(SPACING) / 1000
+            for label_name, label_value in self.label_key.items()
+        }
+
+    label_key = {"liver": 1, "tumor": 2}
+
+
+class TestMeasureInference(PostProcessTestCase):
+    def test_measure_non_integer_stored_labels(self):
+        postprocess = self.get_postprocess()
+        for stored in ("uint8", "float32", "scaled"):
+            measurements = postprocess.measure_inference_file(
+                self.write_inference("case", stored), self.label_key, single_slices=False
+            )
+            for label_name, volume in self.get_expected_volumes().items():
+                self.assertAlmostEqual(measurements[label_name], volume, places=4, msg=stored)
+
+    def test_slice_areas_match_autocalculate(self):
+        self.write_case("case")
+        self.write_inference("case", "float32")
+        postprocess = self.get_postprocess()
+        postprocess.postprocess()
+        postprocess.autocalculate(True, csv_name="autocalculate.csv", label_key=self.label_key)
+        autocalculate_areas = dict(postprocess.volume["case"])
+        postprocess.calculate_from_inference(
+            True, csv_name="inference.csv", label_key=self.label_key
+        )
+        for label_name, label_value in self.label_key.items():
+            np.testing.assert_allclose(
+                postprocess.volume["case"][label_name], autocalculate_areas[label_name]
+            )
+            np.testing.assert_allclose(
+                autocalculate_areas[label_name],
+                np.sum(self.label == label_value, axis=(0, 1)) * SPACING[0] * SPACING[1] / 100,
+            )
+
+    def test_slice_count_mismatch(self):
+        self.write_case("case")
+        self.write_nifti(os.path.join(self.root, "inference", "case.nii.gz"), self.label[..., 1:])
+        with self.assertRaises(AssertionError):
+            self.get_postprocess().calculate_from_inference(True, label_key=self.label_key)
+
+
+class TestPostprocess(PostProcessTestCase):
+    def test_finished_case_skipped_with_non_dicom_files(self):
+        self.write_case("case")
+        self.write_inference("case")
+        postprocess = self.get_postprocess()
+        nifti_path = os.path.join(self.root, "preprocessed", "nifti", "case_0000.nii.gz")
+        self.assertFalse(postprocess.check_postprocessed(nifti_path))
+        postprocess.postprocess()
+        self.assertTrue(postprocess.check_postprocessed(nifti_path))
+        # files added next to the series (e.g. by a viewer or export) do not make the case unfinished
+        for file_name in ("DICOMDIR", "series.json", "thumbnail.png"):
+            with open(os.path.join(self.root, "preprocessed", "dicom", "case", file_name), "w") as f:
+                f.write("not a slice")
+        self.assertTrue(postprocess.check_postprocessed(nifti_path))
+        with mock.patch.object(postprocess, "postprocess_case") as postprocess_case:
+            postprocess.postprocess()
+        postprocess_case.assert_not_called()
+        os.remove(os.path.join(self.root, "postprocessed", "labels", "case", "0000.dcm"))
+        self.assertFalse(postprocess.check_postprocessed(nifti_path))
+
+    def test_seg_output_skips_label_series(self):
+        self.write_case("case")
+        self.write_inference("case")
+        postprocess = self.get_postprocess(label_format="seg")
+        with mock.patch.object(ReadDicom, "clone_headers") as clone_headers:
+            postprocess.postprocess()
+        clone_headers.assert_not_called()
+        label_dir = os.path.join(self.root, "postprocessed", "labels", "case")
+        self.assertEqual(os.listdir(label_dir), ["seg.dcm"])
+        self.assertTrue(np.array_equal(postprocess.read_label_dir(label_dir).arr, self.label))
+
+
+class TestAutocalculate(PostProcessTestCase):
+    @unittest.skipIf(pa is None, "pyarrow is not installed")
+    def test_failed_case_closes_saver(self):
+        for case in ("case_1", "case_2"):
+            self.write_case(case)
+            self.write_inference(case)
+        postprocess = self.get_postprocess()
+        postprocess.postprocess()
+        label = postprocess.read_label_dir(
+            os.path.join(postprocess.DIRS.DIR_POSTPROCESS, "labels", "case_1")
+        )
+        postprocess.read_label_dir = mock.Mock(side_effect=[label, ValueError("unreadable label")])
+        write_path = os.path.join(postprocess.DIRS.DIR_MEASUREMENTS, "measurements.parquet")
+        with self.assertRaises(ValueError):
+            postprocess.autocalculate(
+                False, csv_name="measurements.parquet", label_key=self.label_key, label_only=True
+            )
+        # the arrow sidecar is converted and removed, the case measured before the failure is kept
+        self.assertFalse(os.path.exists(f"{write_path}.arrow"))
+        saver = MeasurementSaver(write_path, self.label_key.keys(), resume=True)
+        saver.close()
+        self.assertEqual(len(saver.completed), 1)
+
+
+class TestWatch(PostProcessTestCase):
+    def test_watch_measures_non_integer_stored_labels(self):
+        for case, stored in (("case_1", "float32"), ("case_2", "scaled")):
+            self.write_case(case)
+            self.write_inference(case, stored)
+        postprocess = self.get_postprocess()
+        postprocess.watch(poll_interval=0.1, timeout=60, label_key=self.label_key, qc=False)
+        self.assertEqual(postprocess.failed_cases, {})
+        self.assertEqual(sorted(postprocess.volume), ["case_1", "case_2"])
+        for case, measurements in postprocess.volume.items():
+            for label_name, volume in self.get_expected_volumes().items():
+                self.assertAlmostEqual(measurements[label_name], volume, places=4, msg=case)
+            # postprocessed label series holds the rounded labels too
+            self.assertTrue(
+                np.array_equal(
+                    postprocess.read_label_dir(
+                        os.path.join(postprocess.DIRS.DIR_POSTPROCESS, "labels", case)
+                    ).arr,
+                    self.label,
+                )
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
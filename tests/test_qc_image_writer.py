@@ -0,0 +1,33 @@
+import os
+import tempfile
+import unittest
+
+import cv2
+import numpy as np
+
+from dicom_manager.file_writers.qc_image_writer import QCImageWriter
+
+
+class TestQCImageWriter(unittest.TestCase):
+    def test_write_all_workers_match_serial(self):
+        rng = np.random.default_rng(0)
+        slices = [rng.integers(0, 255, (24, 20, 3), dtype=np.uint8) for _ in range(20)]
+        kwargs = {"zoom": 2, "legend": [["liver", "#ff0000"]]}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            written = {}
+            for workers in (1, 3):
+                write_paths = [
+                    os.path.join(tmp_dir, f"{workers}_{slice_num}.png") for slice_num in range(len(slices))
+                ]
+                # chunk_size 2 with 3 workers spreads the slices over several chunks
+                QCImageWriter(workers=workers, chunk_size=2).write_all(
+                    write_paths, (image for image in slices), **kwargs
+                )
+                written[workers] = [cv2.imread(write_path) for write_path in write_paths]
+        for image_1, image_3 in zip(written[1], written[3]):
+            self.assertEqual(image_1.shape, (48, 40, 3))
+            self.assertTrue(np.array_equal(image_1, image_3))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from dicom_manager.file_writers.qc_index import QCIndex
+from dicom_manager.postprocess.postprocess import PostProcess
+
+
+def write_file(path: str, content: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(content)
+
+
+class TestQCIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.image_dir = os.path.join(self.tmp_dir.name, "images", "case")
+        self.label_dir = os.path.join(self.tmp_dir.name, "labels", "case")
+        self.qc_dir = os.path.join(self.tmp_dir.name, "QC")
+        self.output_path = os.path.join(self.qc_dir, "case.png")
+        write_file(os.path.join(self.image_dir, "0000.dcm"), b"image")
+        write_file(os.path.join(self.label_dir, "0000.dcm"), b"label")
+        write_file(self.output_path, b"qc")
+        self.params = {"orthoview": True, "kwargs": {"window": "ct_abdomen"}}
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def index_case(self) -> str:
+        qc_index = QCIndex(self.qc_dir)
+        fingerprint = qc_index.get_fingerprint(self.image_dir, self.label_dir, self.params)
+        qc_index.update("case", fingerprint)
+        qc_index.save()
+        return fingerprint
+
+    def is_current(self) -> bool:
+        """Return is_current of a freshly loaded index, as a later run would see it."""
+        qc_index = QCIndex(self.qc_dir)
+        fingerprint = qc_index.get_fingerprint(self.image_dir, self.label_dir, self.params)
+        return qc_index.is_current("case", fingerprint, self.output_path)
+
+    def test_unchanged_case_is_current(self):
+        self.index_case()
+        self.assertTrue(self.is_current())
+        self.assertFalse(os.path.exists(f"{QCIndex(self.qc_dir).index_path}.tmp"))
+
+    def test_changed_file_invalidates(self):
+        self.index_case()
+        write_file(os.path.join(self.label_dir, "0000.dcm"), b"label, edited")
+        self.assertFalse(self.is_current())
+
+    def test_touched_file_invalidates(self):
+        self.index_case()
+        stat = os.stat(os.path.join(self.image_dir, "0000.dcm"))
+        os.utime(
+            os.path.join(self.image_dir, "0000.dcm"),
+            ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9),
+        )
+        self.assertFalse(self.is_current())
+
+    def test_added_file_invalidates(self):
+        self.index_case()
+        write_file(os.path.join(self.image_dir, "0001.dcm"), b"image")
+        self.assertFalse(self.is_current())
+
+    def test_changed_params_invalidate(self):
+        self.index_case()
+        self.params = {"orthoview": True, "kwargs": {"window": "ct_lung"}}
+        self.assertFalse(self.is_current())
+
+    def test_missing_output_invalidates(self):
+        self.index_case()
+        os.remove(self.output_path)
+        self.assertFalse(self.is_current())
+
+    def test_removed_case_invalidates(self):
+        self.index_case()
+        qc_index = QCIndex(self.qc_dir)
+        qc_index.remove("case")
+        qc_index.save()
+        self.assertFalse(self.is_current())
+
+    def test_corrupt_index_starts_empty(self):
+        self.index_case()
+        write_file(QCIndex(self.qc_dir).index_path, b"{not json")
+        self.assertEqual(QCIndex(self.qc_dir).fingerprints, {})
+        self.assertFalse(self.is_current())
+
+
+class TestSaveQCSkip(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.postprocess = PostProcess(
+            os.path.join(self.tmp_dir.name, "pre_dicom"),
+            os.path.join(self.tmp_dir.name, "pre_nifti"),
+            os.path.join(self.tmp_dir.name, "inference"),
+        )
+        DIR_POSTPROCESS = self.postprocess.DIRS.DIR_POSTPROCESS
+        for case in ("case_1", "case_2"):
+            write_file(os.path.join(DIR_POSTPROCESS, "images", case, "0000.dcm"), b"image")
+            write_file(os.path.join(DIR_POSTPROCESS, "labels", case, "0000.dcm"), b"label")
+        self.postprocess.save_case_qc = mock.Mock(side_effect=self.write_qc)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_qc(self, postprocessed_dir: str, orthoview: bool = True, **kwargs) -> None:
+        """Stand-in for save_case_qc, writes an empty file where the QC image would be."""
+        write_file(
+            self.postprocess.qc_saver.get_output_path(
+                os.path.join(
+                    self.postprocess.DIRS.DIR_QC, os.path.basename(postprocessed_dir.strip("/"))
+                ),
+                orthoview,
+                **kwargs,
+            ),
+            b"qc",
+        )
+
+    def get_rendered_cases(self, **kwargs) -> list:
+        self.postprocess.save_case_qc.reset_mock()
+        self.postprocess.save_qc(**kwargs)
+        return sorted(
+            os.path.basename(call.args[0].strip("/"))
+            for call in self.postprocess.save_case_qc.call_args_list
+        )
+
+    def test_save_qc_skips_unchanged(self):
+        self.assertEqual(self.get_rendered_cases(), ["case_1", "case_2"])
+        self.assertEqual(self.get_rendered_cases(), [])
+        write_file(
+            os.path.join(self.postprocess.DIRS.DIR_POSTPROCESS, "labels", "case_2", "0000.dcm"),
+            b"label, edited",
+        )
+        self.assertEqual(self.get_rendered_cases(), ["case_2"])
+        self.assertEqual(self.get_rendered_cases(overwrite=True), ["case_1", "case_2"])
+        # full volume QC is indexed separately from the orthoview of the same case
+        self.assertEqual(self.get_rendered_cases(orthoview=False), ["case_1", "case_2"])
+        self.assertEqual(self.get_rendered_cases(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
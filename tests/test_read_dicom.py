@@ -1,8 +1,23 @@
+import tempfile
 import unittest
 
-from ballir_dicom_manager.smart_read.read_dicom import ReadDicom
+import numpy as np
+
+from dicom_manager.file_readers.read_dicom import ReadDicom
+from tests.synthetic_dicom import write_series
+
 
 class TestReadDicom(unittest.TestCase):
+    def test_sort_by(self):
+        volume = np.random.default_rng(0).integers(-1000, 2000, (16, 12, 7))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            dicom_read = ReadDicom(write_series(tmp_dir, volume))
+        self.assertEqual(
+            [file.ImagePositionPatient[2] for file in dicom_read.files],
+            [2.5 * slice_num for slice_num in range(volume.shape[-1])],
+        )
+        self.assertTrue(np.array_equal(dicom_read.arr, volume))
+
 
-    def test_sort_by():
-        
\ No newline at end of file
+if __name__ == "__main__":
+    unittest.main()
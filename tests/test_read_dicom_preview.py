@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from dicom_manager.file_readers.read_dicom import ReadDicom
+from dicom_manager.file_readers.read_dicom_preview import ReadDicomPreview
+from dicom_manager.file_writers.dicom_writer import DicomWriter
+from tests.synthetic_dicom import write_series
+
+
+class TestReadDicomPreview(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        # non-square so swapped row and column indices would not go unnoticed
+        self.volume = np.random.default_rng(0).integers(-1000, 2000, (16, 12, 7))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def assert_planes_match(self, target_dir: str):
+        dicom_read = ReadDicom(target_dir)
+        preview = ReadDicomPreview(target_dir)
+        self.assertTrue(preview.supported)
+        self.assertEqual(preview.shape, dicom_read.arr.shape)
+        viewer = dicom_read.viewer
+        for preview_plane, plane in zip(
+            preview.read_planes(),
+            (
+                viewer.get_transverse_plane(dicom_read.arr),
+                viewer.get_sagittal_plane(dicom_read.arr),
+                viewer.get_coronal_plane(dicom_read.arr),
+            ),
+        ):
+            self.assertTrue(np.array_equal(preview_plane, plane))
+        # with a fixed window the displayed planes do not depend on the volume range either
+        viewer.window = preview.viewer.window = "ct_abdomen"
+        for preview_slice, orthogonal_slice in zip(
+            preview.viewer.get_orthogonal_slices(), viewer.get_orthogonal_slices()
+        ):
+            self.assertTrue(np.array_equal(preview_slice, orthogonal_slice))
+
+    def test_explicit_vr_planes(self):
+        self.assert_planes_match(write_series(self.tmp_dir.name, self.volume))
+
+    def test_implicit_vr_planes(self):
+        self.assert_planes_match(write_series(self.tmp_dir.name, self.volume, implicit=True))
+
+    def test_compressed_series_unsupported(self):
+        raw_dir = write_series(os.path.join(self.tmp_dir.name, "raw"), self.volume)
+        deflate_dir = os.path.join(self.tmp_dir.name, "deflate")
+        DicomWriter().save_all(ReadDicom(raw_dir).files, deflate_dir, compression="deflate")
+        self.assertFalse(ReadDicomPreview(deflate_dir).supported)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from dicom_manager.file_readers.read_dicom import ReadDicom
+from dicom_manager.file_readers.read_image_label_pair import ReadImageLabelPair
+from dicom_manager.file_readers.read_multi_image_label_pair import ReadMultiImageLabelPair
+from tests.synthetic_dicom import write_series
+
+
+class TestBuildRGBOverlay(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(0)
+        label_1 = np.zeros((16, 12, 6), dtype=np.int16)
+        label_1[4:9, 3:8, 1:4] = 1
+        label_2 = np.zeros((16, 12, 6), dtype=np.int16)
+        label_2[6:11, 3:8, 2:5] = 1
+        volume = rng.integers(-1000, 2000, (16, 12, 6))
+        self.pairs = [
+            ReadImageLabelPair(
+                ReadDicom(write_series(os.path.join(self.tmp_dir.name, f"image_{name}"), volume)),
+                ReadDicom(write_series(os.path.join(self.tmp_dir.name, f"label_{name}"), label)),
+            )
+            for name, label in (("1", label_1), ("2", label_2))
+        ]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def assert_lazy_matches_eager(self, read_pair: ReadImageLabelPair):
+        for kwargs in ({}, {"window": "ct_abdomen"}, {"window": (0, 500), "side_by_side": True}):
+            eager = read_pair.build_rgb_overlay(lazy=False, **kwargs)
+            lazy = np.asarray(read_pair.build_rgb_overlay(**kwargs))
+            self.assertTrue(np.array_equal(lazy, eager), kwargs)
+
+    def test_image_label_pair(self):
+        self.assert_lazy_matches_eager(self.pairs[0])
+        # a narrow window clips part of the gray values, unlike the min:max default
+        windowed = self.pairs[0].build_rgb_overlay(lazy=False, window="ct_brain")
+        self.assertFalse(np.array_equal(windowed, self.pairs[0].build_rgb_overlay(lazy=False)))
+
+    def test_multi_image_label_pair(self):
+        self.assert_lazy_matches_eager(ReadMultiImageLabelPair(*self.pairs, align=False))
+
+
+if __name__ == "__main__":
+    unittest.main()
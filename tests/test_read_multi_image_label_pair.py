@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from dicom_manager.file_readers.read_dicom import ReadDicom
+from dicom_manager.file_readers.read_image_label_pair import ReadImageLabelPair
+from dicom_manager.file_readers.read_multi_image_label_pair import ReadMultiImageLabelPair
+from dicom_manager.preprocess.patient_space import PatientSpace
+from tests.synthetic_dicom import write_series
+
+
+class TestReadMultiImageLabelPair(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(0)
+        label_1 = np.zeros((16, 12, 10), dtype=np.int16)
+        label_1[4:9, 3:8, 3:7] = 1
+        label_2 = np.zeros((16, 12, 30), dtype=np.int16)
+        label_2[5:10, 3:8, 14:19] = 1
+        # series 2 starts 25 mm (10 slices) below series 1 and extends well past it
+        self.dirs = []
+        for name, volume, origin in (
+            ("1", rng.integers(-1000, 2000, (16, 12, 10)), 0.0),
+            ("2", rng.integers(-1000, 2000, (16, 12, 30)), -25.0),
+        ):
+            label = label_1 if name == "1" else label_2
+            self.dirs += [
+                write_series(os.path.join(self.tmp_dir.name, f"image_{name}"), volume, origin=origin),
+                write_series(os.path.join(self.tmp_dir.name, f"label_{name}"), label, origin=origin),
+            ]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def read_pair(self, image_dir: str, label_dir: str) -> ReadImageLabelPair:
+        return ReadImageLabelPair(ReadDicom(image_dir), ReadDicom(label_dir))
+
+    def test_from_dirs_matches_full_read(self):
+        full_read = ReadMultiImageLabelPair(
+            self.read_pair(*self.dirs[:2]), self.read_pair(*self.dirs[2:]), align=True
+        )
+        partial_read = ReadMultiImageLabelPair.from_dirs(*self.dirs)
+        # only the 10 slices of series 2 within series 1 extent are decoded
+        self.assertEqual(len(partial_read.read_pair_2.read_dicom_image.files), 10)
+        for read_dicom in ("read_dicom_image", "read_dicom_label"):
+            self.assertTrue(
+                np.array_equal(
+                    getattr(partial_read.read_pair_2, read_dicom).arr,
+                    getattr(full_read.read_pair_2, read_dicom).arr,
+                )
+            )
+        self.assertEqual(partial_read.dsc, full_read.dsc)
+
+    def test_overlapping_paths(self):
+        paths = ReadMultiImageLabelPair.get_overlapping_paths(
+            self.dirs[2], PatientSpace(ReadDicom(self.dirs[0]).files)
+        )
+        self.assertEqual(
+            sorted(float(ReadDicom([path]).files[0].ImagePositionPatient[2]) for path in paths),
+            [2.5 * slice_num for slice_num in range(10)],
+        )
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import os
+import tempfile
+import unittest
+
+import nibabel as nib
+import numpy as np
+
+from dicom_manager.file_readers.read_nifti import ReadNifti
+
+
+class TestReadNifti(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.label = np.random.default_rng(0).integers(0, 4, (9, 7, 5)).astype(np.int16)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_nifti(self, data: np.array, slope: float = 1.0, inter: float = 0.0) -> str:
+        image = nib.Nifti1Image(data, np.eye(4))
+        image.header.set_slope_inter(slope, inter)
+        write_path = os.path.join(self.tmp_dir.name, "label.nii.gz")
+        nib.save(image, write_path)
+        return write_path
+
+    def test_unscaled_label(self):
+        nifti_read = ReadNifti(self.write_nifti(self.label), dtype=np.uint8)
+        self.assertEqual(nifti_read.arr.dtype, np.uint8)
+        self.assertTrue(np.array_equal(nifti_read.arr, np.rot90(self.label, k=1, axes=(0, 1))))
+
+    def test_scaled_label_rounds(self):
+        # stored values scaled by 0.9999 decode just below the label values
+        nifti_read = ReadNifti(self.write_nifti(self.label, slope=0.9999), dtype=np.uint8)
+        self.assertTrue(np.array_equal(nifti_read.arr, np.rot90(self.label, k=1, axes=(0, 1))))
+
+    def test_spacing_follows_rotated_axes(self):
+        image = nib.Nifti1Image(self.label, np.diag([0.6, 0.8, 2.5, 1]))
+        write_path = os.path.join(self.tmp_dir.name, "anisotropic.nii.gz")
+        nib.save(image, write_path)
+        nifti_read = ReadNifti(write_path, dtype=np.uint8)
+        # arr is (Y, X, Z) = (nifti y, nifti x, nifti z) after rot90
+        self.assertEqual(nifti_read.arr.shape, (7, 9, 5))
+        np.testing.assert_allclose(nifti_read.spacing, (0.8, 0.6, 2.5))
+
+    def test_label_out_of_range(self):
+        with self.assertRaises(AssertionError):
+            ReadNifti(self.write_nifti(self.label - 1), dtype=np.uint8)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+
+import numpy as np
+from scipy import ndimage
+
+from dicom_manager.preprocess.resample_volume import VolumeResampler
+
+
+class TestVolumeResampler(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.image_array = rng.normal(size=(30, 25, 40)).astype(np.float32)
+        self.label_array = (rng.random((30, 25, 40)) > 0.7).astype(np.uint8) * 2
+        self.all_resize_dims = ([0.7, 1.3, 0.55], [1.0, 1.0, 2.5], [2, 0.5, 1])
+
+    def test_image_matches_zoom(self):
+        for resize_dims in self.all_resize_dims:
+            reference = ndimage.zoom(self.image_array, resize_dims, order=1)
+            for workers in (1, 3):
+                resampled = VolumeResampler(workers=workers, slab_size=7).resample_image(
+                    self.image_array, resize_dims
+                )
+                self.assertEqual(resampled.shape, reference.shape)
+                np.testing.assert_allclose(resampled, reference, atol=1e-5)
+
+    def test_image_roi(self):
+        roi = (slice(3, 15), slice(2, 9), slice(5, 20))
+        for resize_dims in self.all_resize_dims:
+            reference = ndimage.zoom(self.image_array, resize_dims, order=1)
+            np.testing.assert_allclose(
+                VolumeResampler(slab_size=4).resample_image(self.image_array, resize_dims, roi),
+                reference[roi],
+                atol=1e-5,
+            )
+
+    def test_label_matches_zoom(self):
+        resampler = VolumeResampler()
+        for resize_dims in self.all_resize_dims:
+            reference = ndimage.zoom(self.label_array, resize_dims, order=0)
+            resampled = resampler.resample_label(self.label_array, resize_dims)
+            self.assertEqual(resampled.dtype, np.uint8)
+            # nearest neighbour ties (coordinate exactly between two voxels) may round either way
+            not_tied = [
+                np.abs(
+                    resampler.get_coordinates(input_len, output_len, slice(0, output_len)) % 1 - 0.5
+                )
+                > 1e-4
+                for input_len, output_len in zip(self.label_array.shape, reference.shape)
+            ]
+            not_tied = np.ix_(*[np.flatnonzero(axis_not_tied) for axis_not_tied in not_tied])
+            self.assertTrue(np.array_equal(resampled[not_tied], reference[not_tied]))
+
+    def test_label_wise_values(self):
+        resampled = VolumeResampler().resample_label(
+            self.label_array, [0.7, 1.3, 0.55], label_wise=True
+        )
+        self.assertEqual(np.unique(resampled).tolist(), [0, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+import warnings
+
+import numpy as np
+
+from dicom_manager.file_viewers.rgb_overlay import RGBOverlay
+
+
+class TestRGBOverlay(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        label = np.zeros((16, 12, 5), dtype=np.uint8)
+        label[4:9, 3:8, 1:4] = 1
+        self.overlay = RGBOverlay(
+            rng.integers(-1000, 2000, (16, 12, 5)), label, colors=[(255, 0, 0)]
+        )
+
+    def test_asarray_without_warnings(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            rgb_array = np.asarray(self.overlay)
+            rgb_float = np.asarray(self.overlay, dtype=float)
+            rgb_copy = np.array(self.overlay, copy=True)
+        self.assertEqual(rgb_array.shape, self.overlay.shape)
+        self.assertEqual(rgb_array.dtype, np.uint8)
+        self.assertTrue(np.array_equal(rgb_array, self.overlay[...]))
+        self.assertTrue(np.array_equal(rgb_float, rgb_array.astype(float)))
+        self.assertTrue(np.array_equal(rgb_copy, rgb_array))
+
+    def test_no_copy_raises(self):
+        with self.assertRaises(ValueError):
+            np.array(self.overlay, copy=False)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from dicom_manager.file_writers.save_measurements_to_csv import MeasurementSaver, pa
+
+
+class TestMeasurementSaver(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.label_names = ["liver", "tumor"]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def check_resume(self, extension: str, per_slice: bool = False) -> None:
+        write_path = os.path.join(self.tmp_dir.name, f"measurements{extension}")
+        measurement = (lambda value: [value, value + 1]) if per_slice else float
+        saver = MeasurementSaver(write_path, self.label_names, per_slice=per_slice)
+        saver.save("case_a", {"liver": measurement(1), "tumor": measurement(2)})
+        saver.close()
+        saver = MeasurementSaver(write_path, self.label_names, per_slice=per_slice, resume=True)
+        self.assertEqual(list(saver.completed), ["case_a"])
+        saver.save("case_b", {"liver": measurement(3)})
+        saver.close()
+        saver = MeasurementSaver(write_path, self.label_names, per_slice=per_slice, resume=True)
+        saver.close()
+        self.assertEqual(
+            list(saver.completed.values()),
+            [
+                {"case": "case_a", "liver": measurement(1), "tumor": measurement(2)},
+                {"case": "case_b", "liver": measurement(3), "tumor": None},
+            ],
+        )
+
+    def test_resume_csv(self):
+        self.check_resume(".csv")
+        self.check_resume(".csv", per_slice=True)
+
+    @unittest.skipIf(pa is None, "pyarrow is not installed")
+    def test_resume_arrow(self):
+        self.check_resume(".arrow")
+        self.check_resume(".arrow", per_slice=True)
+
+    @unittest.skipIf(pa is None, "pyarrow is not installed")
+    def test_resume_parquet(self):
+        self.check_resume(".parquet", per_slice=True)
+
+    def test_resume_interrupted_csv(self):
+        write_path = os.path.join(self.tmp_dir.name, "measurements.csv")
+        saver = MeasurementSaver(write_path, self.label_names)
+        saver.save("case_a", {"liver": 1.0, "tumor": 2.0})
+        saver.file.close()
+        with open(write_path, "a") as f:
+            f.write("case_b,3.0")
+        saver = MeasurementSaver(write_path, self.label_names, resume=True)
+        saver.close()
+        self.assertEqual(list(saver.completed), ["case_a"])
+
+    def check_replace_closed(self, extension: str) -> None:
+        """Replacing a file that is still open fails on Windows, every handle must be closed by os.replace."""
+        write_path = os.path.join(self.tmp_dir.name, f"measurements{extension}")
+        opened_files = []
+        open_file, replace = MeasurementSaver.open_file, os.replace
+
+        def record_open_file(saver, file_path, mode):
+            open_file(saver, file_path, mode)
+            opened_files.append(saver.file)
+
+        def check_replace(src, dst):
+            self.assertTrue(all(opened_file.closed for opened_file in opened_files))
+            replace(src, dst)
+
+        with mock.patch.object(MeasurementSaver, "open_file", autospec=True, side_effect=record_open_file), mock.patch(
+            "dicom_manager.file_writers.save_measurements_to_csv.os.replace", side_effect=check_replace
+        ) as patched_replace:
+            for resume in (False, True):
+                saver = MeasurementSaver(write_path, self.label_names, resume=resume)
+                saver.save(f"case_{resume}", {"liver": 1.0})
+                saver.close()
+        self.assertEqual(patched_replace.call_count, 2)
+        self.assertEqual(list(saver.completed), ["case_False", "case_True"])
+
+    def test_replace_closed_csv(self):
+        self.check_replace_closed(".csv")
+
+    @unittest.skipIf(pa is None, "pyarrow is not installed")
+    def test_replace_closed_arrow(self):
+        self.check_replace_closed(".arrow")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import nibabel as nib
+import numpy as np
+from scipy import ndimage
+from scipy.spatial.distance import cdist
+
+from dicom_manager.postprocess.compare_labels import CompareLabels
+from dicom_manager.postprocess.surface_distance import SurfaceDistance
+
+
+class TestSurfaceDistance(unittest.TestCase):
+    def setUp(self):
+        self.spacing = [0.7, 0.8, 2.5]
+        self.label_array_1 = np.zeros((60, 50, 30), dtype=np.uint8)
+        self.label_array_2 = np.zeros((60, 50, 30), dtype=np.uint8)
+        self.label_array_1[10:25, 12:30, 5:15] = 1
+        self.label_array_2[13:27, 10:28, 7:18] = 1
+        self.label_array_1[40:50, 5:15, 20:25] = 2
+        self.label_array_2[41:52, 6:14, 19:26] = 2
+
+    def brute_force(self, mask_1: np.array, mask_2: np.array) -> list:
+        """Return hausdorff, hd95 and assd from all pairwise distances between border voxels."""
+        structure = ndimage.generate_binary_structure(3, 1)
+        points_1, points_2 = (
+            np.argwhere(mask & ~ndimage.binary_erosion(mask, structure)) * self.spacing
+            for mask in (mask_1, mask_2)
+        )
+        distances = cdist(points_1, points_2)
+        distances_1, distances_2 = distances.min(axis=1), distances.min(axis=0)
+        return [
+            max(distances_1.max(), distances_2.max()),
+            max(np.percentile(distances_1, 95), np.percentile(distances_2, 95)),
+            (distances_1.sum() + distances_2.sum()) / (distances_1.size + distances_2.size),
+        ]
+
+    def test_brute_force(self):
+        for workers in (1, 2):
+            surface_distances = SurfaceDistance(self.spacing).get_label_surface_distances(
+                self.label_array_1, self.label_array_2, [1, 2], workers=workers
+            )
+            for label_value in (1, 2):
+                np.testing.assert_allclose(
+                    [surface_distances[label_value][metric] for metric in SurfaceDistance.metrics],
+                    self.brute_force(
+                        self.label_array_1 == label_value, self.label_array_2 == label_value
+                    ),
+                )
+
+    def test_empty_label(self):
+        surface_distances = SurfaceDistance(self.spacing).get_label_surface_distances(
+            self.label_array_1, self.label_array_2, [3]
+        )
+        self.assertTrue(all(np.isnan(value) for value in surface_distances[3].values()))
+
+    def test_compare_labels_workers(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for labels_dir, label_array in (
+                ("labels_1", self.label_array_1),
+                ("labels_2", self.label_array_2),
+            ):
+                os.makedirs(os.path.join(tmp_dir, labels_dir))
+                nib.save(
+                    nib.Nifti1Image(label_array, np.diag(self.spacing + [1])),
+                    os.path.join(tmp_dir, labels_dir, "case_a.nii.gz"),
+                )
+            compare_labels = CompareLabels(
+                tmp_dir,
+                os.path.join(tmp_dir, "labels_1"),
+                os.path.join(tmp_dir, "labels_2"),
+                tmp_dir,
+                workers=2,
+            )
+            with mock.patch.object(
+                SurfaceDistance,
+                "get_label_surface_distances",
+                autospec=True,
+                side_effect=SurfaceDistance.get_label_surface_distances,
+            ) as get_label_surface_distances:
+                compare_labels.calculate_dsc(label_key={"a": 1, "b": 2}, surface_distance=True)
+            self.assertEqual(get_label_surface_distances.call_args.kwargs["workers"], 2)
+        self.assertAlmostEqual(
+            compare_labels.dsc["case_a"]["a hausdorff_mm"],
+            self.brute_force(self.label_array_1 == 1, self.label_array_2 == 1)[0],
+            places=5,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()